@@ -0,0 +1,110 @@
+# AXIS/benchmarks/bvh_io.py
+"""
+BVH I/O throughput benchmark.
+
+Generates a synthetic BVH file of roughly the requested size and reports MB/s
+for reading the MOTION block (per-line Python parsing vs. the bulk and
+memory-mapped readers in scripts/bvh_io.py) and for writing it (per-value
+formatting vs. the bulk formatter).
+
+Usage (from the project root that contains AXIS/):
+    python -m AXIS.benchmarks.bvh_io --size_mb 64
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+from AXIS.scripts.bvh_io import read_bvh, write_bvh, write_motion
+
+
+def make_hierarchy(depth: int = 4, branching: int = 2, seed: int = 0):
+    """Build a binary-tree skeleton with a 6-channel root and 3 rotation channels per joint."""
+    rng = np.random.default_rng(seed)
+    hierarchy = {}
+
+    def add_joint(name, parent, level):
+        channels = ["Zrotation", "Xrotation", "Yrotation"]
+        if parent is None:
+            channels = ["Xposition", "Yposition", "Zposition"] + channels
+        hierarchy[name] = {"parent": parent, "offset": rng.normal(size=3) * 10, "channels": channels,
+                           "children": [], "end_site": None}
+        if parent is not None:
+            hierarchy[parent]["children"].append(name)
+        if level == depth:
+            hierarchy[name]["end_site"] = np.array([0.0, 5.0, 0.0])
+            return
+        for b in range(branching):
+            add_joint(f"{name}_{b}", name, level + 1)
+
+    add_joint("Hips", None, 0)
+    return hierarchy
+
+
+def legacy_read_motion(path: str) -> np.ndarray:
+    """Line-by-line parsing of the MOTION block, as scripts/parse_bvh.py used to do."""
+    with open(path, "r") as f:
+        lines = f.readlines()
+    start = next(i for i, line in enumerate(lines) if line.startswith("Frame Time")) + 1
+    return np.array([list(map(float, line.split())) for line in lines[start:] if line.strip()])
+
+
+def legacy_write_motion(f, motion: np.ndarray):
+    """Per-value formatting, as scripts/convert_to_bvh.py used to do."""
+    f.write("\n".join(" ".join(f"{val:.6f}" for val in row) for row in motion))
+
+
+def throughput(fn: Callable[[], None], size_bytes: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return size_bytes / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BVH MOTION parsing and writing throughput.")
+    parser.add_argument("--size_mb", type=float, default=32.0, help="Approximate size of the synthetic BVH file.")
+    parser.add_argument("--depth", type=int, default=4, help="Depth of the synthetic binary-tree skeleton.")
+    parser.add_argument("--chunk_mb", type=float, default=8.0, help="Chunk size for the memory-mapped reader.")
+    parser.add_argument("--repeats", type=int, default=2, help="Timed repetitions (best is reported).")
+    args = parser.parse_args()
+
+    hierarchy = make_hierarchy(depth=args.depth)
+    columns = sum(len(info["channels"]) for info in hierarchy.values())
+    # Formatted values take about 11 bytes each ("-123.456789 ")
+    num_frames = max(1, int(args.size_mb * 1e6 / (columns * 11)))
+    motion = np.random.default_rng(0).uniform(-180, 180, size=(num_frames, columns))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.bvh")
+        write_bvh(path, hierarchy, "Hips", motion, 1 / 30)
+        size = os.path.getsize(path)
+        print(f"{num_frames} frames x {columns} channels, {size / 1e6:.1f} MB")
+
+        results: Dict[str, float] = {
+            "read  legacy per-line": throughput(lambda: legacy_read_motion(path), size, args.repeats),
+            "read  bulk": throughput(lambda: read_bvh(path, use_mmap=False), size, args.repeats),
+            "read  mmap chunked": throughput(
+                lambda: read_bvh(path, use_mmap=True, chunk_bytes=int(args.chunk_mb * 1e6)), size, args.repeats),
+        }
+        scratch = os.path.join(tmp_dir, "out.txt")
+
+        def timed_write(writer):
+            with open(scratch, "w") as f:
+                writer(f, motion)
+
+        results["write legacy per-value"] = throughput(lambda: timed_write(legacy_write_motion), size, args.repeats)
+        results["write bulk"] = throughput(lambda: timed_write(write_motion), size, args.repeats)
+
+    for name, mb_per_s in results.items():
+        print(f"{name:<24} {mb_per_s:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
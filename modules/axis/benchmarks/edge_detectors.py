@@ -0,0 +1,74 @@
+# AXIS/benchmarks/edge_detectors.py
+"""
+Edge detector strategy benchmark.
+
+Reports frames per second of CannyDetector and the cv2.dnn based HEDDetector
+(at several batch sizes) on synthetic frames. HED is skipped with a message
+when the model weights in AXIS/models/ are not available.
+
+Usage (from the project root that contains AXIS/):
+    python -m AXIS.benchmarks.edge_detectors --frames 16 --batch_sizes 1 4 8
+"""
+
+import argparse
+import time
+from typing import List
+
+import cv2
+import numpy as np
+
+from AXIS.src.strategies.base import IEdgeDetector
+from AXIS.src.strategies.detectors import CannyDetector, HEDDetector
+
+
+def make_frames(num_frames: int, height: int, width: int, seed: int = 0) -> List[np.ndarray]:
+    """Generate frames with random strokes so detectors have real edges to find."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(num_frames):
+        frame = np.full((height, width, 3), 255, dtype=np.uint8)
+        for _ in range(40):
+            pt1 = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            pt2 = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            cv2.line(frame, pt1, pt2, (0, 0, 0), int(rng.integers(1, 4)))
+        frames.append(frame)
+    return frames
+
+
+def measure_fps(detector: IEdgeDetector, frames: List[np.ndarray], batch_size: int) -> float:
+    """Run the detector over all frames in batches and return frames per second."""
+    detector.detect_batch(frames[:batch_size])  # warm-up
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        detector.detect_batch(frames[i:i + batch_size])
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark edge detector strategies.")
+    parser.add_argument('--frames', type=int, default=16, help="Number of synthetic frames.")
+    parser.add_argument('--height', type=int, default=360, help="Frame height.")
+    parser.add_argument('--width', type=int, default=640, help="Frame width.")
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[1, 4, 8], help="HED batch sizes to measure.")
+    parser.add_argument('--hed_input_size', type=int, nargs=2, default=[500, 500], help="HED network input size (width height).")
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.height, args.width)
+    results = [("canny", 1, measure_fps(CannyDetector(), frames, 1))]
+
+    try:
+        hed = HEDDetector(input_size=tuple(args.hed_input_size))
+    except FileNotFoundError as e:
+        print(f"Skipping HEDDetector: {e}")
+    else:
+        for batch_size in args.batch_sizes:
+            results.append(("hed", batch_size, measure_fps(hed, frames, batch_size)))
+
+    print(f"\n--- Edge detector benchmark ({args.width}x{args.height}, {args.frames} frames) ---")
+    print(f"{'strategy':<12}{'batch':>8}{'FPS':>10}")
+    for name, batch_size, fps in results:
+        print(f"{name:<12}{batch_size:>8}{fps:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
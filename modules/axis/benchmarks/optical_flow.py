@@ -0,0 +1,116 @@
+# AXIS/benchmarks/optical_flow.py
+"""
+Optical flow strategy benchmark.
+
+Compares endpoint error (EPE) and frames per second of the classical OpenCV
+flow strategies against RAFT on a synthetic clip of a translating texture,
+where the ground-truth flow is known exactly.
+
+Usage (from the project root that contains AXIS/):
+    python -m AXIS.benchmarks.optical_flow --frames 20 --skip_raft
+"""
+
+import argparse
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from AXIS.src.strategies.base import IOpticalFlowEstimator
+from AXIS.src.strategies.estimators import DISFlowEstimator, FarnebackFlowEstimator
+
+
+def make_translating_clip(num_frames: int, height: int, width: int,
+                          velocity: Tuple[float, float] = (1.5, -0.75),
+                          seed: int = 0) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Build a clip of a smooth random texture translating at constant velocity.
+
+    Args:
+        num_frames: Number of frames to generate
+        height: Frame height in pixels
+        width: Frame width in pixels
+        velocity: (dx, dy) displacement per frame in pixels
+        seed: Random seed for the texture
+
+    Returns:
+        (frames, gt_flow) where frames are BGR uint8 images and gt_flow is the
+        constant (H, W, 2) ground-truth flow between consecutive frames.
+    """
+    rng = np.random.default_rng(seed)
+    margin = int(np.ceil(max(abs(velocity[0]), abs(velocity[1])) * num_frames)) + 8
+    texture = rng.random((height + 2 * margin, width + 2 * margin)).astype(np.float32)
+    texture = cv2.GaussianBlur(texture, (0, 0), sigmaX=2.0)
+    texture = cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    texture = cv2.cvtColor(texture, cv2.COLOR_GRAY2BGR)
+
+    frames = []
+    for t in range(num_frames):
+        # Sampling the texture at (x - t*dx) moves the content by +dx per frame.
+        shift = np.float32([[1, 0, velocity[0] * t - margin], [0, 1, velocity[1] * t - margin]])
+        frame = cv2.warpAffine(texture, shift, (width, height), flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_REFLECT)
+        frames.append(frame)
+
+    gt_flow = np.empty((height, width, 2), dtype=np.float32)
+    gt_flow[..., 0] = velocity[0]
+    gt_flow[..., 1] = velocity[1]
+    return frames, gt_flow
+
+
+def endpoint_error(flow: np.ndarray, gt_flow: np.ndarray, border: int = 8) -> float:
+    """Mean endpoint error, ignoring a border where the motion is ill-defined."""
+    diff = flow[border:-border, border:-border] - gt_flow[border:-border, border:-border]
+    return float(np.mean(np.linalg.norm(diff, axis=-1)))
+
+
+def benchmark_estimator(estimator: IOpticalFlowEstimator, frames: List[np.ndarray],
+                        gt_flow: np.ndarray) -> Dict[str, float]:
+    """Run an estimator over consecutive frame pairs and report EPE and FPS."""
+    # Warm-up so lazy initialisation does not count towards the timing.
+    estimator.estimate(frames[0], frames[1])
+
+    errors = []
+    start = time.perf_counter()
+    for prev_frame, frame in zip(frames[:-1], frames[1:]):
+        flow = estimator.estimate(prev_frame, frame)
+        errors.append(endpoint_error(flow, gt_flow))
+    elapsed = time.perf_counter() - start
+
+    return {"epe": float(np.mean(errors)), "fps": (len(frames) - 1) / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark optical flow strategies on a synthetic clip.")
+    parser.add_argument('--frames', type=int, default=20, help="Number of frames in the synthetic clip.")
+    parser.add_argument('--height', type=int, default=256, help="Frame height (multiple of 8 for RAFT).")
+    parser.add_argument('--width', type=int, default=384, help="Frame width (multiple of 8 for RAFT).")
+    parser.add_argument('--skip_raft', action='store_true', help="Skip the RAFT baseline (no torch weights needed).")
+    args = parser.parse_args()
+
+    frames, gt_flow = make_translating_clip(args.frames, args.height, args.width)
+
+    estimators: Dict[str, IOpticalFlowEstimator] = {
+        "dis_ultrafast": DISFlowEstimator(preset="ultrafast"),
+        "dis_medium": DISFlowEstimator(preset="medium"),
+        "dis_medium_coarse0.5": DISFlowEstimator(preset="medium", coarse_scale=0.5),
+        "farneback_fast": FarnebackFlowEstimator(preset="fast"),
+        "farneback_medium": FarnebackFlowEstimator(preset="medium"),
+        "farneback_medium_coarse0.5": FarnebackFlowEstimator(preset="medium", coarse_scale=0.5),
+    }
+    if not args.skip_raft:
+        from AXIS.src.strategies.estimators import RAFTEstimator
+        estimators["raft_small"] = RAFTEstimator(model_name="raft_small")
+        estimators["raft_large"] = RAFTEstimator(model_name="raft_large")
+
+    results = {name: benchmark_estimator(est, frames, gt_flow) for name, est in estimators.items()}
+
+    print(f"\n--- Optical flow benchmark ({args.width}x{args.height}, {args.frames} frames) ---")
+    print(f"{'strategy':<30}{'EPE (px)':>10}{'FPS':>10}")
+    for name, result in results.items():
+        print(f"{name:<30}{result['epe']:>10.3f}{result['fps']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# AXIS/benchmarks/pose_estimation.py
+"""
+YOLO-pose throughput benchmark.
+
+Writes a synthetic video and reports frames per second on the CPU for
+decoding alone, for the former read-one-frame / infer-one-frame loop, and for
+the prefetching decoder feeding batched inference (scripts/run_pose_estimation.py)
+at several batch sizes. Skipped with a message when ultralytics is not installed.
+
+Usage (from the project root that contains AXIS/):
+    python -m AXIS.benchmarks.pose_estimation --frames 128 --batch_sizes 1 4 8 16
+"""
+
+import argparse
+import functools
+import os
+import tempfile
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from AXIS.scripts.frame_batches import FramePrefetcher
+
+
+def write_video(path: str, num_frames: int, height: int, width: int, seed: int = 0):
+    """Synthetic clip of moving stick figures on a noisy background."""
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (width, height))
+    background = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    for t in range(num_frames):
+        frame = background.copy()
+        for person in range(3):
+            x = int((width * (person + 1) / 4 + 5 * t) % width)
+            y = height // 2
+            cv2.circle(frame, (x, y - 60), 15, (255, 255, 255), -1)
+            cv2.line(frame, (x, y - 45), (x, y + 30), (255, 255, 255), 6)
+            for dx in (-30, 30):
+                cv2.line(frame, (x, y - 20), (x + dx, y + 5), (255, 255, 255), 5)
+                cv2.line(frame, (x, y + 30), (x + dx, y + 80), (255, 255, 255), 5)
+        writer.write(frame)
+    writer.release()
+
+
+def decode_only(path: str) -> int:
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+def sequential(path: str, predict) -> int:
+    """Read a frame, run the model on it, repeat (the former run_pose_estimation loop)."""
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        predict(frame)
+        count += 1
+    cap.release()
+    return count
+
+
+def prefetched(path: str, predict, estimate_poses, batch_size: int) -> int:
+    cap = cv2.VideoCapture(path)
+    with FramePrefetcher(cap, max_queue=4 * batch_size) as prefetcher:
+        # Drain the generator; only the frame count is kept
+        count = len(deque(estimate_poses(prefetcher.batches(batch_size), predict)))
+    return count
+
+
+def measure_fps(fn) -> float:
+    start = time.perf_counter()
+    frames = fn()
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched YOLO-pose inference with a prefetching decoder.")
+    parser.add_argument('--frames', type=int, default=128, help="Number of synthetic video frames.")
+    parser.add_argument('--height', type=int, default=360, help="Frame height.")
+    parser.add_argument('--width', type=int, default=640, help="Frame width.")
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[1, 4, 8, 16], help="Batch sizes to measure.")
+    parser.add_argument('--model', type=str, default='yolov8n-pose.pt', help="YOLO-pose weights.")
+    parser.add_argument('--device', type=str, default='cpu', help="Inference device.")
+    args = parser.parse_args()
+
+    try:
+        from AXIS.scripts.run_pose_estimation import YOLO, estimate_poses
+    except ImportError as e:
+        print(f"Skipping pose estimation benchmark: {e}")
+        return
+
+    model = YOLO(args.model)
+    predict = functools.partial(model, verbose=False, device=args.device)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.mp4")
+        write_video(path, args.frames, args.height, args.width)
+        predict(np.zeros((args.height, args.width, 3), dtype=np.uint8))  # warm-up
+
+        results = [("decode only", "-", measure_fps(lambda: decode_only(path))),
+                   ("sequential", 1, measure_fps(lambda: sequential(path, predict)))]
+        for batch_size in args.batch_sizes:
+            results.append(("prefetched", batch_size,
+                            measure_fps(lambda: prefetched(path, predict, estimate_poses, batch_size))))
+
+    print(f"\n--- YOLO-pose benchmark ({args.width}x{args.height}, {args.frames} frames, {args.device}) ---")
+    print(f"{'mode':<14}{'batch':>8}{'FPS':>10}")
+    for name, batch_size, fps in results:
+        print(f"{name:<14}{batch_size:>8}{fps:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,46 @@
 import os
+import re
 import subprocess
 import argparse
 import glob
-import json
 import numpy as np
 import cv2 # To get video dimensions
 import sys
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    from .scripts.apply_smoothing import smooth_tracks, smoothed_output_path
+    from .scripts.chunk_planning import (DEFAULT_BLEND_FRAMES, DEFAULT_CHUNK_RECEPTIVE_FIELDS, context_frames,
+                                         crossfade_weights, plan_chunks)
+    from .scripts.keypoint_tracks import KeypointTracks, load_tracks, save_tracks, write_json
+    from .scripts.prepare_yolo_for_videopose3d import videopose3d_input_from_tracks
+    from .scripts.uplift_to_3d import keypoints_3d_to_tracks
+    from .scripts.videopose3d_service import get_uplifter, temporal_receptive_field
+except ImportError:
+    from scripts.apply_smoothing import smooth_tracks, smoothed_output_path
+    from scripts.chunk_planning import (DEFAULT_BLEND_FRAMES, DEFAULT_CHUNK_RECEPTIVE_FIELDS, context_frames,
+                                        crossfade_weights, plan_chunks)
+    from scripts.keypoint_tracks import KeypointTracks, load_tracks, save_tracks, write_json
+    from scripts.prepare_yolo_for_videopose3d import videopose3d_input_from_tracks
+    from scripts.uplift_to_3d import keypoints_3d_to_tracks
+    from scripts.videopose3d_service import get_uplifter, temporal_receptive_field
 
-# Ensure the script is run by the venv's python
 # This assumes the script is run from the project root
 VENV_PYTHON = os.path.abspath(os.path.join(os.path.dirname(__file__), 'venv', 'bin', 'python'))
-if sys.executable != VENV_PYTHON:
-    print(f"Warning: This script should be run using the virtual environment's python: {VENV_PYTHON}")
-    print(f"Attempting to re-execute with venv python...")
-    os.execv(VENV_PYTHON, [VENV_PYTHON] + sys.argv)
+
+def ensure_venv_python():
+    """Ensure the script is run by the venv's python, re-executing it if necessary."""
+    if sys.executable != VENV_PYTHON:
+        print(f"Warning: This script should be run using the virtual environment's python: {VENV_PYTHON}")
+        print(f"Attempting to re-execute with venv python...")
+        os.execv(VENV_PYTHON, [VENV_PYTHON] + sys.argv)
 
 def run_command(command, description, cwd=None):
     print(f"\n--- {description} ---")
-    full_command = f"/mnt/d/progress/ani_bender/venv/bin/python {command}"
+    # main() has already re-executed this script with the venv's python
+    full_command = f"\"{sys.executable}\" {command}"
     
     process = subprocess.run(full_command, shell=True, capture_output=True, text=True, cwd=cwd)
     print(process.stdout)
@@ -28,71 +51,125 @@ def run_command(command, description, cwd=None):
         print(f"Error during: {description}. Exit code: {process.returncode}")
         exit(process.returncode)
 
-def linear_blend(val1, val2, alpha):
-    """Performs linear blending between two values."""
-    return val1 * (1 - alpha) + val2 * alpha
-
-def stitch_poses(all_chunk_predictions, video_length, chunk_size, overlap_size):
+def stitch_poses(chunk_tracks, video_length, context_frames=0, blend_frames=DEFAULT_BLEND_FRAMES):
     """
     Stitches overlapping 3D pose predictions from multiple chunks.
-    all_chunk_predictions: List of dictionaries, where each dict is a frame from a chunk.
-                           Each frame dict has 'frame_idx' and 'keypoints' (list of persons).
+    chunk_tracks: List of KeypointTracks, one per chunk, whose frame_indices are source video frames.
     video_length: Total number of frames in the original video.
-    chunk_size: Size of each processing chunk.
-    overlap_size: Overlap between chunks.
+    context_frames: Frames next to an inner chunk edge whose predictions lack temporal context.
+    blend_frames: Length of the cross-fade at each seam (see plan_chunks).
+    Overlapping predictions are blended with crossfade_weights(); frames whose predictions all have
+    zero weight (an overlap smaller than planned) get their plain mean.
+    Returns a KeypointTracks with one row per video frame; frames without a prediction have no person present.
     """
-    stitched_frames = [None] * video_length
-    
-    # Group predictions by their original frame_idx
-    predictions_by_frame = [[] for _ in range(video_length)]
-    for frame_data in all_chunk_predictions:
-        # DEBUG PRINT
-        
-
-        original_frame_idx = frame_data['frame_idx']
-        if original_frame_idx < video_length: # Ensure we don't go out of bounds
-            predictions_by_frame[original_frame_idx].append(frame_data['keypoints'])
-
-    # Stitching logic
-    for i in range(video_length):
-        if not predictions_by_frame[i]:
-            # If no prediction for this frame, use a zero pose or previous frame's pose
-            # For simplicity, let's use a a zero pose for now.
-            stitched_frames[i] = {'frame_idx': i, 'keypoints': []} # Empty keypoints for this frame
-            continue
-
-        # If only one prediction for this frame (most common for non-overlapping parts)
-        if len(predictions_by_frame[i]) == 1:
-            stitched_frames[i] = {'frame_idx': i, 'keypoints': predictions_by_frame[i][0]}
-            continue
-
-        # Handle overlapping frames
-        # For simplicity, we'll just take the first prediction for now.
-        # A proper blending would involve weighting based on position within overlap.
-        stitched_frames[i] = {'frame_idx': i, 'keypoints': predictions_by_frame[i][0]}
-
-    # Filter out None values if any (shouldn't happen with current logic if all frames have data)
-    stitched_frames = [f for f in stitched_frames if f is not None]
-
-    return stitched_frames
-
-def main():
-    parser = argparse.ArgumentParser(description="Run the YOLO-VideoPose3d pipeline for 3D pose estimation to BVH animation.")
-    parser.add_argument('--video_path', type=str, required=True, help="Path to the input video file.")
-    parser.add_argument('--output_base_dir', type=str, default="output_data", help="Base directory for all output files.")
-    parser.add_argument('--chunk_size', type=int, default=243, help="Number of frames to process in each chunk.")
-    parser.add_argument('--overlap_size', type=int, default=121, help="Number of overlapping frames between chunks.")
-    parser.add_argument('--smoothing_method', type=str, default="moving_average",
-                        choices=["moving_average", "savgol", "one_euro", "none"],
-                        help="Smoothing method to apply in apply_smoothing.py.")
+    chunk_tracks = [tracks for tracks in chunk_tracks if tracks.num_frames]
+    if not chunk_tracks:
+        return KeypointTracks.empty(video_length, 0, 0, 3)
+
+    first = chunk_tracks[0]
+    num_persons = max(tracks.num_persons for tracks in chunk_tracks)
+    num_joints, num_coords = first.num_joints, first.num_coords
+    # Weighted and plain sums of positions with confidence appended, per (frame, person)
+    weighted = np.zeros((video_length, num_persons, num_joints, num_coords + 1))
+    plain = np.zeros_like(weighted)
+    weight_sum = np.zeros((video_length, num_persons))
+    count = np.zeros((video_length, num_persons))
+
+    for tracks in chunk_tracks:
+        frame_indices = np.asarray(tracks.frame_indices)
+        in_range = frame_indices < video_length # Ensure we don't go out of bounds
+        rows = frame_indices[in_range]
+        weights = crossfade_weights(frame_indices, video_length, context_frames, blend_frames)[in_range]
+        persons = tracks.num_persons
+        values = np.concatenate([tracks.positions, tracks.confidence[..., None]], axis=-1)[in_range]
+        present = tracks.present[in_range].astype(np.float64)
+        # Frames are unique within a chunk, so each row is written once per chunk
+        weighted[rows, :persons] += (weights[:, None] * present)[..., None, None] * values
+        plain[rows, :persons] += present[..., None, None] * values
+        weight_sum[rows, :persons] += weights[:, None] * present
+        count[rows, :persons] += present
+
+    blended = weight_sum > 0
+    numerator = np.where(blended[..., None, None], weighted, plain)
+    denominator = np.where(blended, weight_sum, np.maximum(count, 1))
+    values = numerator / denominator[..., None, None]
+
+    stitched = KeypointTracks.empty(video_length, num_persons, num_joints, num_coords,
+                                    joint_names=first.joint_names, parents=first.parents,
+                                    layout=first.layout, fps=first.fps)
+    stitched.positions[:] = values[..., :num_coords]
+    stitched.confidence[:] = values[..., num_coords]
+    stitched.present[:] = count > 0
+    return stitched
+
+def chunk_index(chunk_json_path):
+    """Chunk number of a `*_chunk<N>_2d_keypoints.json` file written by run_pose_estimation.py."""
+    return int(re.search(r'_chunk(\d+)_2d_keypoints\.json$', chunk_json_path).group(1))
+
+def process_video_chunks(yolo_2d_json_paths, video_output_dir, video_filename_base,
+                         video_width, video_height, smoothing_method):
+    """
+    Runs the per-chunk stages (prepare -> VideoPose3D uplift -> smoothing) of one video in-process,
+    passing arrays between them. All chunks are prepared first and lifted together with one
+    uplift_batch() call, so the model sees as few, as full batches as possible. Every file written is
+    named after the chunk, so the chunks of several videos can be processed at once.
+    Returns the smoothed 3D KeypointTracks of each chunk, in the order of yolo_2d_json_paths.
+    """
+    # Step 2: Prepare YOLO output for VideoPose3D (first person of every frame)
+    prepared = [videopose3d_input_from_tracks(load_tracks(path), video_width, video_height)
+                for path in yolo_2d_json_paths]
 
-    args = parser.parse_args()
+    # Step 3: Uplift every chunk to 3D using VideoPose3D
+    keypoints_3d = get_uplifter().uplift_batch([keypoints_2d[..., :2] for keypoints_2d, _ in prepared],
+                                               [(video_width, video_height)] * len(prepared))
 
-    os.makedirs(args.output_base_dir, exist_ok=True)
+    smoothed_chunks = []
+    for path, (_, metadata), chunk_keypoints_3d in zip(yolo_2d_json_paths, prepared, keypoints_3d):
+        chunk_filename_base = f'{video_filename_base}_chunk{chunk_index(path)}'
+        tracks_3d = keypoints_3d_to_tracks(chunk_keypoints_3d, frame_indices=metadata['frame_indices'])
+        output_3d_json_chunk = os.path.join(video_output_dir, f'{chunk_filename_base}_videopose3d_3d_keypoints.json')
+        save_tracks(output_3d_json_chunk, tracks_3d)
 
-    # Put these definitions back inside main()
-    video_filename_base = os.path.splitext(os.path.basename(args.video_path))[0]
-    absolute_video_path = os.path.abspath(args.video_path)
+        # Step 4: Temporal Smoothing
+        smoothed = smooth_tracks(tracks_3d, method=smoothing_method)
+        save_tracks(smoothed_output_path(output_3d_json_chunk, video_output_dir), smoothed)
+        smoothed_chunks.append(smoothed)
+    return smoothed_chunks
+
+def limit_worker_threads():
+    """Pool worker initializer: one intra-op thread per worker, so the workers don't oversubscribe the CPU."""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(1)
+
+def make_chunk_executor(workers):
+    """
+    Worker pool shared by every queued video (one task per video).
+    With a single worker (the default) the videos' chunks are lifted on one background thread of this
+    process, which keeps a single VideoPose3D model loaded and still overlaps them with the YOLO pass of
+    the next video. More workers start processes that each load their own copy of the model.
+    """
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=workers, initializer=limit_worker_threads)
+
+@dataclass
+class VideoJob:
+    video_path: str # Absolute path of the input video
+    output_dir: str
+    filename_base: str
+    length: int
+    width: int
+    height: int
+    chunk_json_files: List[str]
+    chunks_future: Optional[Future] = None # Smoothed 3D tracks of every chunk (process_video_chunks)
+
+def start_video(video_path, args, executor):
+    """Runs YOLO on one video and queues its chunks on the executor. Returns None if no chunks were produced."""
+    video_filename_base = os.path.splitext(os.path.basename(video_path))[0]
+    absolute_video_path = os.path.abspath(video_path)
     absolute_output_base_dir = os.path.abspath(args.output_base_dir)
 
     # Create a dedicated output directory for this video
@@ -100,99 +177,66 @@ def main():
     os.makedirs(video_output_dir, exist_ok=True)
 
     # Correctly derive the base filename used by run_pose_estimation.py
-    video_filename_base_for_glob = os.path.basename(args.video_path).replace('.', '_')
-    
-    # Get total video length
+    video_filename_base_for_glob = os.path.basename(video_path).replace('.', '_')
+
+    # Get total video length and dimensions
     cap = cv2.VideoCapture(absolute_video_path)
     video_length = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    video_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    video_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     cap.release()
 
     # --- Step 1: Run YOLO 2D Pose Estimation in chunks ---
     run_command(
-        f"scripts/run_pose_estimation.py --video_path \"{absolute_video_path}\" --output_dir \"{video_output_dir}\" --chunk_size {args.chunk_size} --overlap_size {args.overlap_size}",
-        "Running YOLO 2D Pose Estimation in chunks"
+        f"scripts/run_pose_estimation.py --video_path \"{absolute_video_path}\" --output_dir \"{video_output_dir}\" --chunk_size {args.chunk_size} --overlap_size {args.overlap_size} --batch_size {args.yolo_batch_size}",
+        f"Running YOLO 2D Pose Estimation in chunks ({video_filename_base})"
     )
 
-    # --- Process each chunk ---
-    chunk_json_files = sorted(glob.glob(os.path.join(video_output_dir, f'{video_filename_base_for_glob}_chunk*_2d_keypoints.json')))
-    
+    # --- Queue each chunk ---
+    chunk_json_files = sorted(glob.glob(os.path.join(video_output_dir, f'{video_filename_base_for_glob}_chunk*_2d_keypoints.json')),
+                              key=chunk_index)
     if not chunk_json_files:
-        print("No 2D keypoint JSON files found for chunks. Aborting pipeline.")
-        exit(1)
-
-    all_chunk_predictions = [] # To collect all 3D predictions from all chunks
+        print(f"No 2D keypoint JSON files found for chunks of {video_path}. Skipping this video.")
+        return None
 
-    for chunk_idx, yolo_2d_json_path in enumerate(chunk_json_files):
-        print(f"\n--- Processing Chunk {chunk_idx + 1}/{len(chunk_json_files)} ---")
+    job = VideoJob(absolute_video_path, video_output_dir, video_filename_base, video_length,
+                   video_width, video_height, chunk_json_files)
+    job.chunks_future = executor.submit(process_video_chunks, chunk_json_files, video_output_dir,
+                                        video_filename_base, video_width, video_height, args.smoothing_method)
+    print(f"Queued {len(chunk_json_files)} chunks of {video_path}")
+    return job
 
-        # Get video dimensions from the original video (assuming it's consistent)
-        cap = cv2.VideoCapture(absolute_video_path)
-        video_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        video_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        cap.release()
-
-        # Step 2: Prepare YOLO output for VideoPose3D
-        run_command(
-            f"scripts/prepare_yolo_for_videopose3d.py --yolo_json \"{yolo_2d_json_path}\" --video_width {video_width} --video_height {video_height} --output_dir \"{video_output_dir}\"",
-            f"Preparing YOLO output for VideoPose3D (Chunk {chunk_idx + 1})"
-        )
-
-        # The NPZ file is now saved directly to data/data_2d_custom_yolo.npz by prepare_yolo_for_videopose3d.py
-        videopose3d_input_npz_path = "data/data_2d_custom_yolo.npz"
-
-        # Step 3: Uplift to 3D using VideoPose3D
-        output_3d_json_chunk = os.path.join(video_output_dir, f'{video_filename_base}_chunk{chunk_idx}_videopose3d_3d_keypoints.json')
-        run_command(
-            f"scripts/uplift_to_3d.py --input_npz_path \"{videopose3d_input_npz_path}\" --output_dir \"{video_output_dir}\" --video_filename_base \"{video_filename_base}_chunk{chunk_idx}\"",
-            f"Uplifting to 3D using VideoPose3D (Chunk {chunk_idx + 1})"
-        )
-
-        # Step 4: Temporal Smoothing
-        output_smoothed_3d_json_chunk = os.path.join(video_output_dir, f'{video_filename_base}_chunk{chunk_idx}_videopose3d_smoothed_3d_keypoints.json')
-        run_command(
-            f"scripts/apply_smoothing.py --input_json_path \"{output_3d_json_chunk}\" --output_dir \"{video_output_dir}\" --method {args.smoothing_method}",
-            f"Applying Temporal Smoothing (Chunk {chunk_idx + 1})"
-        )
-        
-        # Load the smoothed 3D predictions for stitching later
-        with open(output_smoothed_3d_json_chunk, 'r') as f:
-            chunk_predictions = json.load(f)
-            all_chunk_predictions.extend(chunk_predictions) # Extend the list of frames
+def finish_video(job, args):
+    """Waits for the chunks of one video, then stitches them and writes the BVH and overlay outputs."""
+    all_chunk_predictions = job.chunks_future.result() # The 3D prediction tracks of all chunks
+    print(f"--- {len(all_chunk_predictions)} chunks of {job.filename_base} done ---")
 
     # --- Step 5: Stitch all 3D predictions and convert to final BVH ---
-    # The stitch_poses function will handle the overlap blending.
-    stitched_3d_predictions = stitch_poses(all_chunk_predictions, video_length, args.chunk_size, args.overlap_size)
+    # The stitch_poses function cross-fades the overlaps past each chunk's context frames.
+    stitched_3d_predictions = stitch_poses(all_chunk_predictions, job.length, args.context_frames, args.blend_frames)
 
     # Save the stitched predictions to a temporary JSON for the BVH converter
-    final_stitched_json_path = os.path.join(video_output_dir, f'{video_filename_base}_videopose3d_stitched_3d_keypoints.json')
-    with open(final_stitched_json_path, 'w') as f:
-        json.dump(stitched_3d_predictions, f, indent=4)
+    final_stitched_json_path = os.path.join(job.output_dir, f'{job.filename_base}_videopose3d_stitched_3d_keypoints.json')
+    save_tracks(final_stitched_json_path, stitched_3d_predictions)
 
     run_command(
-        f"scripts/convert_json_to_bvh_bvhio.py --input_json_path \"{final_stitched_json_path}\" --output_dir \"{video_output_dir}\"",
+        f"scripts/convert_json_to_bvh_bvhio.py --input_json_path \"{final_stitched_json_path}\" --output_dir \"{job.output_dir}\"",
         "Converting stitched 3D keypoints to BVH"
     )
 
     # --- Step 6: Generate Overlay Videos ---
     print("\n--- Generating Overlay Videos ---")
 
-    # Load all 2D keypoints from the chunk files
-    all_2d_keypoints = []
-    for chunk_file in chunk_json_files:
-        with open(chunk_file, 'r') as f:
-            all_2d_keypoints.extend(json.load(f))
-
-    # Create a dictionary for quick lookup of 2D keypoints by frame_idx
+    # Load all 2D keypoints from the chunk files and index them by frame_idx
     keypoints_2d_map = {}
-    for frame_data in all_2d_keypoints:
-        frame_idx = frame_data['frame_idx']
-        # Extract keypoints for all persons in this frame
-        persons_keypoints = [person['keypoints'] for person in frame_data.get('persons', [])]
-        keypoints_2d_map[frame_idx] = persons_keypoints
+    for chunk_file in job.chunk_json_files:
+        for frame_data in load_tracks(chunk_file).to_frame_list():
+            # Keypoints of all persons in this frame
+            keypoints_2d_map[frame_data['frame_idx']] = frame_data['keypoints']
 
     # Combine 2D and 3D keypoints into a single structure
     final_combined_data = []
-    for frame_3d_data in stitched_3d_predictions:
+    for frame_3d_data in stitched_3d_predictions.to_frame_list():
         frame_idx = frame_3d_data['frame_idx']
         combined_frame = {
             'frame_idx': frame_idx,
@@ -202,18 +246,65 @@ def main():
         final_combined_data.append(combined_frame)
 
     # Save the combined data to a new JSON file for the visualizer
-    final_combined_json_path = os.path.join(video_output_dir, f'{video_filename_base}_final_combined_keypoints.json')
-    with open(final_combined_json_path, 'w') as f:
-        json.dump(final_combined_data, f, indent=4)
+    final_combined_json_path = os.path.join(job.output_dir, f'{job.filename_base}_final_combined_keypoints.json')
+    write_json(final_combined_json_path, final_combined_data)
 
     # Run the visualization script
     run_command(
-        f'scripts/visualize_data.py --video \"{absolute_video_path}\" --json \"{final_combined_json_path}\" --output_dir \"{video_output_dir}\"',
+        f'scripts/visualize_data.py --video \"{job.video_path}\" --json \"{final_combined_json_path}\" --output_dir \"{job.output_dir}\"',
         "Creating 2D/3D Overlay Videos"
     )
 
+    print(f"Check the '{job.output_dir}' directory for results.")
+
+def main():
+    ensure_venv_python()
+
+    parser = argparse.ArgumentParser(description="Run the YOLO-VideoPose3d pipeline for 3D pose estimation to BVH animation.")
+    parser.add_argument('--video_path', type=str, nargs='+', required=True,
+                        help="Path to the input video file. Several videos can be given and are queued in one run.")
+    parser.add_argument('--output_base_dir', type=str, default="output_data", help="Base directory for all output files.")
+    parser.add_argument('--chunk_size', type=int, default=None,
+                        help=f"Number of frames to process in each chunk (default: {DEFAULT_CHUNK_RECEPTIVE_FIELDS} receptive fields of VideoPose3D).")
+    parser.add_argument('--overlap_size', type=int, default=None,
+                        help="Number of overlapping frames between chunks (default: the model's temporal context on both sides plus --blend_frames).")
+    parser.add_argument('--blend_frames', type=int, default=DEFAULT_BLEND_FRAMES,
+                        help="Frames cross-faded at each chunk seam.")
+    parser.add_argument('--smoothing_method', type=str, default="moving_average",
+                        choices=["moving_average", "savgol", "one_euro", "none"],
+                        help="Smoothing method to apply in apply_smoothing.py.")
+    parser.add_argument('--yolo_batch_size', type=int, default=16, help="Frames per YOLO-pose inference call.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Videos whose chunks are processed in parallel. Above 1, each worker process loads its own VideoPose3D model.")
+
+    args = parser.parse_args()
+
+    os.makedirs(args.output_base_dir, exist_ok=True)
+
+    # Plan chunks from the model's receptive field, so the overlap is only the context it needs
+    receptive_field = temporal_receptive_field()
+    args.context_frames = context_frames(receptive_field)
+    if args.overlap_size is None:
+        args.chunk_size, args.overlap_size = plan_chunks(receptive_field, args.chunk_size, args.blend_frames)
+    else:
+        args.chunk_size = args.chunk_size or DEFAULT_CHUNK_RECEPTIVE_FIELDS * receptive_field
+        # Only the part of an explicit overlap beyond the context on both sides can be cross-faded
+        args.blend_frames = max(args.overlap_size - 2 * args.context_frames, 0)
+    print(f"Chunks of {args.chunk_size} frames overlapping by {args.overlap_size} (receptive field: {receptive_field} frames)")
+
+    # YOLO runs one video at a time while the chunks of earlier videos are processed on the pool
+    executor = make_chunk_executor(args.workers)
+    try:
+        jobs = [start_video(video_path, args, executor) for video_path in args.video_path]
+        for job in jobs:
+            if job is not None:
+                finish_video(job, args)
+    finally:
+        executor.shutdown()
+
     print("\n--- Pipeline Finished ---")
-    print(f"Check the '{video_output_dir}' directory for results.")
+    if None in jobs:
+        exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
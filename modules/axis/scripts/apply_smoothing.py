@@ -1,26 +1,18 @@
-import json
 import os
 import numpy as np
 import argparse
-from smoothing_utils import moving_average_filter, savgol_filtering, OneEuroFilter
 
-def apply_filter_to_frames(frames, method="moving_average", window_size=5, window_length=11, polyorder=2):
-    if not frames:
-        return []
+try:
+    from .keypoint_tracks import KeypointTracks, load_tracks, save_tracks
+    from .smoothing_utils import moving_average_filter, savgol_filtering, one_euro_filter
+except ImportError:
+    from keypoint_tracks import KeypointTracks, load_tracks, save_tracks
+    from smoothing_utils import moving_average_filter, savgol_filtering, one_euro_filter
 
-    # Assuming single person tracking for this application
-    # Convert list of dicts to a numpy array for easier processing
-    keypoints_list = []
-    for frame in frames:
-        if frame['keypoints_3d']:
-            # Create a (33, 3) array for each frame from the x, y, z values
-            frame_kps = np.array([[kp['x'], kp['y'], kp['z']] for kp in frame['keypoints_3d']])
-            keypoints_list.append(frame_kps)
-        else:
-            # Append zeros if no keypoints in a frame
-            keypoints_list.append(np.zeros((33, 3))) # Assuming 33 keypoints
-    
-    keypoints_array = np.array(keypoints_list)
+def smooth_tracks(tracks, method="moving_average", window_size=5, window_length=11, polyorder=2):
+    """Smooths every person, joint and coordinate of a KeypointTracks along the frame axis at once."""
+    # (T, P, J, C) - all filters work along axis 0
+    keypoints_array = tracks.positions.astype(np.float64)
 
     # Apply the selected filter
     if method == "moving_average":
@@ -28,42 +20,55 @@ def apply_filter_to_frames(frames, method="moving_average", window_size=5, windo
     elif method == "savgol":
         smoothed_array = savgol_filtering(keypoints_array, window_length=window_length, polyorder=polyorder)
     elif method == "one_euro":
-        original_shape = keypoints_array.shape
-        flattened_keypoints = keypoints_array.reshape(original_shape[0], -1)
-        euro_filters = [OneEuroFilter(freq=30, min_cutoff=1.0, beta=0.01) for _ in range(flattened_keypoints.shape[1])]
-        smoothed_flattened = np.zeros_like(flattened_keypoints)
-        for i in range(flattened_keypoints.shape[0]):
-            for j in range(flattened_keypoints.shape[1]):
-                smoothed_flattened[i, j] = euro_filters[j](flattened_keypoints[i, j])
-        smoothed_array = smoothed_flattened.reshape(original_shape)
+        smoothed_array = one_euro_filter(keypoints_array, freq=30, min_cutoff=1.0, beta=0.01)
     else: # "none"
         smoothed_array = keypoints_array
 
-    # Reconstruct the frames with the smoothed data
-    new_frames = []
-    for i, frame in enumerate(frames):
-        new_frame = {
-            "frame_index": frame["frame_index"],
-            "keypoints_3d": []
-        }
-        # If there were keypoints in the original frame, populate the smoothed ones
-        if frame['keypoints_3d']:
-            for kp_idx, original_kp in enumerate(frame['keypoints_3d']):
-                new_frame["keypoints_3d"].append({
-                    "name": original_kp['name'],
-                    "x": smoothed_array[i, kp_idx, 0],
-                    "y": smoothed_array[i, kp_idx, 1],
-                    "z": smoothed_array[i, kp_idx, 2],
-                    "visibility": original_kp['visibility']
-                })
-        new_frames.append(new_frame)
-    
-    return new_frames
+    return tracks.with_positions(smoothed_array)
+
+def apply_filter_to_frames(frames, method="moving_average", window_size=5, window_length=11, polyorder=2):
+    """Smooths frames in the MediaPipe layout ({"frame_index", "keypoints_3d": [{"name", "x", ...}]})."""
+    if not frames:
+        return []
+
+    # Frames without keypoints stay empty; their slots are zeros while filtering
+    tracks = KeypointTracks.from_named_frames({"frames": frames})
+    smoothed = smooth_tracks(tracks, method=method, window_size=window_size,
+                             window_length=window_length, polyorder=polyorder)
+    return smoothed.to_named_frames()["frames"]
+
+def smooth_file(input_path, output_path, method="moving_average", window_size=5, window_length=11, polyorder=2):
+    """Smooths a keypoints file and saves it in the input's layout. Returns the smoothed tracks."""
+    # Load the input keypoints (the .npz next to a JSON file is used when present)
+    tracks = load_tracks(input_path)
+
+    # Apply the selected filter
+    smoothed = smooth_tracks(tracks, method=method,
+                             window_size=window_size,
+                             window_length=window_length,
+                             polyorder=polyorder)
+
+    # Save the smoothed data in the input's layout
+    save_tracks(output_path, smoothed)
+    return smoothed
+
+def smoothed_output_path(input_path, output_dir):
+    """`<name>_3d_keypoints.json` -> `<output_dir>/<name>_smoothed_3d_keypoints.json`"""
+    filename = os.path.basename(input_path)
+    if "_3d_keypoints" in filename:
+        filename = filename.replace("_3d_keypoints", "_smoothed_3d_keypoints")
+    else:
+        root, ext = os.path.splitext(filename)
+        filename = f"{root}_smoothed{ext}"
+    return os.path.join(output_dir, filename)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Apply temporal smoothing to 3D pose keypoints.")
-    parser.add_argument('--input_path', type=str, required=True, help="Path to the input 3D keypoints JSON file.")
-    parser.add_argument('--output_path', type=str, required=True, help="Full path for the output smoothed 3D keypoints JSON file.")
+    parser.add_argument('--input_path', '--input_json_path', dest='input_path', type=str, required=True,
+                        help="Path to the input keypoints file (JSON in any pose-script layout, or .npz tracks).")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--output_path', type=str, help="Full path for the output smoothed keypoints file.")
+    output.add_argument('--output_dir', type=str, help="Directory for the output; `*_3d_keypoints` is renamed to `*_smoothed_3d_keypoints`.")
     parser.add_argument('--method', type=str, default="moving_average",
                         choices=["moving_average", "savgol", "one_euro", "none"], help="Smoothing method to apply.")
     parser.add_argument('--window_size', type=int, default=5, help="Window size for moving_average filter.")
@@ -72,23 +77,10 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    # Load the input JSON data
-    with open(args.input_path, "r") as f:
-        data = json.load(f)
+    output_path = args.output_path or smoothed_output_path(args.input_path, args.output_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
 
-    # Apply the selected filter
-    smoothed_frames = apply_filter_to_frames(data["frames"], method=args.method,
-                                             window_size=args.window_size,
-                                             window_length=args.window_length,
-                                             polyorder=args.polyorder)
-    
-    output_data = {
-        "fps": data["fps"],
-        "frames": smoothed_frames
-    }
+    smooth_file(args.input_path, output_path, method=args.method,
+                window_size=args.window_size, window_length=args.window_length, polyorder=args.polyorder)
 
-    # Save the smoothed data
-    with open(args.output_path, 'w') as f:
-        json.dump(output_data, f, indent=4)
-    
-    print(f"3D keypoints smoothed using {args.method} method and saved to {args.output_path}")
\ No newline at end of file
+    print(f"3D keypoints smoothed using {args.method} method and saved to {output_path}")
@@ -0,0 +1,97 @@
+import numpy as np
+
+# Batched bone rotations for the BVH converters.
+#
+# A bone's rotation is the shortest-arc rotation taking its rest-pose direction onto its current
+# direction (parent joint -> joint). Everything works on (..., 3) arrays, so a bone, or a whole
+# skeleton, is solved for all frames at once. Euler angles follow the BVH convention also used by parse_bvh.local_transforms():
+# for channels "Zrotation Xrotation Yrotation" the rotation is Rz @ Rx @ Ry.
+
+AXES = {"X": 0, "Y": 1, "Z": 2}
+EPSILON = 1e-6
+
+
+def channel_order(channels):
+    """Rotation order of a joint's BVH channel list, e.g. [..., "Zrotation", "Xrotation", "Yrotation"] -> "ZXY"."""
+    return "".join(channel[0] for channel in channels if channel.endswith("rotation"))
+
+
+def quaternions_between(rest_vectors, vectors):
+    """
+    Shortest-arc rotations taking `rest_vectors` onto `vectors`.
+
+    Args:
+        rest_vectors: (..., 3) directions, e.g. (3,) or (J, 3); need not be normalized
+        vectors: (..., 3) directions, e.g. (T, 3) or (T, J, 3), broadcast against rest_vectors
+
+    Returns:
+        (..., 4) unit quaternions (w, x, y, z). Identity where either vector is (near) zero;
+        a half turn about an axis perpendicular to the rest vector where they point in opposite directions.
+    """
+    rest_vectors, vectors = np.broadcast_arrays(np.asarray(rest_vectors, dtype=np.float64),
+                                                np.asarray(vectors, dtype=np.float64))
+    rest_norm = np.linalg.norm(rest_vectors, axis=-1, keepdims=True)
+    norm = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    valid = (rest_norm[..., 0] > EPSILON) & (norm[..., 0] > EPSILON)
+    a = rest_vectors / np.maximum(rest_norm, EPSILON)
+    b = vectors / np.maximum(norm, EPSILON)
+
+    quaternions = np.concatenate([1.0 + np.sum(a * b, axis=-1, keepdims=True), np.cross(a, b)], axis=-1)
+
+    # Opposite directions: any axis perpendicular to a, taken against the basis axis least aligned with it
+    opposite = valid & (quaternions[..., 0] < EPSILON)
+    if opposite.any():
+        least_aligned = np.eye(3)[np.argmin(np.abs(a[opposite]), axis=-1)]
+        quaternions[opposite, 0] = 0.0
+        quaternions[opposite, 1:] = np.cross(a[opposite], least_aligned)
+
+    quaternions[~valid] = (1.0, 0.0, 0.0, 0.0)
+    return quaternions / np.linalg.norm(quaternions, axis=-1, keepdims=True)
+
+
+def quaternions_to_matrices(quaternions):
+    """(..., 4) unit quaternions (w, x, y, z) -> (..., 3, 3) rotation matrices."""
+    w, x, y, z = np.moveaxis(np.asarray(quaternions, dtype=np.float64), -1, 0)
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+
+def rotations_between(rest_vectors, vectors):
+    """(..., 3, 3) rotation matrices taking `rest_vectors` onto `vectors`; see quaternions_between()."""
+    return quaternions_to_matrices(quaternions_between(rest_vectors, vectors))
+
+
+def matrices_to_euler(matrices, order="ZXY"):
+    """
+    Decomposes rotation matrices into Euler angles for a three-axis channel order.
+
+    Args:
+        matrices: (..., 3, 3) rotation matrices
+        order: Axis letters in channel order, e.g. "ZXY" for R = Rz @ Rx @ Ry
+
+    Returns:
+        (..., 3) angles in degrees, in channel order. At gimbal lock the last angle is 0.
+    """
+    order = order.upper()
+    if len(order) != 3 or set(order) != set(AXES):
+        raise ValueError(f"Unsupported rotation order: {order}. Use a permutation of 'XYZ'.")
+    i, j, k = (AXES[axis] for axis in order)
+    # +1 for cyclic orders (XYZ, YZX, ZXY), -1 for the others
+    sign = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    R = np.asarray(matrices, dtype=np.float64)
+    cos_middle = np.hypot(R[..., i, i], R[..., i, j])
+    middle = np.arctan2(sign * R[..., i, k], cos_middle)
+    locked = cos_middle < EPSILON
+    first = np.where(locked, np.arctan2(sign * R[..., k, j], R[..., j, j]),
+                     np.arctan2(-sign * R[..., j, k], R[..., k, k]))
+    last = np.where(locked, 0.0, np.arctan2(-sign * R[..., i, j], R[..., i, i]))
+    return np.degrees(np.stack([first, middle, last], axis=-1))
+
+
+def bone_euler_angles(rest_vectors, vectors, order="ZXY"):
+    """(..., 3) Euler angles in degrees of the rotations taking `rest_vectors` onto `vectors`."""
+    return matrices_to_euler(rotations_between(rest_vectors, vectors), order)
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Chunk planning for temporal models such as VideoPose3D.
+#
+# A frame's prediction only uses real input if `context` frames on both sides of it lie inside the
+# chunk (or the video ends there, where the model edge-pads just like for the whole video). Adjacent
+# chunks therefore overlap by 2 * context + blend frames: each side discards the `context` frames
+# next to its inner edge, and the `blend` frames in the middle, where both predictions have full
+# context, are cross-faded.
+
+DEFAULT_BLEND_FRAMES = 32
+# Default chunk size in receptive fields; the redundant share of inference is overlap / chunk size
+DEFAULT_CHUNK_RECEPTIVE_FIELDS = 4
+
+
+def chunk_video(video_length, chunk_size, overlap_size):
+    """
+    Calculates start and end frames for video chunks with overlap.
+    Returns a list of (start_frame, end_frame) tuples.
+    """
+    chunks = []
+    if chunk_size <= 0 or overlap_size < 0:
+        raise ValueError("chunk_size must be positive and overlap_size non-negative.")
+
+    if chunk_size <= overlap_size:
+        print("Warning: chunk_size is less than or equal to overlap_size. This may lead to unexpected behavior.")
+
+    current_frame = 0
+    while current_frame < video_length:
+        end_frame = min(current_frame + chunk_size, video_length)
+        chunks.append((current_frame, end_frame))
+        if end_frame == video_length:
+            break
+        current_frame = end_frame - overlap_size
+        # Ensure current_frame doesn't go negative if overlap_size is too large for the first chunk
+        if current_frame < 0: current_frame = 0
+    return chunks
+
+
+def context_frames(receptive_field):
+    """Frames of temporal context the model needs on each side of a predicted frame."""
+    return (receptive_field - 1) // 2
+
+
+def plan_chunks(receptive_field, chunk_size=None, blend_frames=DEFAULT_BLEND_FRAMES):
+    """
+    Chunk size and overlap for a model with the given receptive field.
+    The overlap is the smallest that leaves `blend_frames` of full-context predictions from both
+    chunks at every seam. Without a chunk size, DEFAULT_CHUNK_RECEPTIVE_FIELDS receptive fields are used.
+    Returns (chunk_size, overlap_size).
+    """
+    overlap_size = 2 * context_frames(receptive_field) + blend_frames
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_RECEPTIVE_FIELDS * receptive_field
+    if chunk_size <= 2 * overlap_size:
+        raise ValueError(f"chunk_size must be more than twice the overlap ({overlap_size} frames) "
+                         f"for a receptive field of {receptive_field}.")
+    return chunk_size, overlap_size
+
+
+def crossfade_weights(frame_indices, video_length, context, blend_frames):
+    """
+    Stitching weight of every frame of one chunk, for frames sorted and contiguous within the chunk.
+
+    Weights are 0 for the `context` frames next to an inner chunk edge, rise linearly over the next
+    `blend_frames` frames and are 1 elsewhere. At a seam planned by plan_chunks() the weights of the
+    two chunks add up to 1. Edges at the start or end of the video get no ramp.
+    """
+    frame_indices = np.asarray(frame_indices)
+    if not len(frame_indices):
+        return np.zeros(0)
+    start, end = frame_indices[0], frame_indices[-1]
+    lead = np.full(len(frame_indices), np.inf) if start == 0 else frame_indices - start
+    trail = np.full(len(frame_indices), np.inf) if end >= video_length - 1 else end - frame_indices
+    return _ramp(lead, context, blend_frames) * _ramp(trail, context, blend_frames)
+
+
+def _ramp(distance, context, blend_frames):
+    return np.clip((distance - context + 1) / (blend_frames + 1), 0.0, 1.0)
@@ -7,6 +7,11 @@ from bvhio.lib.Parser import writeBvh
 from bvhio.lib.bvh import BvhContainer, BvhJoint
 from SpatialTransform import Pose
 
+try:
+    from .bone_rotations import quaternions_between
+except ImportError:
+    from bone_rotations import quaternions_between
+
 # --- SKELETON DEFINITION (GROUND TRUTH FROM VIDEOPOS3D SOURCE) ---
 
 # This entire section is replicated from the VideoPose3D/common/h36m_dataset.py and skeleton.py
@@ -95,21 +100,6 @@ KEYPOINT_MAP = {name: [i] for i, name in enumerate(h36m_joint_names_17)}
 
 # --- UTILITY FUNCTIONS ---
 
-def rotation_matrix_from_vectors(vec1, vec2):
-    vec1_norm = np.linalg.norm(vec1)
-    vec2_norm = np.linalg.norm(vec2)
-    if vec1_norm < 1e-6 or vec2_norm < 1e-6:
-        return np.eye(3)
-    a = vec1 / vec1_norm
-    b = vec2 / vec2_norm
-    v = np.cross(a, b)
-    c = np.dot(a, b)
-    s = np.linalg.norm(v)
-    if s < 1e-6:
-        return np.eye(3) if c > 0 else -np.eye(3)
-    kmat = np.array([[0, -v[2], v[1]], [v[2], 0, -v[0]], [-v[1], v[0], 0]])
-    return np.eye(3) + kmat + kmat.dot(kmat) * ((1 - c) / (s ** 2))
-
 def get_joint_positions(keypoints_array, keypoint_map):
     joint_positions = {}
     for bone_name, kp_indices in keypoint_map.items():
@@ -121,6 +111,14 @@ def get_joint_positions(keypoints_array, keypoint_map):
             joint_positions[bone_name] = np.array([0.0, 0.0, 0.0])
     return joint_positions
 
+def stack_joint_positions(keypoints, keypoint_map):
+    """(T, K, 3) keypoints -> (T, J, 3) positions of the joints in keypoint_map order (origin where missing)."""
+    positions = np.zeros((len(keypoints), len(keypoint_map), 3))
+    for j, kp_indices in enumerate(keypoint_map.values()):
+        if kp_indices[0] < keypoints.shape[1]:
+            positions[:, j] = keypoints[:, kp_indices[0], :3]
+    return positions
+
 # --- MAIN CONVERSION LOGIC ---
 
 def convert_json_to_bvh_bvhio(input_json_path, output_dir):
@@ -192,37 +190,34 @@ def convert_json_to_bvh_bvhio(input_json_path, output_dir):
     create_bvh_joint(h36m_joint_names_17[0])
     bvh_container.Root = bvh_joints[h36m_joint_names_17[0]]
 
-    for frame_keypoints in person_data_3d:
-        if frame_keypoints.size == 0:
+    # Bone directions for every joint and frame: parent -> joint, and for the root its first child
+    parents = h36m_skeleton_17.parents()
+    bone_ends = parents.copy()
+    root = h36m_joint_names_17[0]
+    first_child = h36m_joint_names_17.index(BVH_SKELETON[root]["children"][0])
+    bone_ends[0] = first_child
+    rest_vectors = np.array([ideal_rest_pose_vectors[name] for name in h36m_joint_names_17])
+    rest_vectors[0] = ideal_rest_pose_vectors[h36m_joint_names_17[first_child]]
+
+    detected = [keypoints.size > 0 for keypoints in person_data_3d]
+    positions = stack_joint_positions(np.stack([keypoints for keypoints in person_data_3d if keypoints.size > 0]),
+                                      KEYPOINT_MAP)
+    bone_vectors = positions - positions[:, bone_ends]
+    bone_vectors[:, 0] = -bone_vectors[:, 0] # Root: root -> first child
+    quaternions = quaternions_between(rest_vectors, bone_vectors) # (T, J, 4) for all joints at once
+
+    detected_idx = 0
+    for is_detected in detected:
+        if not is_detected:
             for joint_name in bvh_joints:
                 bvh_joints[joint_name].Keyframes.append(Pose(glm.vec3(0,0,0), glm.quat(1,0,0,0)))
             continue
 
-        current_joint_positions = get_joint_positions(frame_keypoints, KEYPOINT_MAP)
-
-        for joint_name, bvh_joint in bvh_joints.items():
-            bone_info = BVH_SKELETON[joint_name]
-            position = glm.vec3(0,0,0)
-            rotation = glm.quat(1,0,0,0)
-
-            if bone_info["parent"] is None:
-                root_pos = current_joint_positions[joint_name]
-                position = glm.vec3(root_pos[0], root_pos[1], root_pos[2])
-                
-                child_name = bone_info["children"][0]
-                current_bone_vec = current_joint_positions[child_name] - root_pos
-                rest_pose_vec = ideal_rest_pose_vectors[child_name]
-                R = rotation_matrix_from_vectors(rest_pose_vec, current_bone_vec)
-                rotation = glm.quat_cast(glm.mat3(R))
-            else:
-                parent_pos = current_joint_positions[bone_info["parent"]]
-                current_pos = current_joint_positions[joint_name]
-                current_bone_vec = current_pos - parent_pos
-                rest_pose_vec = ideal_rest_pose_vectors[joint_name]
-                R = rotation_matrix_from_vectors(rest_pose_vec, current_bone_vec)
-                rotation = glm.quat_cast(glm.mat3(R))
-            
-            bvh_joint.Keyframes.append(Pose(position, rotation))
+        for j, joint_name in enumerate(h36m_joint_names_17):
+            position = glm.vec3(*positions[detected_idx, 0]) if j == 0 else glm.vec3(0,0,0)
+            rotation = glm.quat(*quaternions[detected_idx, j])
+            bvh_joints[joint_name].Keyframes.append(Pose(position, rotation))
+        detected_idx += 1
 
     bvh_container.FrameCount = len(person_data_3d)
 
@@ -1,8 +1,12 @@
-import json
 import os
 import numpy as np
 import argparse
 
+try:
+    from .keypoint_tracks import load_tracks, write_json
+except ImportError:
+    from keypoint_tracks import load_tracks, write_json
+
 # Lightweight 19 keypoints (from documentation)
 # 0: nose, 1: neck, 2: right_shoulder, 3: right_elbow, 4: right_wrist,
 # 5: left_shoulder, 6: left_elbow, 7: left_wrist, 8: right_hip, 9: right_knee,
@@ -52,61 +56,46 @@ OPENPOSE_BODY_25_NAMES = [
 ]
 
 def convert_lightweight_to_openpose_json(input_json_path, output_dir):
-    with open(input_json_path, 'r') as f:
-        lightweight_data = json.load(f)
-
+    # Keypoints are (x, y, z) with an optional confidence that defaults to 1.0
+    tracks = load_tracks(input_json_path, num_coords=3)
+
+    # Assuming single person for now, or taking the first person if multiple
+    # (num_frames, num_lightweight_keypoints, 4) as x, y, z, confidence
+    lightweight_keypoints = np.zeros((tracks.num_frames, tracks.num_joints, 4))
+    if tracks.num_persons:
+        lightweight_keypoints[..., :3] = tracks.positions[:, 0]
+        lightweight_keypoints[..., 3] = tracks.confidence[:, 0]
+    num_lightweight = lightweight_keypoints.shape[1]
+
+    # Missing keypoints stay [0,0,0,0] (x,y,z,confidence)
+    openpose_keypoints_3d = np.zeros((tracks.num_frames, 25, 4))
+
+    # Map existing Lightweight keypoints to OpenPose format for all frames at once
+    lw_indices = np.array([lw_idx for lw_idx in LIGHTWEIGHT_TO_OPENPOSE_MAP if lw_idx < num_lightweight], dtype=int)
+    op_indices = np.array([LIGHTWEIGHT_TO_OPENPOSE_MAP[lw_idx] for lw_idx in lw_indices], dtype=int)
+    openpose_keypoints_3d[:, op_indices] = lightweight_keypoints[:, lw_indices]
+
+    # Handle OpenPose MidHip (index 8) - interpolate from RHip (9) and LHip (12)
+    # Lightweight RHip is 8, LHip is 11
+    rh_lw_idx = 8
+    lh_lw_idx = 11
+    if rh_lw_idx < num_lightweight and lh_lw_idx < num_lightweight:
+        op_midhip_idx = 8
+        openpose_keypoints_3d[:, op_midhip_idx, :3] = (lightweight_keypoints[:, rh_lw_idx, :3] + lightweight_keypoints[:, lh_lw_idx, :3]) / 2.0
+        openpose_keypoints_3d[:, op_midhip_idx, 3] = np.minimum(lightweight_keypoints[:, rh_lw_idx, 3], lightweight_keypoints[:, lh_lw_idx, 3]) # Take min confidence
+
+    # Frames without keypoints for this person get all-zero data
+    if tracks.num_persons:
+        openpose_keypoints_3d[~tracks.present[:, 0]] = 0.0
+
+    # OpenPose expects flat array: x0,y0,z0,c0, x1,y1,z1,c1, ...
     openpose_output = {
         "version": 1.1,
-        "people": []
+        "people": [{"pose_keypoints_3d": flat} for flat in openpose_keypoints_3d.reshape(tracks.num_frames, -1).tolist()]
     }
 
-    for frame_data in lightweight_data:
-        # Assuming single person for now, or taking the first person if multiple
-        if not frame_data["keypoints"] or not frame_data["keypoints"][0]:
-            # If no keypoints for this frame/person, append empty data
-            openpose_output["people"].append({"pose_keypoints_3d": [0.0] * (25 * 4)})
-            continue
-
-        lightweight_keypoints = np.array(frame_data["keypoints"][0]) # Shape (19, 3) or (19, 4) if confidence is there
-        
-        # Ensure keypoints have confidence, default to 1.0 if not present
-        if lightweight_keypoints.shape[1] == 3:
-            confidences = np.ones((lightweight_keypoints.shape[0], 1))
-            lightweight_keypoints = np.hstack((lightweight_keypoints, confidences))
-
-        openpose_keypoints_3d = [0.0] * (25 * 4) # Initialize with zeros
-
-        # Map existing Lightweight keypoints to OpenPose format
-        for lw_idx, op_idx in LIGHTWEIGHT_TO_OPENPOSE_MAP.items():
-            if lw_idx < lightweight_keypoints.shape[0]: # Ensure lightweight index is valid
-                x, y, z, c = lightweight_keypoints[lw_idx]
-                # OpenPose expects flat array: x0,y0,z0,c0, x1,y1,z1,c1, ...
-                openpose_keypoints_3d[op_idx*4 + 0] = x
-                openpose_keypoints_3d[op_idx*4 + 1] = y
-                openpose_keypoints_3d[op_idx*4 + 2] = z
-                openpose_keypoints_3d[op_idx*4 + 3] = c
-
-        # Handle OpenPose MidHip (index 8) - interpolate from RHip (9) and LHip (12)
-        # Lightweight RHip is 8, LHip is 11
-        rh_lw_idx = 8
-        lh_lw_idx = 11
-        if rh_lw_idx < lightweight_keypoints.shape[0] and lh_lw_idx < lightweight_keypoints.shape[0]:
-            rh_pos = lightweight_keypoints[rh_lw_idx, :3]
-            lh_pos = lightweight_keypoints[lh_lw_idx, :3]
-            mid_hip_pos = (rh_pos + lh_pos) / 2.0
-            mid_hip_conf = min(lightweight_keypoints[rh_lw_idx, 3], lightweight_keypoints[lh_lw_idx, 3]) # Take min confidence
-            
-            op_midhip_idx = 8
-            openpose_keypoints_3d[op_midhip_idx*4 + 0] = mid_hip_pos[0]
-            openpose_keypoints_3d[op_midhip_idx*4 + 1] = mid_hip_pos[1]
-            openpose_keypoints_3d[op_midhip_idx*4 + 2] = mid_hip_pos[2]
-            openpose_keypoints_3d[op_midhip_idx*4 + 3] = mid_hip_conf
-
-        openpose_output["people"].append({"pose_keypoints_3d": openpose_keypoints_3d})
-
     output_filename = os.path.join(output_dir, os.path.basename(input_json_path).replace('_lightweight_smoothed_3d_keypoints.json', '_openpose_3d_keypoints.json'))
-    with open(output_filename, 'w') as f:
-        json.dump(openpose_output, f, indent=4)
+    write_json(output_filename, openpose_output)
     
     print(f"Converted Lightweight JSON to OpenPose JSON and saved to {output_filename}")
 
@@ -2,7 +2,13 @@ import json
 import os
 import numpy as np
 import argparse
-import mediapipe as mp # Added import for mediapipe
+
+try:
+    from .bone_rotations import bone_euler_angles, channel_order
+    from .bvh_io import format_motion
+except ImportError:
+    from bone_rotations import bone_euler_angles, channel_order
+    from bvh_io import format_motion
 
 # Define the 19 keypoints from Lightweight Human Pose Estimation 3D Demo
 # 0: nose, 1: neck, 2: right_shoulder, 3: right_elbow, 4: right_wrist,
@@ -80,50 +86,20 @@ REST_POSE_VECTORS = {
     "RightFoot": np.array([0, -1, 0]), # Downwards along Y
 }
 
-# Function to calculate rotation matrix from one vector to another
-def rotation_matrix_from_vectors(vec1, vec2):
+def joint_positions(keypoints):
     """
-    Find the rotation matrix that aligns vec1 to vec2.
-    Handles zero vectors by returning identity.
+    Positions of every BVH joint for all frames at once.
+    keypoints: (T, K, >=3) array; a joint is the mean of its KEYPOINT_MAP keypoints that exist (origin if none).
+    Returns {bone_name: (T, 3)}.
     """
-    vec1_norm = np.linalg.norm(vec1)
-    vec2_norm = np.linalg.norm(vec2)
-
-    if vec1_norm < 1e-6 or vec2_norm < 1e-6: # Handle near-zero vectors
-        return np.eye(3)
-
-    a = vec1 / vec1_norm
-    b = vec2 / vec2_norm
-    
-    v = np.cross(a, b)
-    c = np.dot(a, b)
-    s = np.linalg.norm(v)
-    
-    if s < 1e-6: # Vectors are parallel or anti-parallel
-        return np.eye(3) if c > 0 else -np.eye(3) # Same or opposite direction
-
-    kmat = np.array([ [0, -v[2], v[1]],
-                        [v[2], 0, -v[0]],
-                        [-v[1], v[0], 0] ])
-    
-    rotation_matrix = np.eye(3) + kmat + kmat.dot(kmat) * ((1 - c) / (s ** 2))
-    return rotation_matrix
-
-# Function to convert rotation matrix to Euler angles (ZXY order for BVH)
-def rotation_matrix_to_euler_zxy(R):
-    sy = np.sqrt(R[0,0] * R[0,0] +  R[1,0] * R[1,0])
-    singular = sy < 1e-6
-
-    if not singular:
-        x = np.arctan2(R[2,1] , R[2,2])
-        y = np.arctan2(-R[2,0], sy)
-        z = np.arctan2(R[1,0], R[0,0])
-    else:
-        x = np.arctan2(-R[1,2], R[1,1])
-        y = np.arctan2(-R[2,0], sy)
-        z = 0
-
-    return np.degrees(z), np.degrees(x), np.degrees(y) # Z, X, Y
+    positions = {}
+    for bone_name, kp_indices in KEYPOINT_MAP.items():
+        valid_kp_indices = [idx for idx in kp_indices if idx < keypoints.shape[1]]
+        if valid_kp_indices:
+            positions[bone_name] = keypoints[:, valid_kp_indices, :3].mean(axis=1)
+        else:
+            positions[bone_name] = np.zeros((len(keypoints), 3))
+    return positions
 
 def convert_to_bvh(input_json_path, output_dir):
     with open(input_json_path, 'r') as f:
@@ -169,33 +145,7 @@ def convert_to_bvh(input_json_path, output_dir):
             continue
 
         offsets = {}
-        joint_positions_map = {} # To store calculated 3D positions for each "bone"
-        
-        # Calculate initial positions for BVH joints based on keypoints
-        for bone_name, kp_indices in KEYPOINT_MAP.items():
-            # Ensure keypoint indices are within bounds of first_valid_frame_keypoints
-            valid_kp_indices = [idx for idx in kp_indices if idx < first_valid_frame_keypoints.shape[0]]
-            
-            if not valid_kp_indices: # If no valid keypoints for this bone
-                joint_positions_map[bone_name] = np.array([0.0, 0.0, 0.0]) # Default to origin
-                continue
-
-            if len(valid_kp_indices) == 1:
-                joint_positions_map[bone_name] = first_valid_frame_keypoints[valid_kp_indices[0], :3]
-            elif len(valid_kp_indices) == 2:
-                joint_positions_map[bone_name] = (first_valid_frame_keypoints[valid_kp_indices[0], :3] + first_valid_frame_keypoints[valid_kp_indices[1], :3]) / 2
-            else: # Handle special cases like Spine, Hips, Neck, Head (using hardcoded indices from 19-keypoint array)
-                if bone_name == "Head":
-                    joint_positions_map[bone_name] = first_valid_frame_keypoints[0, :3] # Nose (index 0)
-                elif bone_name == "Spine":
-                    # Midpoint of Neck and Hips
-                    neck_pos = first_valid_frame_keypoints[1, :3]
-                    hips_mid_pos = (first_valid_frame_keypoints[8, :3] + first_valid_frame_keypoints[11, :3]) / 2
-                    joint_positions_map[bone_name] = (neck_pos + hips_mid_pos) / 2
-                elif bone_name == "Hips":
-                    joint_positions_map[bone_name] = (first_valid_frame_keypoints[8, :3] + first_valid_frame_keypoints[11, :3]) / 2 # Mid-hip (indices 8, 11)
-                elif bone_name == "Neck":
-                    joint_positions_map[bone_name] = first_valid_frame_keypoints[1, :3] # Neck (index 1)
+        joint_positions_map = {name: pos[0] for name, pos in joint_positions(first_valid_frame_keypoints[None]).items()}
 
         # Calculate offsets for BVH HIERARCHY section
         # For MediaPipe world_landmarks, Hips is already at (0,0,0) relative to its own coordinate system
@@ -248,84 +198,35 @@ def convert_to_bvh(input_json_path, output_dir):
         bvh_motion.append(f"Frames: {len(person_data_3d)}")
         bvh_motion.append(f"Frame Time: 0.033333") # Assuming 30 FPS (1/30)
 
-        # Process each frame for this person
-        for frame_idx, frame_data_person in enumerate(person_data_3d):
-            if not frame_data_person["keypoints"]: # If this person is not detected in this frame
-                # Append default pose (T-pose) if person not detected
-                motion_line = []
-                for bone_name, bone_info in BVH_SKELETON.items():
-                    if bone_info["parent"] is None: # Root
-                        motion_line.extend([0.0, 0.0, 0.0]) # Default root position
-                    motion_line.extend([0.0, 0.0, 0.0]) # Default rotations
-                bvh_motion.append(" ".join(f"{val:.6f}" for val in motion_line))
-                continue
-
-            person_keypoints_current_frame = np.array(frame_data_person["keypoints"][0]) 
-            
-            current_frame_motion_data = []
-
-            # Calculate current joint positions for this frame
-            current_joint_positions_map = {}
-            for bone_name, kp_indices in KEYPOINT_MAP.items():
-                # Ensure keypoint indices are within bounds of person_keypoints_current_frame
-                valid_kp_indices = [idx for idx in kp_indices if idx < person_keypoints_current_frame.shape[0]]
-                
-                if not valid_kp_indices: # If no valid keypoints for this bone
-                    current_joint_positions_map[bone_name] = np.array([0.0, 0.0, 0.0]) # Default to origin
-                    continue
+        # Stack the detected frames; frames without this person keep the default pose (all zeros)
+        detected = np.array([bool(frame_data_person["keypoints"]) for frame_data_person in person_data_3d])
+        keypoints = np.array([frame_data_person["keypoints"][0] for frame_data_person in person_data_3d
+                              if frame_data_person["keypoints"]], dtype=np.float64)
+        current_joint_positions_map = joint_positions(keypoints)
 
-                if len(valid_kp_indices) == 1:
-                    current_joint_positions_map[bone_name] = person_keypoints_current_frame[valid_kp_indices[0], :3]
-                elif len(valid_kp_indices) == 2:
-                    current_joint_positions_map[bone_name] = (person_keypoints_current_frame[valid_kp_indices[0], :3] + person_keypoints_current_frame[valid_kp_indices[1], :3]) / 2
-                else: # Handle special cases like Spine, Hips, Neck, Head (using hardcoded indices from 19-keypoint array)
-                    if bone_name == "Head":
-                        current_joint_positions_map[bone_name] = person_keypoints_current_frame[0, :3] # Nose (index 0)
-                    elif bone_name == "Spine":
-                        # Midpoint of Neck and Hips
-                        neck_pos = person_keypoints_current_frame[1, :3]
-                        hips_mid_pos = (person_keypoints_current_frame[8, :3] + person_keypoints_current_frame[11, :3]) / 2
-                        current_joint_positions_map[bone_name] = (neck_pos + hips_mid_pos) / 2
-                    elif bone_name == "Hips":
-                        current_joint_positions_map[bone_name] = (person_keypoints_current_frame[8, :3] + person_keypoints_current_frame[11, :3]) / 2 # Mid-hip (indices 8, 11)
-                    elif bone_name == "Neck":
-                        current_joint_positions_map[bone_name] = person_keypoints_current_frame[1, :3] # Neck (index 1)
-
-            # Calculate rotations for each bone
-            for bone_name, bone_info in BVH_SKELETON.items():
-                if bone_info["parent"] is None: # Root bone
-                    # Root position is absolute
-                    # MediaPipe world_landmarks are relative to Hips, so Hips position is its own absolute position
-                    root_pos = current_joint_positions_map["Hips"]
-                    current_frame_motion_data.extend(root_pos.tolist()) # Use actual Hips position
-                    
-                    # Root rotation (e.g., based on Hips to Spine direction)
-                    if "Spine" in BVH_SKELETON["Hips"]["children"]:
-                        current_bone_vec = current_joint_positions_map["Spine"] - root_pos
-                        rest_pose_vec = REST_POSE_VECTORS["Spine"]
-                        
-                        R = rotation_matrix_from_vectors(rest_pose_vec, current_bone_vec)
-                        rot_z, rot_x, rot_y = rotation_matrix_to_euler_zxy(R)
-                        current_frame_motion_data.extend([rot_z, rot_x, rot_y]) # ZXY order
-                    else:
-                        current_frame_motion_data.extend([0.0, 0.0, 0.0]) # Default if no spine
+        # Solve every bone for all detected frames at once
+        motion_columns = []
+        for bone_name, bone_info in BVH_SKELETON.items():
+            order = channel_order(bone_info["channels"])
+            if bone_info["parent"] is None: # Root bone
+                # Root position is absolute; its rotation follows the Hips to Spine direction
+                root_pos = current_joint_positions_map[bone_name]
+                motion_columns.append(root_pos)
+                if "Spine" in bone_info["children"]:
+                    current_bone_vec = current_joint_positions_map["Spine"] - root_pos
+                    motion_columns.append(bone_euler_angles(REST_POSE_VECTORS["Spine"], current_bone_vec, order))
                 else:
-                    # For child bones, calculate rotation relative to parent
-                    parent_pos = current_joint_positions_map[bone_info["parent"]]
-                    current_pos = current_joint_positions_map[bone_name]
-                    
-                    # Direction vector from parent to current bone
-                    current_bone_vec = current_pos - parent_pos
-                    
-                    # Get rest pose vector for this bone
-                    rest_pose_vec = REST_POSE_VECTORS[bone_name]
-                    
-                    R = rotation_matrix_from_vectors(rest_pose_vec, current_bone_vec)
-                    rot_z, rot_x, rot_y = rotation_matrix_to_euler_zxy(R)
-                    current_frame_motion_data.extend([rot_z, rot_x, rot_y]) # ZXY order
+                    motion_columns.append(np.zeros((len(keypoints), 3))) # Default if no spine
+            else:
+                # Rotation taking the rest pose direction onto the parent to bone direction
+                current_bone_vec = current_joint_positions_map[bone_name] - current_joint_positions_map[bone_info["parent"]]
+                motion_columns.append(bone_euler_angles(REST_POSE_VECTORS[bone_name], current_bone_vec, order))
+
+        motion = np.zeros((len(person_data_3d), sum(column.shape[1] for column in motion_columns)))
+        motion[detected] = np.concatenate(motion_columns, axis=1)
 
-            # This line should be outside the bone iteration loop, once per frame
-            bvh_motion.append(" ".join(f"{val:.6f}" for val in current_frame_motion_data))
+        # Format all MOTION rows at once instead of value by value
+        bvh_motion.append(format_motion(motion))
 
         # Write to file for this person
         # Get the filename without extension
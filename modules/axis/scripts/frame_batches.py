@@ -0,0 +1,123 @@
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+# Offline frame feeding for batched per-frame models (e.g. YOLO-pose):
+# frames are decoded on a background thread into a bounded queue, so decoding overlaps inference,
+# and every frame is decoded once even when processing chunks overlap.
+
+_END = object()
+
+
+class FramePrefetcher:
+    """
+    Reads frames [start_frame, end_frame) of an opened cv2.VideoCapture on a background thread.
+
+    Unlike the live FrameGrabber, no frame is ever dropped: the reader blocks once `max_queue`
+    frames are waiting. Iterate over it for (frame_index, frame) pairs or use batches().
+
+    Like FrameGrabber, it owns the capture: the reader thread releases it when it exits, so the
+    capture is never released while a read() is still in progress.
+    """
+    def __init__(self, capture, start_frame=0, end_frame=None, max_queue=64):
+        self.capture = capture
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._error = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        if self.start_frame:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        # Wait for room, but give up once the consumer has closed the prefetcher
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        frame_index = self.start_frame
+        try:
+            while self.end_frame is None or frame_index < self.end_frame:
+                ok, frame = self.capture.read()
+                if not ok or not self._put((frame_index, frame)):
+                    break
+                frame_index += 1
+        except Exception as e: # Re-raised on the consumer side
+            self._error = e
+        finally:
+            self.capture.release()
+        self._put(_END)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def batches(self, batch_size):
+        """Yields (frame_indices, frames) lists of up to `batch_size` consecutive frames."""
+        indices, frames = [], []
+        for frame_index, frame in self:
+            indices.append(frame_index)
+            frames.append(frame)
+            if len(frames) == batch_size:
+                yield indices, frames
+                indices, frames = [], []
+        if frames:
+            yield indices, frames
+
+    def close(self):
+        """Stops the reader. The capture is released by the reader thread, even if it outlives the 1 s wait."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        elif self._thread.ident is None: # Never started
+            self.capture.release()
+
+
+def collect_chunks(detections, chunks):
+    """
+    Assigns per-frame detections to overlapping chunks.
+
+    Args:
+        detections: Iterable of (frame_index, keypoints, boxes) in frame order
+        chunks: (start_frame, end_frame) pairs as returned by chunk_video()
+
+    Yields (chunk_idx, frame_indices, keypoints, boxes) as soon as a chunk's last frame has arrived.
+    Chunks cut short by the end of the stream are yielded at the end if they received any frame.
+    """
+    pending = {chunk_idx: ([], [], []) for chunk_idx in range(len(chunks))}
+    starts = np.array([start for start, _ in chunks])
+    ends = np.array([end for _, end in chunks])
+    for frame_index, keypoints, boxes in detections:
+        for chunk_idx in np.flatnonzero((starts <= frame_index) & (frame_index < ends)):
+            frame_indices, chunk_keypoints, chunk_boxes = pending[chunk_idx]
+            frame_indices.append(frame_index)
+            chunk_keypoints.append(keypoints)
+            chunk_boxes.append(boxes)
+            if frame_index == ends[chunk_idx] - 1:
+                yield (int(chunk_idx),) + pending.pop(chunk_idx)
+    for chunk_idx, (frame_indices, chunk_keypoints, chunk_boxes) in pending.items():
+        if frame_indices:
+            yield chunk_idx, frame_indices, chunk_keypoints, chunk_boxes
@@ -0,0 +1,157 @@
+import warnings
+
+import cv2
+import numpy as np
+
+# Detect-then-track for per-frame keypoint detectors.
+#
+# The detector runs on a keyframe; on the following frames every person's keypoints are propagated
+# either with pyramidal Lucas-Kanade optical flow ("lk") or by constant-velocity prediction
+# ("constant_velocity"), and boxes follow the median keypoint motion. Keypoint confidence decays
+# while tracking, and the detector runs again when a person's tracked confidence drops below
+# `min_confidence`, when the tracked skeleton's extent stops overlapping its keyframe extent
+# (moved along with the person) by `min_box_iou`, or after `max_track_frames` frames.
+
+TRACKING_METHODS = ("lk", "constant_velocity")
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU of (N, 4) and (M, 4) x1, y1, x2, y2 boxes -> (N, M)."""
+    boxes_a, boxes_b = np.asarray(boxes_a, dtype=np.float64), np.asarray(boxes_b, dtype=np.float64)
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:4], boxes_b[None, :, 2:4])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=-1)
+    area_a = np.prod(boxes_a[:, 2:4] - boxes_a[:, :2], axis=-1)
+    area_b = np.prod(boxes_b[:, 2:4] - boxes_b[:, :2], axis=-1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def keypoint_extent(positions, mask):
+    """(N, K, 2) keypoint positions -> (N, 4) tight boxes of the keypoints selected by the (N, K) mask."""
+    x, y = positions[..., 0], positions[..., 1]
+    extent = np.stack([np.where(mask, x, np.inf).min(axis=1), np.where(mask, y, np.inf).min(axis=1),
+                       np.where(mask, x, -np.inf).max(axis=1), np.where(mask, y, -np.inf).max(axis=1)], axis=1)
+    # Persons without any selected keypoint get an empty box
+    return np.where(mask.any(axis=1)[:, None], extent, 0.0)
+
+
+def match_boxes(previous_boxes, boxes, min_iou=0.1):
+    """Greedy IoU matching. Returns, for each box, the index of its previous box or -1."""
+    matches = np.full(len(boxes), -1)
+    if not len(previous_boxes) or not len(boxes):
+        return matches
+    iou = box_iou(boxes[:, :4], previous_boxes[:, :4])
+    for _ in range(min(iou.shape)):
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < min_iou:
+            break
+        matches[i] = j
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return matches
+
+
+class KeypointTracker:
+    """
+    Runs `detect(frame) -> (keypoints (N, K, 3), boxes (N, 5))` on keyframes and tracks the
+    keypoints in between. Call update() once per frame, in order.
+    """
+    def __init__(self, method="lk", min_confidence=0.3, min_box_iou=0.5, max_track_frames=30,
+                 confidence_decay=0.98, min_keypoint_confidence=0.3, lk_window=21, lk_levels=3):
+        if method not in TRACKING_METHODS:
+            raise ValueError(f"Unknown tracking method: {method}. Available: {list(TRACKING_METHODS)}")
+        self.method = method
+        self.min_confidence = min_confidence
+        self.min_box_iou = min_box_iou
+        self.max_track_frames = max_track_frames
+        self.confidence_decay = confidence_decay
+        self.min_keypoint_confidence = min_keypoint_confidence
+        self.lk_params = dict(winSize=(lk_window, lk_window), maxLevel=lk_levels,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01))
+        self.detector_calls = 0
+        self.frames = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the tracked persons; the next frame is a keyframe."""
+        self.keypoints = None
+        self.boxes = None
+        self._velocity = None
+        self._previous_gray = None
+        self._keyframe = None # (frame number, keypoints, boxes) of the last detection
+        self._skeleton = None # Keypoints confidently detected on the keyframe; only these are judged
+        self._reference_extent = None
+        self._frames_since_detection = 0
+
+    def update(self, frame, detect):
+        """Returns the (N, K, 3) keypoints and (N, 5) boxes of this frame, detected or tracked."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if self.method == "lk" and frame.ndim == 3 else frame
+        tracked = None
+        if self.keypoints is not None and len(self.keypoints) and self._frames_since_detection < self.max_track_frames:
+            tracked = self._track(gray)
+        if tracked is None:
+            self._detect(frame, detect)
+        else:
+            self.keypoints, self.boxes = tracked
+            self._frames_since_detection += 1
+        self._previous_gray = gray
+        self.frames += 1
+        return self.keypoints, self.boxes
+
+    def _detect(self, frame, detect):
+        keypoints, boxes = detect(frame)
+        keypoints = np.asarray(keypoints, dtype=np.float64)
+        # reshape(-1) can't infer the joint count of a frame without detections
+        keypoints = keypoints.reshape(len(keypoints), keypoints.shape[1] if keypoints.ndim == 3 else 0, 3)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(len(boxes), 5)
+        self.detector_calls += 1
+
+        # Constant velocity from the previous keyframe, for persons matched by box overlap
+        velocity = np.zeros(keypoints.shape[:2] + (2,))
+        if self._keyframe is not None and self.method == "constant_velocity":
+            keyframe_number, keyframe_keypoints, keyframe_boxes = self._keyframe
+            matches = match_boxes(keyframe_boxes, boxes)
+            matched = matches >= 0
+            if matched.any() and keyframe_keypoints.shape[1] == keypoints.shape[1]:
+                elapsed = max(self.frames - keyframe_number, 1)
+                velocity[matched] = (keypoints[matched, :, :2] - keyframe_keypoints[matches[matched], :, :2]) / elapsed
+
+        self.keypoints, self.boxes, self._velocity = keypoints, boxes, velocity
+        self._keyframe = (self.frames, keypoints, boxes)
+        self._skeleton = keypoints[..., 2] > self.min_keypoint_confidence
+        self._reference_extent = keypoint_extent(keypoints[..., :2], self._skeleton)
+        self._frames_since_detection = 0
+
+    def _track(self, gray):
+        """Propagates the current persons to this frame. Returns None when the detector should run instead."""
+        previous = self.keypoints
+        positions = previous[..., :2]
+        if self.method == "lk":
+            points = positions.reshape(-1, 1, 2).astype(np.float32)
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(self._previous_gray, gray, points, None, **self.lk_params)
+            found = status.reshape(previous.shape[:2]).astype(bool)
+            new_positions = np.where(found[..., None], moved.reshape(positions.shape), positions)
+            confidence = np.where(found, previous[..., 2] * self.confidence_decay, 0.0)
+        else:
+            new_positions = positions + self._velocity
+            confidence = previous[..., 2] * self.confidence_decay
+        keypoints = np.concatenate([new_positions, confidence[..., None]], axis=-1)
+
+        # Boxes follow the median motion of each person's keyframe keypoints that are still found
+        skeleton = self._skeleton & (confidence > 0)
+        motion = np.where(skeleton[..., None], new_positions - positions, np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) # Persons with every keypoint lost
+            shift = np.nan_to_num(np.nanmedian(motion, axis=1))
+        boxes = self.boxes.copy()
+        boxes[:, :4] += np.tile(shift, 2)
+        self._reference_extent = self._reference_extent + np.tile(shift, 2)
+
+        # Mean confidence over the keyframe skeleton (lost keypoints count as 0)
+        person_confidence = (np.where(self._skeleton, confidence, 0.0).sum(axis=1)
+                             / np.maximum(self._skeleton.sum(axis=1), 1))
+        overlap = np.diag(box_iou(keypoint_extent(new_positions, skeleton), self._reference_extent))
+        if (person_confidence < self.min_confidence).any() or (overlap < self.min_box_iou).any():
+            return None
+        return keypoints, boxes
@@ -0,0 +1,347 @@
+"""
+Columnar keypoint track container shared by the pose scripts.
+
+A KeypointTracks holds every keypoint of a clip as dense arrays:
+
+    positions     (T, P, J, C) float32   coordinates (C = 2 for image keypoints, 3 for 3D)
+    confidence    (T, P, J)    float32   per-keypoint confidence / visibility
+    present       (T, P)       bool      whether person slot p was detected in frame t
+    frame_indices (T,)         int64     source video frame of each row
+    boxes         (T, P, 5)    float32   optional detector boxes (x1, y1, x2, y2, score)
+
+plus a header (skeleton layout name, joint names, parent indices, fps, edge JSON layout).
+
+Tracks are stored as `.npz`, or as a directory of `.npy` files that can be memory-mapped.
+The JSON layouts the scripts used to exchange are only read and written at the edges:
+
+    frame list  [{"frame_idx": t, "keypoints": [[[x, y, z, c], ...] per person]}]
+    YOLO        [{"frame_idx": t, "persons": [{"bbox": [...], "keypoints": [[x, y, c], ...]}]}]
+    named       {"fps": f, "frames": [{"frame_index": t, "keypoints_3d": [{"name", "x", "y", "z", "visibility"}]}]}
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Ultralytics YOLO-pose keypoint order
+COCO_JOINTS = [
+    "nose", "left_eye", "right_eye", "left_ear", "right_ear",
+    "left_shoulder", "right_shoulder", "left_elbow", "right_elbow", "left_wrist", "right_wrist",
+    "left_hip", "right_hip", "left_knee", "right_knee", "left_ankle", "right_ankle",
+]
+# VideoPose3D's 17-joint Human3.6M skeleton
+H36M_JOINTS = [
+    "hip", "right_hip", "right_knee", "right_foot", "left_hip", "left_knee", "left_foot",
+    "spine", "thorax", "neck_nose", "head",
+    "left_shoulder", "left_elbow", "left_wrist", "right_shoulder", "right_elbow", "right_wrist",
+]
+H36M_PARENTS = [-1, 0, 1, 2, 0, 4, 5, 0, 7, 8, 9, 8, 11, 12, 8, 14, 15]
+
+_ARRAYS = ("positions", "confidence", "present", "frame_indices", "boxes")
+
+
+@dataclass
+class KeypointTracks:
+    positions: np.ndarray
+    confidence: np.ndarray
+    present: np.ndarray
+    frame_indices: np.ndarray
+    joint_names: List[str] = field(default_factory=list)
+    parents: Optional[List[int]] = None
+    layout: str = "custom"
+    fps: Optional[float] = None
+    boxes: Optional[np.ndarray] = None
+    # Edge JSON layout these tracks were read from / are written back as
+    json_layout: str = "frame_list"
+
+    def __post_init__(self):
+        if not self.joint_names:
+            self.joint_names = [f"joint{j}" for j in range(self.positions.shape[2])]
+
+    @property
+    def num_frames(self) -> int:
+        return self.positions.shape[0]
+
+    @property
+    def num_persons(self) -> int:
+        return self.positions.shape[1]
+
+    @property
+    def num_joints(self) -> int:
+        return self.positions.shape[2]
+
+    @property
+    def num_coords(self) -> int:
+        return self.positions.shape[3]
+
+    @classmethod
+    def empty(cls, num_frames: int, num_persons: int, num_joints: int, num_coords: int,
+              dtype=np.float32, **header) -> "KeypointTracks":
+        """Zero-filled tracks with no person present."""
+        return cls(positions=np.zeros((num_frames, num_persons, num_joints, num_coords), dtype=dtype),
+                   confidence=np.zeros((num_frames, num_persons, num_joints), dtype=dtype),
+                   present=np.zeros((num_frames, num_persons), dtype=bool),
+                   frame_indices=np.arange(num_frames, dtype=np.int64), **header)
+
+    @classmethod
+    def from_sequence(cls, positions: np.ndarray, confidence: Optional[np.ndarray] = None, frame_indices=None,
+                      dtype=np.float32, **header) -> "KeypointTracks":
+        """Single-person tracks from a (T, J, C) array (confidence defaults to 1.0)."""
+        positions = np.asarray(positions, dtype=dtype)[:, None]
+        num_frames, _, num_joints, _ = positions.shape
+        if confidence is None:
+            confidence = np.ones((num_frames, 1, num_joints), dtype=dtype)
+        else:
+            confidence = np.asarray(confidence, dtype=dtype).reshape(num_frames, 1, num_joints)
+        if frame_indices is None:
+            frame_indices = np.arange(num_frames)
+        return cls(positions=positions, confidence=confidence, present=np.ones((num_frames, 1), dtype=bool),
+                   frame_indices=np.asarray(frame_indices, dtype=np.int64), **header)
+
+    @classmethod
+    def from_ragged(cls, frames: Sequence[np.ndarray], num_coords: int, frame_indices=None,
+                    boxes: Optional[Sequence[np.ndarray]] = None, dtype=np.float32, **header) -> "KeypointTracks":
+        """
+        Builds tracks from per-frame (persons, joints, values) arrays whose person count varies.
+
+        The first `num_coords` values of each keypoint are coordinates; the next one (if any) is the
+        confidence, which defaults to 1.0 when missing.
+        """
+        counts = [len(frame) for frame in frames]
+        num_persons = max(counts, default=0)
+        first = next((np.asarray(frame) for frame in frames if len(frame)), None)
+        num_joints = first.shape[1] if first is not None else len(header.get("joint_names") or [])
+        tracks = cls.empty(len(frames), num_persons, num_joints, num_coords, dtype=dtype, **header)
+        if frame_indices is not None:
+            tracks.frame_indices = np.asarray(frame_indices, dtype=np.int64)
+        if boxes is not None:
+            tracks.boxes = np.zeros((len(frames), num_persons, 5), dtype=dtype)
+
+        if num_persons:
+            # Stack every detection once, then scatter it into (frame, person) slots
+            frame_of = np.repeat(np.arange(len(frames)), counts)
+            person_of = np.concatenate([np.arange(count) for count in counts])
+            values = np.concatenate([np.asarray(frame, dtype=np.float64).reshape(len(frame), num_joints, -1)
+                                     for frame in frames if len(frame)])
+            tracks.positions[frame_of, person_of] = values[..., :num_coords]
+            if values.shape[-1] > num_coords:
+                tracks.confidence[frame_of, person_of] = values[..., num_coords]
+            else:
+                tracks.confidence[frame_of, person_of] = 1.0
+            tracks.present[frame_of, person_of] = True
+            if boxes is not None:
+                stacked = np.concatenate([np.asarray(b, dtype=np.float64).reshape(-1, 5) for b in boxes if len(b)])
+                tracks.boxes[frame_of, person_of] = stacked
+        return tracks
+
+    def header(self) -> Dict:
+        return {"version": FORMAT_VERSION, "joint_names": list(self.joint_names), "parents": self.parents,
+                "layout": self.layout, "fps": self.fps, "json_layout": self.json_layout}
+
+    def person(self, p: int = 0) -> np.ndarray:
+        """(T, J, C) positions of one person slot (zeros where the person is absent)."""
+        return self.positions[:, p]
+
+    def with_positions(self, positions: np.ndarray) -> "KeypointTracks":
+        """A copy of these tracks with new positions (same shape) and the same header."""
+        return replace(self, positions=np.asarray(positions, dtype=self.positions.dtype))
+
+    def _rows(self, decimals: Optional[int]):
+        """(T, P, J, C + 1) coordinates + confidence as nested Python lists for JSON export."""
+        values = np.concatenate([self.positions, self.confidence[..., None]], axis=-1).astype(np.float64)
+        if decimals is not None:
+            values = values.round(decimals)
+        return values.tolist()
+
+    # --- JSON edges ---
+
+    @classmethod
+    def from_frame_list(cls, frames: List[Dict], num_coords: int = 3, key: str = "keypoints",
+                        frame_key: str = "frame_idx", **header) -> "KeypointTracks":
+        ragged = [np.asarray(frame[key], dtype=np.float64) for frame in frames]
+        frame_indices = [frame.get(frame_key, t) for t, frame in enumerate(frames)]
+        return cls.from_ragged(ragged, num_coords, frame_indices=frame_indices, **header)
+
+    def to_frame_list(self, key: str = "keypoints", frame_key: str = "frame_idx",
+                      decimals: Optional[int] = 6) -> List[Dict]:
+        rows = self._rows(decimals)
+        present = self.present.tolist()
+        return [{frame_key: int(frame_index), key: [person for person, here in zip(frame, flags) if here]}
+                for frame_index, frame, flags in zip(self.frame_indices.tolist(), rows, present)]
+
+    @classmethod
+    def from_yolo_frames(cls, frames: List[Dict], **header) -> "KeypointTracks":
+        header.setdefault("layout", "coco")
+        header.setdefault("joint_names", COCO_JOINTS)
+        header.setdefault("json_layout", "yolo")
+        ragged = [np.asarray([person["keypoints"] for person in frame["persons"]], dtype=np.float64)
+                  for frame in frames]
+        boxes = [np.asarray([person["bbox"] for person in frame["persons"]], dtype=np.float64) for frame in frames]
+        return cls.from_ragged(ragged, 2, frame_indices=[frame["frame_idx"] for frame in frames],
+                               boxes=boxes, **header)
+
+    def to_yolo_frames(self, decimals: Optional[int] = 6) -> List[Dict]:
+        rows = self._rows(decimals)
+        boxes = None
+        if self.boxes is not None:
+            boxes = self.boxes.astype(np.float64)
+            boxes = (boxes.round(decimals) if decimals is not None else boxes).tolist()
+        frames = []
+        for t, frame_index in enumerate(self.frame_indices.tolist()):
+            persons = [{"bbox": boxes[t][p] if boxes is not None else [], "keypoints": rows[t][p]}
+                       for p in np.flatnonzero(self.present[t])]
+            frames.append({"frame_idx": int(frame_index), "persons": persons})
+        return frames
+
+    @classmethod
+    def from_named_frames(cls, data: Dict, **header) -> "KeypointTracks":
+        frames = data["frames"]
+        first = next((frame["keypoints_3d"] for frame in frames if frame["keypoints_3d"]), [])
+        header.setdefault("joint_names", [kp["name"] for kp in first])
+        header.setdefault("fps", data.get("fps"))
+        header.setdefault("json_layout", "named")
+        ragged = [np.asarray([[[kp["x"], kp["y"], kp["z"], kp["visibility"]] for kp in frame["keypoints_3d"]]]
+                             if frame["keypoints_3d"] else np.zeros((0, len(first), 4)))
+                  for frame in frames]
+        return cls.from_ragged(ragged, 3, frame_indices=[frame["frame_index"] for frame in frames], **header)
+
+    def to_named_frames(self, decimals: Optional[int] = 6) -> Dict:
+        """Single-person named layout (person slot 0), as written by the MediaPipe script."""
+        rows = self._rows(decimals)
+        names = self.joint_names
+        frames = []
+        for t, frame_index in enumerate(self.frame_indices.tolist()):
+            keypoints = []
+            if self.num_persons and self.present[t, 0]:
+                keypoints = [{"name": name, "x": x, "y": y, "z": z, "visibility": c}
+                             for name, (x, y, z, c) in zip(names, rows[t][0])]
+            frames.append({"frame_index": int(frame_index), "keypoints_3d": keypoints})
+        return {"fps": self.fps, "frames": frames}
+
+    # --- Binary storage ---
+
+    def save(self, path: str, source: Optional[Dict] = None):
+        """
+        Saves to `path.npz`, or to a directory of memory-mappable `.npy` files for any other path.
+
+        Args:
+            source: stamp of the file these tracks were also written to (see save_tracks)
+        """
+        arrays = {name: getattr(self, name) for name in _ARRAYS if getattr(self, name) is not None}
+        header = self.header()
+        if source is not None:
+            header["source"] = source
+        if path.endswith(".npz"):
+            np.savez(path, header=np.array(json.dumps(header)), **arrays)
+            return
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        with open(os.path.join(path, "header.json"), "w") as f:
+            json.dump(header, f)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> "KeypointTracks":
+        """Loads tracks saved by save(). Directory tracks can be memory-mapped with mmap_mode="r"."""
+        if os.path.isdir(path):
+            with open(os.path.join(path, "header.json")) as f:
+                header = json.load(f)
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                      for name in _ARRAYS if os.path.exists(os.path.join(path, f"{name}.npy"))}
+        else:
+            with np.load(path) as data:
+                header = json.loads(str(data["header"]))
+                arrays = {name: data[name] for name in _ARRAYS if name in data.files}
+        if header.pop("version", None) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported keypoint track format in {path}")
+        header.pop("source", None)
+        return cls(**arrays, **header)
+
+
+def json_layout(data) -> str:
+    """Which of the JSON layouts above `data` uses: "named", "yolo" or "frame_list"."""
+    if isinstance(data, dict):
+        return "named"
+    if data and "persons" in data[0]:
+        return "yolo"
+    return "frame_list"
+
+
+def tracks_from_json(data, num_coords: int = 3) -> KeypointTracks:
+    """
+    Args:
+        num_coords: coordinates per keypoint in frame-list JSON (the rest is confidence)
+    """
+    layout = json_layout(data)
+    if layout == "named":
+        return KeypointTracks.from_named_frames(data)
+    if layout == "yolo":
+        return KeypointTracks.from_yolo_frames(data)
+    return KeypointTracks.from_frame_list(data, num_coords=num_coords)
+
+
+def tracks_to_json(tracks: KeypointTracks, layout: Optional[str] = None):
+    layout = layout or tracks.json_layout
+    if layout == "named":
+        return tracks.to_named_frames()
+    if layout == "yolo":
+        return tracks.to_yolo_frames()
+    return tracks.to_frame_list()
+
+
+def load_tracks(path: str, num_coords: int = 3, mmap_mode: Optional[str] = None,
+                prefer_npz: bool = True) -> KeypointTracks:
+    """
+    Loads tracks from `.npz`, a track directory, or any of the JSON layouts above.
+
+    For a `.json` path, the `.npz` written next to it by save_tracks() is loaded instead unless
+    `prefer_npz` is False. The `.npz` is only used while the JSON still has the size and
+    modification time it had when both were written.
+    """
+    if not path.endswith(".json"):
+        return KeypointTracks.load(path, mmap_mode=mmap_mode)
+    npz_path = tracks_path(path)
+    if prefer_npz and os.path.exists(npz_path) and _sidecar_source(npz_path) == file_stamp(path):
+        return KeypointTracks.load(npz_path)
+    with open(path, "r") as f:
+        return tracks_from_json(json.load(f), num_coords=num_coords)
+
+
+def write_json(path: str, data):
+    """Writes edge JSON compactly (no indentation)."""
+    with open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def file_stamp(path: str) -> Dict:
+    """Size and modification time of a file, as recorded in the `.npz` next to an edge JSON."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _sidecar_source(npz_path: str) -> Optional[Dict]:
+    with np.load(npz_path) as data:
+        return json.loads(str(data["header"])).get("source")
+
+
+def tracks_path(json_path: str) -> str:
+    """The `.npz` written next to an edge JSON file."""
+    return os.path.splitext(json_path)[0] + ".npz"
+
+
+def save_tracks(path: str, tracks: KeypointTracks, layout: Optional[str] = None):
+    """
+    Saves tracks to `path`. For a `.json` path the edge JSON (in `layout`, by default the layout
+    the tracks were read from) is written together with the `.npz` next to it, so later stages
+    can skip JSON parsing.
+    """
+    if not path.endswith(".json"):
+        tracks.save(path)
+        return
+    write_json(path, tracks_to_json(tracks, layout))
+    tracks.save(tracks_path(path), source=file_stamp(path))
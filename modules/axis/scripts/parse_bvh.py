@@ -3,152 +3,158 @@ import os
 import numpy as np
 import argparse
 
-def parse_bvh(bvh_file_path, output_dir):
+try:
+    from .bvh_io import read_bvh
+except ImportError:
+    from bvh_io import read_bvh
+
+# Channel name -> axis index (X=0, Y=1, Z=2)
+ROTATION_CHANNELS = {"Xrotation": 0, "Yrotation": 1, "Zrotation": 2}
+POSITION_CHANNELS = {"Xposition": 0, "Yposition": 1, "Zposition": 2}
+
+
+def axis_rotations(axes, angles_deg):
+    """
+    Builds elementary rotation matrices for many channels and frames at once.
+
+    Args:
+        axes: (K,) axis index per channel (X=0, Y=1, Z=2)
+        angles_deg: (..., K) angles in degrees
+
+    Returns:
+        (..., K, 3, 3) rotation matrices.
+    """
+    axes = np.asarray(axes, dtype=np.intp)
+    angles = np.radians(angles_deg)
+    cos, sin = np.cos(angles), np.sin(angles)
+    # The two axes spanning the rotation plane, in right-handed order (X: y,z / Y: z,x / Z: x,y)
+    first, second = (axes + 1) % 3, (axes + 2) % 3
+    channel = np.arange(len(axes))
+
+    matrices = np.zeros(angles.shape + (3, 3))
+    matrices[..., channel, axes, axes] = 1.0
+    matrices[..., channel, first, first] = cos
+    matrices[..., channel, second, second] = cos
+    matrices[..., channel, first, second] = -sin
+    matrices[..., channel, second, first] = sin
+    return matrices
+
+
+def channel_layout(hierarchy):
+    """Returns the column index of each joint's first channel in a MOTION row."""
+    layout = {}
+    column = 0
+    for joint_name, joint_info in hierarchy.items():
+        layout[joint_name] = column
+        column += len(joint_info["channels"])
+    return layout
+
+
+def local_transforms(hierarchy, motion):
+    """
+    Computes every joint's local rotation and translation for all frames.
+
+    All rotation channels of the file are turned into matrices in one batched call; each joint's
+    rotation is then the product of its channel matrices in channel order.
+
+    Returns:
+        {joint: (rotation (T, 3, 3), offset (3,) or (T, 3))}
+    """
+    layout = channel_layout(hierarchy)
+    rot_columns, rot_axes = [], []
+    for joint_name, joint_info in hierarchy.items():
+        for i, channel in enumerate(joint_info["channels"]):
+            if channel in ROTATION_CHANNELS:
+                rot_columns.append(layout[joint_name] + i)
+                rot_axes.append(ROTATION_CHANNELS[channel])
+    elementary = axis_rotations(rot_axes, motion[:, rot_columns])
+    column_to_matrix = {column: k for k, column in enumerate(rot_columns)}
+
+    num_frames = len(motion)
+    transforms = {}
+    for joint_name, joint_info in hierarchy.items():
+        rotation = np.broadcast_to(np.eye(3), (num_frames, 3, 3))
+        offset = joint_info["offset"]
+        for i, channel in enumerate(joint_info["channels"]):
+            column = layout[joint_name] + i
+            if channel in ROTATION_CHANNELS:
+                rotation = rotation @ elementary[:, column_to_matrix[column]]
+            elif channel in POSITION_CHANNELS:
+                # Position channels replace the static offset component
+                if offset.ndim == 1:
+                    offset = np.tile(offset, (num_frames, 1))
+                offset[:, POSITION_CHANNELS[channel]] = motion[:, column]
+        transforms[joint_name] = (rotation, offset)
+    return transforms
+
+
+def output_order(hierarchy, root_name):
+    """Joint and End Site names in depth-first order, End Sites listed after the joint's children."""
+    order = []
+    stack = [(root_name, False)]
+    while stack:
+        joint_name, closing = stack.pop()
+        if closing:
+            order.append(f"{joint_name}_EndSite")
+            continue
+        order.append(joint_name)
+        if hierarchy[joint_name]["end_site"] is not None:
+            stack.append((joint_name, True))
+        stack.extend((child, False) for child in reversed(hierarchy[joint_name]["children"]))
+    return order
+
+
+def forward_kinematics(hierarchy, motion, root_name):
+    """
+    Computes global joint positions for all frames at once.
+
+    The hierarchy is walked once from `root_name` in topological order, composing each joint's
+    local transform with its parent's using batched matrix products over the frame axis.
+
+    Returns:
+        {name: (T, 3) global position} for every joint below (and including) `root_name` and for
+        each End Site as `{joint}_EndSite`, in the same order as output_order().
+    """
+    if root_name not in hierarchy:
+        raise ValueError(f"Root joint '{root_name}' not found in BVH hierarchy.")
+    transforms = local_transforms(hierarchy, motion)
+    num_frames = len(motion)
+
+    positions = {}
+    stack = [(root_name, np.zeros((num_frames, 3)), np.broadcast_to(np.eye(3), (num_frames, 3, 3)))]
+    while stack:
+        joint_name, parent_position, parent_rotation = stack.pop()
+        local_rotation, offset = transforms[joint_name]
+        if offset.ndim == 1:
+            position = parent_position + parent_rotation @ offset
+        else:
+            position = parent_position + np.einsum('tij,tj->ti', parent_rotation, offset)
+        rotation = parent_rotation @ local_rotation
+        positions[joint_name] = position
+
+        end_site = hierarchy[joint_name]["end_site"]
+        if end_site is not None:
+            positions[f"{joint_name}_EndSite"] = position + rotation @ end_site
+        stack.extend((child, position, rotation) for child in hierarchy[joint_name]["children"])
+
+    return {name: positions[name] for name in output_order(hierarchy, root_name)}
+
+
+def parse_bvh(bvh_file_path, output_dir, root_name=None):
     """
     Parses a BVH file and extracts joint hierarchy and motion data.
     Outputs frame-by-frame joint positions.
+
+    Args:
+        root_name: joint to start forward kinematics from (default: the file's ROOT joint)
     """
-    hierarchy = {}
-    motion_data = []
-    frame_time = 0.0
-    num_frames = 0
-
-    current_joint = None
-    joint_stack = []
-    
-    # BVH parsing state
-    parsing_hierarchy = True
-    
-    with open(bvh_file_path, 'r') as f:
-        lines = f.readlines()
-
-    line_idx = 0
-    while line_idx < len(lines):
-        line = lines[line_idx].strip()
-
-        if parsing_hierarchy:
-            if line.startswith("ROOT") or line.startswith("JOINT"):
-                joint_type = line.split()[0]
-                joint_name = line.split()[1]
-                
-                parent_name = None
-                if joint_type == "JOINT":
-                    if not joint_stack:
-                        raise ValueError(f"BVH parsing error: JOINT {joint_name} found without a parent on stack.")
-                    parent_name = joint_stack[-1]
-                
-                hierarchy[joint_name] = {"parent": parent_name, "offset": None, "channels": [], "children": [], "end_site": None}
-                if parent_name:
-                    hierarchy[parent_name]["children"].append(joint_name)
-                
-                current_joint = joint_name
-                joint_stack.append(joint_name)
-                
-            elif line.startswith("OFFSET"):
-                offset_values = list(map(float, line.split()[1:]))
-                hierarchy[current_joint]["offset"] = np.array(offset_values)
-            elif line.startswith("CHANNELS"):
-                channels = line.split()[2:]
-                hierarchy[current_joint]["channels"] = channels
-            elif line.startswith("End Site"):
-                line_idx += 1 # Skip '{'
-                line_idx += 1
-                offset_values = list(map(float, lines[line_idx].strip().split()[1:]))
-                hierarchy[current_joint]["end_site"] = np.array(offset_values)
-                line_idx += 1 # Skip '}'
-            elif line == "}":
-                if joint_stack:
-                    joint_stack.pop()
-                # If joint_stack is empty after pop, and we are still in hierarchy, it means we finished a root joint
-            elif line == "MOTION":
-                parsing_hierarchy = False
-                # Read motion header
-                line_idx += 1
-                num_frames = int(lines[line_idx].strip().split()[1])
-                line_idx += 1
-                frame_time = float(lines[line_idx].strip().split()[2])
-                
-                # Read motion data
-                for i in range(num_frames):
-                    line_idx += 1
-                    motion_values = list(map(float, lines[line_idx].strip().split()))
-                    motion_data.append(motion_values)
-                break # All motion data read, exit loop
-        
-        line_idx += 1
-
-    # Reconstruct joint global positions for each frame
-    all_frame_joint_positions = []
-
-    for frame_motion_values in motion_data:
-        current_joint_positions = {}
-        channel_idx = 0
-
-        # Recursively calculate global positions
-        def calculate_global_position(joint_name, parent_global_pos=np.array([0.0, 0.0, 0.0]), parent_global_rot=np.eye(3)):
-            nonlocal channel_idx
-            joint_info = hierarchy[joint_name]
-            
-            local_offset = np.copy(joint_info["offset"]) # Use a copy to avoid modifying original offset
-            local_rotation_matrix = np.eye(3)
-
-            # Apply channels in order (ZXY Euler for BVH)
-            rot_order = []
-            for channel in joint_info["channels"]:
-                value = frame_motion_values[channel_idx]
-                channel_idx += 1
-                
-                if "position" in channel.lower(): # Root position channels
-                    if joint_name == "Hips": # Only Hips has position channels
-                        if channel == "Xposition": local_offset[0] = value
-                        elif channel == "Yposition": local_offset[1] = value
-                        elif channel == "Zposition": local_offset[2] = value
-                elif "rotation" in channel.lower():
-                    angle_rad = np.radians(value)
-                    if channel == "Xrotation": rot_order.append(('X', angle_rad))
-                    elif channel == "Yrotation": rot_order.append(('Y', angle_rad))
-                    elif channel == "Zrotation": rot_order.append(('Z', angle_rad))
-            
-            # Apply rotations in specified order (ZXY for BVH)
-            for axis, angle_rad in rot_order:
-                if axis == 'X':
-                    local_rotation_matrix = local_rotation_matrix @ np.array([
-                        [1, 0, 0],
-                        [0, np.cos(angle_rad), -np.sin(angle_rad)],
-                        [0, np.sin(angle_rad), np.cos(angle_rad)]
-                    ])
-                elif axis == 'Y':
-                    local_rotation_matrix = local_rotation_matrix @ np.array([
-                        [np.cos(angle_rad), 0, np.sin(angle_rad)],
-                        [0, 1, 0],
-                        [-np.sin(angle_rad), 0, np.cos(angle_rad)]
-                    ])
-                elif axis == 'Z':
-                    local_rotation_matrix = local_rotation_matrix @ np.array([
-                        [np.cos(angle_rad), -np.sin(angle_rad), 0],
-                        [np.sin(angle_rad), np.cos(angle_rad), 0],
-                        [0, 0, 1]
-                    ])
-
-            # Calculate global position and rotation
-            global_position = parent_global_pos + parent_global_rot @ local_offset
-            global_rotation_matrix = parent_global_rot @ local_rotation_matrix
-            
-            current_joint_positions[joint_name] = global_position.tolist()
-
-            # Recurse for children
-            for child_joint in joint_info["children"]:
-                calculate_global_position(child_joint, global_position, global_rotation_matrix)
-            
-            # Add End Site position if exists
-            if joint_info["end_site"] is not None:
-                end_site_global_pos = global_position + global_rotation_matrix @ joint_info["end_site"]
-                current_joint_positions[f"{joint_name}_EndSite"] = end_site_global_pos.tolist()
-
-        # Start recursion from the root joint (assuming 'Hips' is always root)
-        channel_idx = 0 # Reset channel index for each frame
-        calculate_global_position("Hips") # Assuming Hips is the root
-        all_frame_joint_positions.append(current_joint_positions)
+    hierarchy, file_root, motion, _ = read_bvh(bvh_file_path)
+    positions = forward_kinematics(hierarchy, motion, root_name or file_root)
+
+    # Convert to per-frame dicts in one pass over a (T, num_joints, 3) array
+    names = list(positions)
+    stacked = np.stack([positions[name] for name in names], axis=1) if names else np.zeros((len(motion), 0, 3))
+    all_frame_joint_positions = [dict(zip(names, frame)) for frame in stacked.tolist()]
 
     base_filename_with_person = os.path.basename(bvh_file_path).replace('.bvh', '')
     # Extract the part before '_person' and the '_personX' part
@@ -166,16 +172,17 @@ def parse_bvh(bvh_file_path, output_dir):
     output_filename = os.path.join(output_dir, f'{base_filename}_parsed_positions.json')
     with open(output_filename, 'w') as f:
         json.dump({"frames": all_frame_joint_positions, "hierarchy": {k: {key: val.tolist() if isinstance(val, np.ndarray) else val for key, val in v.items()} for k, v in hierarchy.items()}}, f, indent=4)
-    
+
     print(f"BVH parsed and joint positions saved to {output_filename}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Parse BVH file and extract joint positions.")
     parser.add_argument('--bvh_path', type=str, required=True, help="Path to the input BVH file.")
     parser.add_argument('--output_dir', type=str, default="/mnt/d/progress/ani_bender/output_data", help="Directory to save the parsed JSON file.")
+    parser.add_argument('--root', type=str, default=None, help="Joint to start forward kinematics from (default: the BVH ROOT joint).")
 
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
 
-    parse_bvh(args.bvh_path, args.output_dir)
\ No newline at end of file
+    parse_bvh(args.bvh_path, args.output_dir, root_name=args.root)
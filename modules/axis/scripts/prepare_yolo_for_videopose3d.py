@@ -1,42 +1,50 @@
 import numpy as np
-import json
 import os
 import argparse
 
-def convert_yolo_to_videopose3d_format(yolo_json_path, video_width, video_height, output_dir):
+try:
+    from .keypoint_tracks import load_tracks
+except ImportError:
+    from keypoint_tracks import load_tracks
+
+def videopose3d_input_from_tracks(tracks, video_width, video_height):
+    """
+    Takes the first detected person of every frame as the (num_frames, 17, 3) VideoPose3D input
+    (x, y and confidence; frames without a detection stay zero). Returns the array and its metadata.
+    """
+    final_keypoints_array = np.zeros((tracks.num_frames, 17, 3))
+    if tracks.num_persons:
+        first_person = np.concatenate([tracks.positions[:, 0], tracks.confidence[:, 0, :, None]], axis=-1)
+        detected = tracks.present[:, 0]
+        final_keypoints_array[detected] = first_person[detected]
+
+    metadata = {
+        'layout': 'coco', # Assuming YOLO output is COCO-like
+        'num_joints': 17,
+        'keypoints_symmetry': [[1, 3, 5, 7, 9, 11, 13, 15], [2, 4, 6, 8, 10, 12, 14, 16]], # Example symmetry
+        'w': video_width,
+        'h': video_height,
+        # Source video frame of each row, so the uplifted output keeps absolute frame indices
+        'frame_indices': tracks.frame_indices.tolist()
+    }
+    return final_keypoints_array, metadata
+
+def convert_yolo_to_videopose3d_format(yolo_json_path, video_width, video_height, output_dir, output_npz_path=None):
     """
     Converts YOLO pose estimation JSON output to the .npz format required by VideoPose3D.
     Saves a single .npz file containing the first detected person's keypoints for the entire video.
+    output_npz_path: Where to write the .npz (default: data/data_2d_custom_yolo.npz). Pass a per-chunk
+                     path when several chunks or videos are prepared at once.
+    Returns the path of the written .npz file.
     """
-    with open(yolo_json_path, 'r') as f:
-        data = json.load(f)
+    # The .npz tracks written next to the JSON by run_pose_estimation.py are used when present
+    tracks = load_tracks(yolo_json_path)
 
     # VideoPose3D expects a dictionary structure like:
     # {'subject_name': {'action_name': [keypoints_for_camera_0, keypoints_for_camera_1, ...]}}
     # For our custom data, we'll use 'custom' for subject and 'yolo' for action/keypoints type.
     # We'll assume a single camera (index 0).
-
-    all_frames_first_person_keypoints = []
-
-    for frame in data:
-        persons_in_frame = frame['persons']
-        
-        if persons_in_frame: # If at least one person is detected
-            # Take the first detected person
-            person_data = persons_in_frame[0]
-            keypoints_xy = np.array(person_data['keypoints'])[:, :2] # (17, 2)
-            keypoints_conf = np.array(person_data['keypoints'])[:, 2:3] # (17, 1)
-            
-            # Combine x, y, and confidence into (17, 3) array
-            kps_array = np.concatenate((keypoints_xy, keypoints_conf), axis=1) # (17, 3)
-            all_frames_first_person_keypoints.append(kps_array)
-        else:
-            # If no person detected, append a zero array of the expected shape (17, 3)
-            all_frames_first_person_keypoints.append(np.zeros((17, 3)))
-
-    # Stack all frames' keypoints into a single numpy array
-    # Shape will be (num_frames, 17, 3)
-    final_keypoints_array = np.stack(all_frames_first_person_keypoints)
+    final_keypoints_array, metadata = videopose3d_input_from_tracks(tracks, video_width, video_height)
 
     # Create the dictionary structure for VideoPose3D
     positions_2d = {
@@ -47,26 +55,19 @@ def convert_yolo_to_videopose3d_format(yolo_json_path, video_width, video_height
         }
     }
 
-    metadata = {
-        'layout': 'coco', # Assuming YOLO output is COCO-like
-        'num_joints': 17,
-        'keypoints_symmetry': [[1, 3, 5, 7, 9, 11, 13, 15], [2, 4, 6, 8, 10, 12, 14, 16]], # Example symmetry
-        'w': video_width,
-        'h': video_height
-    }
-
-    # Ensure the output directory for VideoPose3D data exists
-    videopose3d_data_dir = "data"
-    os.makedirs(videopose3d_data_dir, exist_ok=True)
+    if output_npz_path is None:
+        # Ensure the output directory for VideoPose3D data exists
+        videopose3d_data_dir = "data"
+        os.makedirs(videopose3d_data_dir, exist_ok=True)
+        output_npz_path = os.path.join(videopose3d_data_dir, "data_2d_custom_yolo.npz")
 
-    output_npz_path = os.path.join(videopose3d_data_dir, "data_2d_custom_yolo.npz")
-    
     np.savez_compressed(
         output_npz_path,
         positions_2d=positions_2d,
         metadata=metadata
     )
     print(f"Successfully created VideoPose3D input NPZ at {output_npz_path}")
+    return output_npz_path
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -74,8 +75,10 @@ if __name__ == '__main__':
     parser.add_argument('--video_width', type=int, required=True, help='Width of the video.')
     parser.add_argument('--video_height', type=int, required=True, help='Height of the video.')
     parser.add_argument('--output_dir', type=str, required=True, help='Directory for the output .npz files (not used for final output path, but for consistency).')
+    parser.add_argument('--output_npz_path', type=str, default=None, help='Path for the output .npz (default: data/data_2d_custom_yolo.npz).')
     args = parser.parse_args()
 
-    # The output_dir argument is not directly used for the final NPZ path, as it's hardcoded for VideoPose3D.
-    # However, it's kept for consistency with other scripts.
-    convert_yolo_to_videopose3d_format(args.yolo_json, args.video_width, args.video_height, args.output_dir)
+    # The output_dir argument is not directly used for the final NPZ path, which defaults to the
+    # location VideoPose3D expects. However, it's kept for consistency with other scripts.
+    convert_yolo_to_videopose3d_format(args.yolo_json, args.video_width, args.video_height, args.output_dir,
+                                       output_npz_path=args.output_npz_path)
@@ -2,7 +2,11 @@ import joblib
 import os
 import numpy as np
 import argparse
-import json
+
+try:
+    from .keypoint_tracks import KeypointTracks, save_tracks
+except ImportError:
+    from keypoint_tracks import KeypointTracks, save_tracks
 
 def process_vibe_output(vibe_pkl_path, output_dir, video_filename_base):
     """
@@ -21,42 +25,24 @@ def process_vibe_output(vibe_pkl_path, output_dir, video_filename_base):
     # ]
     # Where each inner list corresponds to a person.
 
-    # Determine the total number of frames from any person's data
-    num_frames = 0
-    if vibe_results:
-        # Get the first person's data to determine number of frames
-        first_person_id = list(vibe_results.keys())[0]
-        num_frames = vibe_results[first_person_id]['joints3d'].shape[0]
-
-    json_output_data = []
-
-    for frame_idx in range(num_frames):
-        current_frame_all_person_keypoints = []
-        for person_id in vibe_results.keys():
-            person_joints3d = vibe_results[person_id]['joints3d']
-            
-            if frame_idx < person_joints3d.shape[0]:
-                # Extract 3D joints for the current frame and person
-                # Shape is (num_joints, 3)
-                frame_keypoints = person_joints3d[frame_idx]
-                
-                # Convert to list and add dummy visibility (1.0)
-                person_keypoints_with_visibility = [[float(kp[0]), float(kp[1]), float(kp[2]), 1.0] for kp in frame_keypoints]
-                current_frame_all_person_keypoints.append(person_keypoints_with_visibility)
-            # else:
-                # If person data doesn't exist for this frame (e.g., person left scene),
-                # we can append an empty list or a zero array for that person.
-                # For now, we'll just skip if data is not available, meaning fewer persons in some frames.
-                # This needs to be handled carefully by downstream scripts if they expect consistent person count.
-
-        json_output_data.append({
-            "frame_idx": frame_idx,
-            "keypoints": current_frame_all_person_keypoints
-        })
+    # Determine the total number of frames from the first person's data
+    person_ids = list(vibe_results.keys())
+    num_frames = vibe_results[person_ids[0]]['joints3d'].shape[0] if person_ids else 0
+    num_joints = vibe_results[person_ids[0]]['joints3d'].shape[1] if person_ids else 0
+
+    # One person slot per VIBE person id. If a person's data ends before num_frames
+    # (e.g. the person left the scene), the slot is marked absent for the remaining frames
+    # and the person is left out of those frames in the JSON.
+    tracks = KeypointTracks.empty(num_frames, len(person_ids), num_joints, 3, layout="vibe")
+    for slot, person_id in enumerate(person_ids):
+        person_joints3d = vibe_results[person_id]['joints3d'][:num_frames]
+        tracks.positions[:len(person_joints3d), slot] = person_joints3d
+        tracks.present[:len(person_joints3d), slot] = True
+    # Dummy visibility (1.0)
+    tracks.confidence[tracks.present] = 1.0
 
     output_json_path = os.path.join(output_dir, f'{video_filename_base}_vibe_3d_keypoints.json')
-    with open(output_json_path, 'w') as f:
-        json.dump(json_output_data, f, indent=4)
+    save_tracks(output_json_path, tracks)
     
     print(f"3D keypoints from VIBE output saved to {output_json_path}")
 
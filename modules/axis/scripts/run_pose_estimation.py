@@ -1,38 +1,68 @@
 import cv2
 from ultralytics import YOLO
-import json
 import os
 import argparse
 import numpy as np
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .chunk_planning import chunk_video
+    from .frame_batches import FramePrefetcher, collect_chunks
+    from .keypoint_tracking import TRACKING_METHODS, KeypointTracker
+    from .keypoint_tracks import COCO_JOINTS, KeypointTracks, save_tracks
+except ImportError:
+    from chunk_planning import chunk_video
+    from frame_batches import FramePrefetcher, collect_chunks
+    from keypoint_tracking import TRACKING_METHODS, KeypointTracker
+    from keypoint_tracks import COCO_JOINTS, KeypointTracks, save_tracks
+
+def detections_from_result(r):
+    """(persons, 17, 3) keypoints and (persons, 5) boxes of one frame's YOLO result."""
+    if r.keypoints is None or r.boxes is None:
+        return np.zeros((0, 17, 3)), np.zeros((0, 5))
+    num_persons = min(len(r.keypoints.data), len(r.boxes.data))
+    return r.keypoints.data[:num_persons].cpu().numpy(), r.boxes.data[:num_persons, :5].cpu().numpy()
+
+def estimate_poses(frame_batches, predict):
+    """
+    Runs `predict` (a list of frames -> one result per frame) on each batch and scatters the
+    detections back to their frames. Yields (frame_index, keypoints, boxes) in frame order.
+    """
+    for frame_indices, frames in frame_batches:
+        results = predict(frames)
+        for frame_index, r in zip(frame_indices, results):
+            yield (frame_index,) + detections_from_result(r)
 
-def chunk_video(video_length, chunk_size, overlap_size):
+def track_poses(frames, detect, tracker):
     """
-    Calculates start and end frames for video chunks with overlap.
-    Returns a list of (start_frame, end_frame) tuples.
+    Detect-then-track: `detect` (one frame -> keypoints, boxes) runs only when `tracker` asks for a
+    keyframe. Yields (frame_index, keypoints, boxes) for (frame_index, frame) pairs in frame order.
     """
-    chunks = []
-    if chunk_size <= 0 or overlap_size < 0:
-        raise ValueError("chunk_size must be positive and overlap_size non-negative.")
-
-    if chunk_size <= overlap_size:
-        print("Warning: chunk_size is less than or equal to overlap_size. This may lead to unexpected behavior.")
-
-    current_frame = 0
-    while current_frame < video_length:
-        end_frame = min(current_frame + chunk_size, video_length)
-        chunks.append((current_frame, end_frame))
-        if end_frame == video_length:
-            break
-        current_frame = end_frame - overlap_size
-        # Ensure current_frame doesn't go negative if overlap_size is too large for the first chunk
-        if current_frame < 0: current_frame = 0
-    return chunks
-
-def run_pose_estimation(video_path, output_dir, chunk_size, overlap_size):
+    for frame_index, frame in frames:
+        keypoints, boxes = tracker.update(frame, detect)
+        yield frame_index, keypoints, boxes
+
+def save_chunk(output_dir, video_filename_base, chunk_idx, frame_indices, keypoints, boxes, video_fps):
+    tracks = KeypointTracks.from_ragged(keypoints, 2, frame_indices=frame_indices, boxes=boxes,
+                                        layout="coco", joint_names=COCO_JOINTS, fps=video_fps, json_layout="yolo")
+
+    # [{"frame_idx", "persons": [{"bbox", "keypoints"}]}] JSON plus the .npz tracks next to it
+    output_filename_chunk = os.path.join(output_dir, f'{video_filename_base}_chunk{chunk_idx}_2d_keypoints.json')
+    save_tracks(output_filename_chunk, tracks)
+    print(f"2D keypoints for chunk {chunk_idx} ({len(frame_indices)} frames) saved to {output_filename_chunk}")
+    return output_filename_chunk
+
+def run_pose_estimation(video_path, output_dir, chunk_size, overlap_size, batch_size=16, prefetch_frames=64,
+                        model_path='yolov8n-pose.pt', tracker=None):
     """
     Runs YOLO-pose on a video to extract 2D keypoints in chunks and saves them to JSON files.
+    Frames are decoded on a background thread and fed to the model `batch_size` at a time. Each frame
+    is decoded and inferred once even where chunks overlap, and finished chunks are written on a
+    separate thread while inference continues.
+    With a KeypointTracker, YOLO only runs on the keyframes it requests and keypoints are tracked in between.
     """
-    model = YOLO('yolov8n-pose.pt') # You can choose other YOLO-pose models like yolov8s-pose.pt, yolov8m-pose.pt
+    model = YOLO(model_path) # You can choose other YOLO-pose models like yolov8s-pose.pt, yolov8m-pose.pt
 
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
@@ -47,53 +77,22 @@ def run_pose_estimation(video_path, output_dir, chunk_size, overlap_size):
 
     # Determine chunks
     chunks = chunk_video(video_length, chunk_size, overlap_size)
-    print(f"Video will be processed in {len(chunks)} chunks.")
-
-    for chunk_idx, (start_frame, end_frame) in enumerate(chunks):
-        print(f"\n--- Processing Chunk {chunk_idx + 1}/{len(chunks)} (Frames {start_frame}-{end_frame-1}) ---")
-        
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-        frame_data_chunk = []
-        current_frame_in_chunk = start_frame
-
-        while current_frame_in_chunk < end_frame:
-            ret, frame = cap.read()
-            if not ret:
-                print(f"End of video or failed to read frame at index {current_frame_in_chunk} in chunk.")
-                break
-
-            # print(f"--- Processing Frame {current_frame_in_chunk} ---") # Too verbose
-            results = model(frame, verbose=False) # verbose=False to suppress extensive output
-
-            persons_data = []
-            for r in results:
-                if r.keypoints is not None and r.boxes is not None:
-                    keypoints_tensor = r.keypoints.data
-                    boxes_tensor = r.boxes.data
-
-                    num_persons = min(len(keypoints_tensor), len(boxes_tensor))
-
-                    for i in range(num_persons):
-                        person_keypoints = keypoints_tensor[i].tolist() # [17, 3]
-                        person_bbox = boxes_tensor[i][:5].tolist()
-
-                        persons_data.append({
-                            "bbox": person_bbox,
-                            "keypoints": person_keypoints
-                        })
-            
-            frame_data_chunk.append({
-                "frame_idx": current_frame_in_chunk,
-                "persons": persons_data
-            })
-            current_frame_in_chunk += 1
-
-        output_filename_chunk = os.path.join(output_dir, f'{video_filename_base}_chunk{chunk_idx}_2d_keypoints.json')
-        with open(output_filename_chunk, 'w') as f:
-            json.dump(frame_data_chunk, f, indent=4)
-        print(f"2D keypoints for chunk {chunk_idx} saved to {output_filename_chunk}")
-
-    cap.release()
+    print(f"Video will be processed in {len(chunks)} chunks (batch size: {batch_size}).")
+
+    predict = functools.partial(model, verbose=False) # verbose=False to suppress extensive output
+    with FramePrefetcher(cap, max_queue=prefetch_frames) as prefetcher, ThreadPoolExecutor(max_workers=1) as writer:
+        if tracker is None:
+            detections = estimate_poses(prefetcher.batches(batch_size), predict)
+        else:
+            detect = lambda frame: detections_from_result(predict([frame])[0])
+            detections = track_poses(prefetcher, detect, tracker)
+        writes = [writer.submit(save_chunk, output_dir, video_filename_base, chunk_idx, frame_indices, keypoints, boxes, video_fps)
+                  for chunk_idx, frame_indices, keypoints, boxes in collect_chunks(detections, chunks)]
+        for write in writes:
+            write.result()
+
+    if tracker is not None:
+        print(f"YOLO ran on {tracker.detector_calls} of {tracker.frames} frames ({tracker.method} tracking).")
     print(f"\n2D pose estimation completed for all chunks.")
 
 if __name__ == "__main__":
@@ -102,9 +101,29 @@ if __name__ == "__main__":
     parser.add_argument('--output_dir', type=str, default="/mnt/d/progress/ani_bender/output_data", help="Directory to save the output JSON file.")
     parser.add_argument('--chunk_size', type=int, default=243, help="Number of frames to process in each chunk.")
     parser.add_argument('--overlap_size', type=int, default=121, help="Number of overlapping frames between chunks.")
+    parser.add_argument('--batch_size', type=int, default=16, help="Frames per YOLO inference call.")
+    parser.add_argument('--prefetch_frames', type=int, default=64, help="Decoded frames buffered ahead of inference.")
+    parser.add_argument('--model', type=str, default='yolov8n-pose.pt', help="YOLO-pose weights.")
+    parser.add_argument('--mode', type=str, default='detect', choices=['detect', 'track'],
+                        help="'detect' runs YOLO on every frame; 'track' runs it on keyframes and tracks keypoints in between.")
+    parser.add_argument('--tracker', type=str, default='lk', choices=list(TRACKING_METHODS),
+                        help="Keypoint tracker for --mode track: Lucas-Kanade optical flow or constant-velocity prediction.")
+    parser.add_argument('--min_track_confidence', type=float, default=0.3,
+                        help="Redetect when a person's tracked keypoint confidence falls below this.")
+    parser.add_argument('--min_box_iou', type=float, default=0.5,
+                        help="Redetect when a tracked skeleton overlaps its keyframe extent by less than this IoU.")
+    parser.add_argument('--max_track_frames', type=int, default=30,
+                        help="Redetect at least every this many frames (also picks up persons entering the shot).")
 
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
 
-    run_pose_estimation(args.video_path, args.output_dir, args.chunk_size, args.overlap_size)
\ No newline at end of file
+    tracker = None
+    if args.mode == 'track':
+        tracker = KeypointTracker(args.tracker, min_confidence=args.min_track_confidence,
+                                  min_box_iou=args.min_box_iou, max_track_frames=args.max_track_frames)
+
+    run_pose_estimation(args.video_path, args.output_dir, args.chunk_size, args.overlap_size,
+                        batch_size=args.batch_size, prefetch_frames=args.prefetch_frames, model_path=args.model,
+                        tracker=tracker)
@@ -9,11 +9,14 @@ mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
-def run_pose_estimation_mediapipe(video_path, output_dir, output_annotated_frames_dir=None):
+def run_pose_estimation_mediapipe(video_path, output_dir, output_annotated_frames_dir=None,
+                                  min_detection_confidence=0.5, min_tracking_confidence=0.5):
     """
     Runs MediaPipe Pose on a video to extract 3D world keypoints and saves them to a JSON file.
     Also overlays the pose estimation on video frames and saves them.
     Focuses on single person tracking with MediaPipe's built-in smoothing.
+    In video mode MediaPipe already detects then tracks: the person detector only runs again once the
+    landmark tracker's confidence falls below `min_tracking_confidence`.
     """
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
@@ -36,7 +39,8 @@ def run_pose_estimation_mediapipe(video_path, output_dir, output_annotated_frame
     if output_annotated_frames_dir:
         os.makedirs(output_annotated_frames_dir, exist_ok=True)
 
-    with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
+    with mp_pose.Pose(static_image_mode=False, min_detection_confidence=min_detection_confidence,
+                      min_tracking_confidence=min_tracking_confidence) as pose:
         while True:
             ret, frame = cap.read()
             if not ret:
@@ -92,6 +96,9 @@ if __name__ == "__main__":
     parser.add_argument('--video_path', type=str, required=True, help="Path to the input video file.")
     parser.add_argument('--output_path', type=str, required=True, help="Full path for the output JSON file.")
     parser.add_argument('--output_annotated_frames_dir', type=str, default=None, help="Optional: Directory to save annotated image frames.")
+    parser.add_argument('--min_detection_confidence', type=float, default=0.5, help="Minimum person detection confidence.")
+    parser.add_argument('--min_tracking_confidence', type=float, default=0.5,
+                        help="Landmark tracking confidence below which the person detector runs again. Lower values redetect less often.")
 
     args = parser.parse_args()
 
@@ -102,4 +109,6 @@ if __name__ == "__main__":
     if output_dir_path:
         os.makedirs(output_dir_path, exist_ok=True)
 
-    run_pose_estimation_mediapipe(args.video_path, args.output_path, args.output_annotated_frames_dir)
+    run_pose_estimation_mediapipe(args.video_path, args.output_path, args.output_annotated_frames_dir,
+                                  min_detection_confidence=args.min_detection_confidence,
+                                  min_tracking_confidence=args.min_tracking_confidence)
@@ -1,7 +1,17 @@
 import numpy as np
-from scipy.signal import savgol_filter
+from scipy.ndimage import convolve1d
+from scipy.signal import savgol_coeffs, savgol_filter
+
+# All filters below work on whole (num_frames, num_joints, num_coords) arrays along the
+# frame axis (axis=0), or on single (num_joints, num_coords) frames for the streaming filters.
 
 class OneEuroFilter:
+    """
+    1€ filter whose state covers every channel of a frame at once.
+
+    Call it with one frame (scalar or array of any shape) at a time; each element is filtered
+    independently. Use one_euro_filter() to run it over a whole (T, ...) array.
+    """
     def __init__(self, freq=30, min_cutoff=1.0, beta=0.0, dcutoff=1.0):
         self.freq = freq
         self.min_cutoff = min_cutoff
@@ -9,43 +19,117 @@ class OneEuroFilter:
         self.dcutoff = dcutoff
         self.last_value = None
         self.last_derivative = None
+        # The derivative cutoff is fixed, so its smoothing factor is too
+        self._derivative_alpha = self.smoothing_factor(freq, dcutoff)
 
     def __call__(self, x):
         if self.last_value is None:
-            self.last_value = x
-            self.last_derivative = np.zeros_like(x)
+            self.last_value = np.array(x, dtype=np.float64)
+            self.last_derivative = np.zeros_like(self.last_value)
             return x
         # 1€ 필터 기본 구현 (간단화)
-        alpha = self.smoothing_factor(self.freq, self.min_cutoff)
         dx = (x - self.last_value) * self.freq
-        self.last_derivative = self.exponential_smoothing(alpha, dx, self.last_derivative)
+        self.last_derivative = self.exponential_smoothing(self._derivative_alpha, dx, self.last_derivative)
         cutoff = self.min_cutoff + self.beta * np.abs(self.last_derivative)
         alpha = self.smoothing_factor(self.freq, cutoff)
         self.last_value = self.exponential_smoothing(alpha, x, self.last_value)
         return self.last_value
 
+    def reset(self):
+        self.last_value = None
+        self.last_derivative = None
+
     def smoothing_factor(self, freq, cutoff):
-        tau = 1.0 / (2 * np.pi * cutoff)
-        te = 1.0 / freq
-        return 1.0 / (1.0 + tau / te)
+        # 1 / (1 + tau / te) with tau = 1 / (2 pi cutoff) and te = 1 / freq
+        rate = 2 * np.pi * cutoff
+        return rate / (rate + freq)
 
     def exponential_smoothing(self, alpha, x, prev):
         return alpha * x + (1 - alpha) * prev
 
+
+class MovingAverageStream:
+    """Causal moving average over the last `window_size` frames, for one frame at a time."""
+    def __init__(self, window_size=5):
+        self.window_size = window_size
+        self.reset()
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self._buffer is None:
+            self._buffer = np.zeros((self.window_size,) + x.shape)
+            self._sum = np.zeros_like(x)
+        # Ring buffer with a running sum: O(channels) per frame regardless of the window size
+        slot = self._count % self.window_size
+        self._sum += x - self._buffer[slot]
+        self._buffer[slot] = x
+        self._count += 1
+        return self._sum / min(self._count, self.window_size)
+
+    def reset(self):
+        self._buffer = None
+        self._sum = None
+        self._count = 0
+
+
+class SavgolStream:
+    """
+    Causal Savitzky-Golay filter: fits a polynomial to the last `window_length` frames and
+    evaluates it at the newest frame. Until the window fills, frames are passed through.
+    """
+    def __init__(self, window_length=11, polyorder=2):
+        self.window_length = window_length
+        self.polyorder = polyorder
+        # Coefficients for evaluating the fit at the last sample of the window
+        self._coeffs = savgol_coeffs(window_length, polyorder, pos=window_length - 1, use="dot")
+        self.reset()
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self._buffer is None:
+            self._buffer = np.zeros((self.window_length,) + x.shape)
+        self._buffer[self._count % self.window_length] = x
+        self._count += 1
+        if self._count < self.window_length:
+            return x
+        # Oldest frame first
+        order = np.roll(np.arange(self.window_length), -(self._count % self.window_length))
+        return np.tensordot(self._coeffs, self._buffer[order], axes=1)
+
+    def reset(self):
+        self._buffer = None
+        self._count = 0
+
+
 def moving_average_filter(data, window_size=5):
     # data: (num_frames, num_joints, num_coords)
-    # Apply moving average along the frame axis (axis=0)
-    smoothed_data = np.zeros_like(data)
-    for i in range(data.shape[1]): # Iterate over joints
-        for j in range(data.shape[2]): # Iterate over coordinates (x, y, z, visibility)
-            smoothed_data[:, i, j] = np.convolve(data[:, i, j], np.ones(window_size)/window_size, mode="same")
-    return smoothed_data
+    # Centered moving average along the frame axis, zero-padded at the ends like np.convolve(mode="same")
+    data = np.asarray(data, dtype=np.float64)
+    origin = -1 if window_size % 2 == 0 else 0
+    return convolve1d(data, np.ones(window_size) / window_size, axis=0, mode="constant", cval=0.0, origin=origin)
 
 def savgol_filtering(data, window_length=11, polyorder=2):
     # data: (num_frames, num_joints, num_coords)
     # Apply Savitzky-Golay filter along the frame axis (axis=0)
-    smoothed_data = np.zeros_like(data)
-    for i in range(data.shape[1]): # Iterate over joints
-        for j in range(data.shape[2]): # Iterate over coordinates (x, y, z, visibility)
-            smoothed_data[:, i, j] = savgol_filter(data[:, i, j], window_length, polyorder)
-    return smoothed_data
+    return savgol_filter(np.asarray(data, dtype=np.float64), window_length, polyorder, axis=0)
+
+def one_euro_filter(data, freq=30, min_cutoff=1.0, beta=0.0, dcutoff=1.0):
+    # data: (num_frames, ...) — every channel of a frame is filtered in one step
+    data = np.asarray(data, dtype=np.float64)
+    euro = OneEuroFilter(freq=freq, min_cutoff=min_cutoff, beta=beta, dcutoff=dcutoff)
+    smoothed = np.empty_like(data)
+    for i in range(len(data)):
+        smoothed[i] = euro(data[i])
+    return smoothed
+
+def make_stream_filter(method, window_size=5, window_length=11, polyorder=2, freq=30, min_cutoff=1.0, beta=0.01):
+    """Returns a per-frame filter for live use (`filter(frame) -> smoothed frame`), or None for "none"."""
+    if method == "moving_average":
+        return MovingAverageStream(window_size)
+    if method == "savgol":
+        return SavgolStream(window_length, polyorder)
+    if method == "one_euro":
+        return OneEuroFilter(freq=freq, min_cutoff=min_cutoff, beta=beta)
+    if method == "none":
+        return None
+    raise ValueError(f"Unknown smoothing method: {method}")
@@ -0,0 +1,171 @@
+"""
+In-process VideoPose3D uplift service.
+
+The temporal model is built and its checkpoint loaded once; after that, (T, 17, 2) COCO keypoint
+sequences of any number of chunks are lifted to (T, 17, 3) Human3.6M poses in batches along the
+sequence axis, and returned as arrays.
+
+Requires torch and the VideoPose3D submodule (models/VideoPose3D), which provides
+`common.model.TemporalModel`. Both are imported only when a model is loaded.
+"""
+
+import functools
+import os
+import sys
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+VIDEOPOSE3D_DIR = "models/VideoPose3D"
+CHECKPOINT_PATH = os.path.join(VIDEOPOSE3D_DIR, "checkpoint", "pretrained_h36m_detectron_coco.bin")
+
+# Temporal convolution widths of the pretrained COCO-detection Human3.6M model
+DEFAULT_FILTER_WIDTHS = (3, 3, 3, 3, 3)
+
+# Left/right keypoints swapped by test-time flip augmentation (COCO input, Human3.6M output)
+COCO_LEFT, COCO_RIGHT = [1, 3, 5, 7, 9, 11, 13, 15], [2, 4, 6, 8, 10, 12, 14, 16]
+H36M_LEFT, H36M_RIGHT = [4, 5, 6, 11, 12, 13], [1, 2, 3, 14, 15, 16]
+
+
+def temporal_receptive_field(filter_widths: Sequence[int] = DEFAULT_FILTER_WIDTHS) -> int:
+    """Receptive field of a TemporalModel with these filter widths, without building the model."""
+    # Same as TemporalModel.receptive_field(): layer i is dilated by the product of the earlier widths
+    pad, dilation = filter_widths[0] // 2, filter_widths[0]
+    for width in filter_widths[1:]:
+        pad += (width - 1) * dilation // 2
+        dilation *= width
+    return 1 + 2 * pad
+
+
+def normalize_screen_coordinates(keypoints: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Maps pixel coordinates to [-1, 1] along x, keeping the aspect ratio (as VideoPose3D does)."""
+    return keypoints / width * 2 - np.array([1, height / width])
+
+
+def plan_batches(lengths: Sequence[int], pad: int, max_batch_frames: int) -> List[List[int]]:
+    """
+    Groups sequence indices into batches whose padded size (batch x longest padded sequence)
+    stays within `max_batch_frames`. Sequences are taken longest first to keep padding low;
+    a sequence longer than the limit gets a batch of its own.
+    """
+    batches, current, current_len = [], [], 0
+    for index in sorted(range(len(lengths)), key=lambda i: -lengths[i]):
+        padded = lengths[index] + 2 * pad
+        if current and (len(current) + 1) * max(current_len, padded) > max_batch_frames:
+            batches.append(current)
+            current, current_len = [], 0
+        current.append(index)
+        current_len = max(current_len, padded)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pad_sequences(sequences: Sequence[np.ndarray], pad: int, causal_shift: int = 0) -> np.ndarray:
+    """
+    Edge-pads every (T_i, J, F) sequence by the model's receptive field and stacks them into a
+    (B, max T_i + 2 * pad, J, F) batch. Shorter sequences are edge-padded at the end as well; the
+    model uses valid convolutions, so that padding never reaches their first T_i outputs.
+    """
+    longest = max(len(sequence) for sequence in sequences)
+    padded = []
+    for sequence in sequences:
+        frames = (pad + causal_shift, pad - causal_shift + longest - len(sequence))
+        padded.append(np.pad(sequence, (frames,) + ((0, 0),) * (sequence.ndim - 1), mode="edge"))
+    return np.stack(padded)
+
+
+class VideoPose3DUplifter:
+    """Holds one loaded VideoPose3D temporal model and lifts 2D keypoint sequences with it."""
+
+    def __init__(self, model, device: str = "cpu", causal: bool = False, test_time_augmentation: bool = True,
+                 max_batch_frames: int = 16384):
+        """
+        Args:
+            model: A loaded, eval-mode TemporalModel (see from_checkpoint)
+            max_batch_frames: Upper bound on batch x padded length per forward pass
+        """
+        self.model = model
+        self.device = device
+        self.test_time_augmentation = test_time_augmentation
+        self.max_batch_frames = max_batch_frames
+        self.pad = (model.receptive_field() - 1) // 2
+        self.causal_shift = self.pad if causal else 0
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint_path: str = CHECKPOINT_PATH, videopose3d_dir: str = VIDEOPOSE3D_DIR,
+                        filter_widths: Sequence[int] = DEFAULT_FILTER_WIDTHS, channels: int = 1024, causal: bool = False,
+                        device: Optional[str] = None, **kwargs) -> "VideoPose3DUplifter":
+        """Builds the temporal model and loads the checkpoint (the defaults match the COCO-detection H36M model)."""
+        import torch
+
+        if videopose3d_dir not in sys.path:
+            sys.path.insert(0, videopose3d_dir)
+        from common.model import TemporalModel
+
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = TemporalModel(17, 2, 17, filter_widths=list(filter_widths), causal=causal, channels=channels)
+        checkpoint = torch.load(checkpoint_path, map_location="cpu")
+        model.load_state_dict(checkpoint["model_pos"])
+        model.to(device).eval()
+        return cls(model, device=device, causal=causal, **kwargs)
+
+    @property
+    def receptive_field(self) -> int:
+        return 2 * self.pad + 1
+
+    def uplift(self, keypoints_2d: np.ndarray, width: int, height: int) -> np.ndarray:
+        """(T, 17, 2) pixel keypoints -> (T, 17, 3) camera-space poses."""
+        return self.uplift_batch([keypoints_2d], [(width, height)])[0]
+
+    def uplift_batch(self, sequences: Sequence[np.ndarray], sizes: Sequence[Tuple[int, int]]) -> List[np.ndarray]:
+        """
+        Lifts several (T_i, 17, 2) pixel keypoint sequences (e.g. the chunks of one or more videos)
+        in as few forward passes as `max_batch_frames` allows.
+
+        Args:
+            sizes: (width, height) of the video each sequence comes from
+        """
+        normalized = [normalize_screen_coordinates(np.asarray(sequence, dtype=np.float64)[..., :2], width, height)
+                      .astype(np.float32)
+                      for sequence, (width, height) in zip(sequences, sizes)]
+        results: List[Optional[np.ndarray]] = [None] * len(normalized)
+        for batch in plan_batches([len(sequence) for sequence in normalized], self.pad, self.max_batch_frames):
+            predicted = self._predict(pad_sequences([normalized[i] for i in batch], self.pad, self.causal_shift))
+            for row, index in enumerate(batch):
+                results[index] = predicted[row, :len(normalized[index])]
+        return results
+
+    def _predict(self, inputs_2d: np.ndarray) -> np.ndarray:
+        """(B, T + 2 * pad, 17, 2) padded inputs -> (B, T, 17, 3) predictions."""
+        batch = len(inputs_2d)
+        if self.test_time_augmentation:
+            # Horizontally flipped copies, averaged with the originals after un-flipping
+            flipped = inputs_2d.copy()
+            flipped[..., 0] *= -1
+            flipped[:, :, COCO_LEFT + COCO_RIGHT] = flipped[:, :, COCO_RIGHT + COCO_LEFT]
+            inputs_2d = np.concatenate([inputs_2d, flipped])
+
+        predicted = self._forward(inputs_2d)
+
+        if self.test_time_augmentation:
+            flipped = predicted[batch:]
+            flipped[..., 0] *= -1
+            flipped[:, :, H36M_LEFT + H36M_RIGHT] = flipped[:, :, H36M_RIGHT + H36M_LEFT]
+            predicted = (predicted[:batch] + flipped) / 2
+        return predicted
+
+    def _forward(self, inputs_2d: np.ndarray) -> np.ndarray:
+        """One forward pass of the temporal model."""
+        import torch
+
+        with torch.no_grad():
+            return self.model(torch.from_numpy(inputs_2d).to(self.device)).cpu().numpy()
+
+
+@functools.lru_cache(maxsize=None)
+def get_uplifter(checkpoint_path: str = CHECKPOINT_PATH, videopose3d_dir: str = VIDEOPOSE3D_DIR,
+                 device: Optional[str] = None) -> VideoPose3DUplifter:
+    """The uplifter of this process; the model is built and the checkpoint loaded on first use only."""
+    return VideoPose3DUplifter.from_checkpoint(checkpoint_path, videopose3d_dir, device=device)
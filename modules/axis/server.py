@@ -1,17 +1,183 @@
+import argparse
+import email.utils
+import functools
 import http.server
-import socketserver
 import os
+import re
 
 PORT = 8000
 # 서버 스크립트의 위치를 기준으로 web_visualizer 디렉토리를 찾음
 DIRECTORY = os.path.join(os.path.dirname(__file__), "web_visualizer")
 
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
 class Handler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
+    """
+    정적 파일 핸들러.
+
+    - ETag / Last-Modified를 보내고 If-None-Match / If-Modified-Since 재검증에 304로 응답합니다.
+    - 단일 구간 Range 요청에 206으로 응답합니다 (영상 탐색, 대용량 JSON 이어받기).
+    - 클라이언트가 gzip을 받을 수 있고 최신 `.gz` 형제 파일이 있으면 그 파일을 그대로 보냅니다.
+      `.gz` 파일은 내보내기 시점에 만들어지므로 요청마다 압축하지 않습니다.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, directory: str = DIRECTORY, **kwargs):
+        self._byte_range = None
+        super().__init__(*args, directory=directory, **kwargs)
+
+    def send_head(self):
+        self._byte_range = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) or not os.path.isfile(path):
+            # 디렉토리 목록, index.html 리다이렉트, 404 처리는 기본 구현을 사용
+            return super().send_head()
+
+        range_header = self.headers.get("Range")
+        if range_header is not None and _RANGE_RE.match(range_header.strip()) is None:
+            # 다중 구간 등 지원하지 않는 Range는 무시하고 전체 파일을 보냄 (RFC 9110)
+            range_header = None
+        encoding = None
+        gz_path = path + ".gz"
+        # Range는 원본 표현에 대해서만 처리하고, 그 외에는 미리 압축된 형제 파일을 우선 사용
+        if (range_header is None and "gzip" in self.headers.get("Accept-Encoding", "")
+                and os.path.isfile(gz_path) and os.stat(gz_path).st_mtime >= os.stat(path).st_mtime):
+            encoding = "gzip"
+
+        served_path = gz_path if encoding else path
+        try:
+            f = open(served_path, "rb")
+        except OSError:
+            self.send_error(http.HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            fs = os.fstat(f.fileno())
+            etag = f'"{fs.st_mtime_ns:x}-{fs.st_size:x}{"-gz" if encoding else ""}"'
+            last_modified = self.date_time_string(int(fs.st_mtime))
+
+            if self._not_modified(etag, fs.st_mtime):
+                f.close()
+                self.send_response(http.HTTPStatus.NOT_MODIFIED)
+                self._send_validators(etag, last_modified, encoding)
+                self.end_headers()
+                return None
+
+            start, length = 0, fs.st_size
+            status = http.HTTPStatus.OK
+            if range_header is not None and self._range_applies(etag, fs.st_mtime):
+                byte_range = self._parse_range(range_header, fs.st_size)
+                if byte_range is None:
+                    f.close()
+                    self.send_response(http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header("Content-Range", f"bytes */{fs.st_size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+                start, end = byte_range
+                length = end - start + 1
+                status = http.HTTPStatus.PARTIAL_CONTENT
+
+            self.send_response(status)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            if status == http.HTTPStatus.PARTIAL_CONTENT:
+                self.send_header("Content-Range", f"bytes {start}-{start + length - 1}/{fs.st_size}")
+            self._send_validators(etag, last_modified, encoding)
+            self.end_headers()
+
+            f.seek(start)
+            self._byte_range = length
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def copyfile(self, source, outputfile):
+        # Range 응답에서는 요청한 길이만큼만 전송
+        remaining, self._byte_range = self._byte_range, None
+        try:
+            if remaining is None:
+                return super().copyfile(source, outputfile)
+            while remaining > 0:
+                chunk = source.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                outputfile.write(chunk)
+                remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # 전송 도중 클라이언트가 연결을 끊은 경우 (탐색으로 취소된 영상 요청 등)
+            self.close_connection = True
+
+    def _send_validators(self, etag: str, last_modified: str, encoding):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # 항상 재검증하도록 하여, 변경되지 않은 파일은 본문 없이 304로 끝나게 함
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        return self._unchanged_since(self.headers.get("If-Modified-Since"), mtime)
+
+    def _range_applies(self, etag: str, mtime: float) -> bool:
+        # If-Range가 현재 버전과 다르면 전체 파일을 보냄
+        if_range = self.headers.get("If-Range")
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag
+        return self._unchanged_since(if_range, mtime)
+
+    @staticmethod
+    def _unchanged_since(http_date, mtime: float) -> bool:
+        if not http_date:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(http_date)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        return since is not None and int(mtime) <= since.timestamp()
+
+    @staticmethod
+    def _parse_range(header: str, size: int):
+        """단일 구간 'bytes=a-b' 헤더를 (start, end)로 변환합니다. 만족할 수 없으면 None."""
+        first, last = _RANGE_RE.match(header.strip()).groups()
+        if size == 0:
+            return None
+        if first == "":
+            if last == "" or int(last) == 0:
+                return None
+            # 접미사 범위: 마지막 N 바이트
+            return max(size - int(last), 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return None
+        return start, end
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the web visualizer and exported scene data.")
+    parser.add_argument('--port', type=int, default=PORT, help="Port to listen on.")
+    parser.add_argument('--directory', type=str, default=DIRECTORY, help="Directory to serve.")
+    args = parser.parse_args()
+
+    print(f"Serving files from: {os.path.abspath(args.directory)}")
+    print(f"Access the visualizer at: http://localhost:{args.port}")
+
+    # 요청마다 스레드를 사용하므로 큰 파일 다운로드가 다른 요청을 막지 않음
+    handler = functools.partial(Handler, directory=args.directory)
+    with http.server.ThreadingHTTPServer(("", args.port), handler) as httpd:
+        httpd.serve_forever()
 
-print(f"Serving files from: {os.path.abspath(DIRECTORY)}")
-print(f"Access the visualizer at: http://localhost:{PORT}")
 
-with socketserver.TCPServer(("", PORT), Handler) as httpd:
-    httpd.serve_forever()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# src/checkpoint.py
+
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .pipeline import ProcessingStep, unwrap_step
+
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class Checkpoint:
+    """
+    긴 영상 처리를 중단된 지점부터 재개하기 위한 스냅샷.
+
+    Attributes:
+        source: 입력 영상 경로 (다른 영상의 체크포인트로 재개하는 것을 막기 위해 사용)
+        next_frame_index: 다음에 처리할 프레임 인덱스
+        frames_written: 출력 JSON에 기록된 프레임 수
+        json_offset: 마지막으로 완료된 프레임까지의 출력 JSON 바이트 길이
+        prev_frame: 마지막으로 처리한 (리사이즈된) 프레임. 다음 프레임의 FlowEstimationStep 입력입니다.
+        step_states: 스텝 인덱스별 ProcessingStep.get_state() 결과
+    """
+    source: str
+    next_frame_index: int
+    frames_written: int
+    json_offset: int
+    prev_frame: Optional[np.ndarray] = None
+    step_states: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    version: int = CHECKPOINT_VERSION
+
+
+def checkpoint_path(output_json: str) -> str:
+    """출력 JSON에 대응하는 체크포인트 파일 경로를 반환합니다."""
+    return output_json + ".ckpt"
+
+
+def collect_step_states(steps: List[ProcessingStep]) -> Dict[int, Dict[str, Any]]:
+    """상태를 가진 스텝들의 상태를 스텝 인덱스별로 모읍니다 (래퍼 스텝은 벗겨서 조회)."""
+    states = {}
+    for idx, step in enumerate(steps):
+        state = unwrap_step(step).get_state()
+        if state is not None:
+            states[idx] = state
+    return states
+
+
+def restore_step_states(steps: List[ProcessingStep], states: Dict[int, Dict[str, Any]]):
+    """collect_step_states()로 모은 상태를 같은 구성의 스텝 목록에 복원합니다."""
+    for idx, state in states.items():
+        if idx >= len(steps):
+            raise ValueError(f"Checkpoint has state for step {idx}, but the pipeline only has {len(steps)} steps")
+        unwrap_step(steps[idx]).set_state(state)
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint):
+    """체크포인트를 원자적으로 저장합니다 (쓰는 도중 중단되어도 이전 체크포인트가 유지됨)."""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Optional[Checkpoint]:
+    """체크포인트를 읽습니다. 파일이 없으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        checkpoint = pickle.load(f)
+    if not isinstance(checkpoint, Checkpoint) or checkpoint.version != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format in {path}")
+    return checkpoint
@@ -34,6 +34,41 @@ class Line2D:
     """2D 이미지 공간상의 단일 라인을 표현하는 데이터 클래스"""
     points: np.ndarray  # (N, 2) 형태의 2D 좌표 배열
 
+@dataclass
+class LineSet:
+    """여러 2D 라인을 하나의 포인트 버퍼와 오프셋 배열로 저장하는 컬럼형 컨테이너
+
+    i번째 라인은 points[offsets[i]:offsets[i + 1]] 입니다.
+    """
+    points: np.ndarray   # (M, 2) 형태로 모든 라인의 좌표를 이어 붙인 배열
+    offsets: np.ndarray  # (K + 1,) 형태의 라인 시작 인덱스 배열 (마지막 값 = M)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self) -> np.ndarray:
+        """라인별 포인트 개수를 반환합니다."""
+        return np.diff(self.offsets)
+
+    def line_points(self, index: int) -> np.ndarray:
+        """index번째 라인의 (N, 2) 좌표 배열(버퍼의 뷰)을 반환합니다."""
+        return self.points[self.offsets[index]:self.offsets[index + 1]]
+
+    def to_lines(self) -> List[Line2D]:
+        """버퍼를 공유하는 Line2D 리스트로 변환합니다."""
+        return [Line2D(points=self.points[s:e]) for s, e in zip(self.offsets[:-1], self.offsets[1:])]
+
+    @classmethod
+    def from_lines(cls, lines: List[Line2D]) -> 'LineSet':
+        """Line2D 리스트를 하나의 버퍼로 합칩니다."""
+        if not lines:
+            return cls(points=np.empty((0, 2), dtype=np.int32), offsets=np.zeros(1, dtype=np.int64))
+        lengths = np.array([len(line.points) for line in lines], dtype=np.int64)
+        return cls(
+            points=np.concatenate([line.points.reshape(-1, 2) for line in lines]),
+            offsets=np.concatenate([[0], np.cumsum(lengths)]),
+        )
+
 @dataclass
 class Curve2D:
     """B-spline 피팅이 적용된 2D 곡선을 표현"""
@@ -50,6 +85,7 @@ class FrameContext:
     depth_map: np.ndarray | None = None
     flow_map: np.ndarray | None = None
     lines_2d: List[Line2D] | None = None # Vectorization 결과
+    line_set: LineSet | None = None # Vectorization 결과 (컬럼형, lines_2d와 버퍼 공유)
     curves_2d: List[Curve2D] | None = None # Curve Fitting 결과
     lines: List[Line3D] | None = None
     circles: List[Circle] | None = None
@@ -0,0 +1,333 @@
+# src/live.py
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .data_models import FrameContext
+from .pipeline import Pipeline, ProcessingStep, FrameContextBuilder
+
+# 처리가 밀렸을 때 프레임을 버리는 방식
+#   latest: 항상 가장 최근 프레임만 처리하고 그 사이의 프레임은 버림
+#   skip:   순서대로 처리하되, 대기 시간이 예산을 넘긴 프레임은 건너뜀
+#   none:   버리지 않음 (지연이 계속 누적될 수 있음)
+DROP_POLICIES: Tuple[str, ...] = ("latest", "skip", "none")
+
+
+class SyntheticFrameSource:
+    """
+    카메라 없이 라이브 모드를 테스트하기 위한 합성 프레임 소스.
+
+    cv2.VideoCapture와 같은 read()/isOpened()/release() 인터페이스를 제공하며,
+    움직이는 사각형, 원, 선분이 그려진 프레임을 생성합니다. 프레임 내용은 인덱스와
+    시드로만 결정되므로 재현 가능합니다. realtime=True이면 fps에 맞춰 read()가 대기합니다.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0,
+                 num_frames: Optional[int] = None, realtime: bool = True, seed: int = 0):
+        """
+        Args:
+            width: 프레임 너비
+            height: 프레임 높이
+            fps: 초당 프레임 수
+            num_frames: 생성할 프레임 수 (None이면 무한)
+            realtime: True이면 실제 카메라처럼 fps 속도로 프레임을 내보냄
+            seed: 도형 배치와 노이즈의 난수 시드
+        """
+        if fps <= 0:
+            raise ValueError(f"fps must be positive, got {fps}")
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.num_frames = num_frames
+        self.realtime = realtime
+        self.index = 0
+        rng = np.random.default_rng(seed)
+        self._shapes = [
+            {
+                "kind": kind,
+                "origin": rng.uniform(0.2, 0.8, 2) * (width, height),
+                "velocity": rng.uniform(-3, 3, 2),
+                "size": rng.uniform(0.05, 0.15) * min(width, height),
+                "color": tuple(int(c) for c in rng.integers(40, 255, 3)),
+            }
+            for kind in ("rect", "circle", "line", "rect", "circle")
+        ]
+        self._noise = rng.integers(0, 12, (height, width, 1), dtype=np.uint8)
+        self._opened = True
+        self._start_time: Optional[float] = None
+
+    def frame_at(self, index: int) -> np.ndarray:
+        """index번째 합성 프레임을 생성합니다."""
+        frame = np.full((self.height, self.width, 3), 32, dtype=np.uint8)
+        frame += self._noise
+        for shape in self._shapes:
+            # 화면 경계에서 반사되는 등속 운동
+            span = np.array([self.width, self.height], dtype=np.float64)
+            pos = np.abs((shape["origin"] + shape["velocity"] * index) % (2 * span))
+            pos = np.where(pos > span, 2 * span - pos, pos)
+            x, y = int(pos[0]), int(pos[1])
+            size = int(shape["size"])
+            if shape["kind"] == "rect":
+                cv2.rectangle(frame, (x - size, y - size), (x + size, y + size), shape["color"], 2)
+            elif shape["kind"] == "circle":
+                cv2.circle(frame, (x, y), size, shape["color"], 2)
+            else:
+                angle = 0.05 * index
+                dx, dy = int(size * np.cos(angle)), int(size * np.sin(angle))
+                cv2.line(frame, (x - dx, y - dy), (x + dx, y + dy), shape["color"], 2)
+        return frame
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._opened or (self.num_frames is not None and self.index >= self.num_frames):
+            return False, None
+        if self.realtime:
+            if self._start_time is None:
+                self._start_time = time.perf_counter()
+            delay = self._start_time + self.index / self.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        frame = self.frame_at(self.index)
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+def open_live_source(source: str, **synthetic_kwargs):
+    """
+    라이브 입력 소스를 엽니다.
+
+    Args:
+        source: 웹캠 인덱스("0"), "synthetic", 또는 cv2.VideoCapture가 여는 경로/URL
+            (named pipe, rtsp://, udp:// 등)
+        synthetic_kwargs: source가 "synthetic"일 때 SyntheticFrameSource에 전달할 인자
+
+    Returns:
+        read()/isOpened()/release()를 제공하는 캡처 객체
+    """
+    if source == "synthetic":
+        return SyntheticFrameSource(**synthetic_kwargs)
+    capture = cv2.VideoCapture(int(source)) if source.isdigit() else cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise IOError(f"Could not open live source '{source}'")
+    return capture
+
+
+class FrameGrabber:
+    """
+    백그라운드 스레드에서 소스를 계속 읽어, 처리 속도와 무관하게 캡처가 멈추지 않도록 합니다.
+
+    각 프레임은 캡처 시각과 함께 보관되며, drop_policy에 따라 처리되지 못한 프레임을 버립니다.
+    캡처는 그래버가 소유하며, 읽기 스레드가 끝날 때 그 스레드에서 해제합니다.
+    """
+
+    def __init__(self, capture, drop_policy: str = "latest", max_queue: int = 64):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}'. Available: {list(DROP_POLICIES)}")
+        self.capture = capture
+        self.drop_policy = drop_policy
+        # latest 정책은 최신 프레임 하나만, skip 정책은 최대 max_queue개만 유지
+        maxlen = {"latest": 1, "skip": max_queue, "none": None}[drop_policy]
+        self._frames: Deque[Tuple[np.ndarray, float]] = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._finished = False
+        self._stop_requested = False
+        self.captured = 0
+        self.overwritten = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "FrameGrabber":
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self._stop_requested and self.capture.isOpened():
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                with self._cond:
+                    if len(self._frames) == self._frames.maxlen:
+                        # 처리되지 못한 가장 오래된 프레임은 deque에서 밀려나 버려짐
+                        self.overwritten += 1
+                    self._frames.append((frame, time.perf_counter()))
+                    self.captured += 1
+                    self._cond.notify()
+        finally:
+            # 읽기 중인 캡처가 해제되지 않도록 읽기 스레드에서 직접 해제
+            self.capture.release()
+            with self._cond:
+                self._finished = True
+                self._cond.notify()
+
+    def next(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        """다음에 처리할 (프레임, 캡처 시각)을 반환합니다. 소스가 끝났으면 None을 반환합니다."""
+        with self._cond:
+            while not self._frames and not self._finished:
+                if not self._cond.wait(timeout):
+                    return None
+            if not self._frames:
+                return None
+            return self._frames.popleft()
+
+    def stop(self):
+        """
+        읽기 스레드에 종료를 요청하고 최대 1초 기다립니다. 캡처는 읽기 스레드가 끝날 때 해제되므로,
+        read()가 1초 넘게 막혀 있어도 읽는 도중에 해제되지 않습니다.
+        """
+        self._stop_requested = True
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        elif self._thread.ident is None:
+            # 시작되지 않은 그래버는 해제할 스레드가 없음
+            self.capture.release()
+
+
+@dataclass
+class LatencyReport:
+    """라이브 실행의 지연 시간 통계"""
+    processed: int = 0
+    dropped: int = 0
+    degraded: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    processing_ms: List[float] = field(default_factory=list)
+
+    def percentiles(self, values: Sequence[float] | None = None) -> Dict[str, float]:
+        values = self.latencies_ms if values is None else values
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+    def summary(self) -> str:
+        latency = self.percentiles()
+        processing = self.percentiles(self.processing_ms)
+        return (
+            f"Processed {self.processed} frames, dropped {self.dropped}, degraded {self.degraded}. "
+            f"Latency p50/p95/p99: {latency['p50']:.1f}/{latency['p95']:.1f}/{latency['p99']:.1f} ms "
+            f"(processing {processing['p50']:.1f}/{processing['p95']:.1f}/{processing['p99']:.1f} ms)"
+        )
+
+
+class LiveRunner:
+    """
+    지연 예산 안에서 라이브 소스를 처리하는 실행기.
+
+    캡처부터 처리 완료까지의 지연을 측정하고, 처리 시간이 예산을 넘기면 optional_steps를
+    뒤에서부터 하나씩 건너뛰어 품질을 낮춥니다. 처리 시간이 예산의 recover_ratio 이하로
+    recover_frames 프레임 연속 유지되면 건너뛴 스텝을 하나씩 되살립니다.
+    """
+
+    def __init__(self, pipeline: Pipeline, latency_budget_ms: float = 100.0,
+                 optional_steps: Sequence[ProcessingStep] = (), drop_policy: str = "latest",
+                 recover_ratio: float = 0.6, recover_frames: int = 10,
+                 frame_transform: Callable[[np.ndarray], np.ndarray] | None = None):
+        """
+        Args:
+            pipeline: 실행할 파이프라인
+            latency_budget_ms: 프레임당 지연 예산 (밀리초)
+            optional_steps: 품질 저하 시 건너뛸 수 있는 스텝들 (중요도가 높은 순)
+            drop_policy: DROP_POLICIES 중 하나
+            recover_ratio: 스텝을 되살리기 위한 처리 시간/예산 비율 상한
+            recover_frames: 스텝을 되살리기 전에 연속으로 여유가 있어야 하는 프레임 수
+            frame_transform: 파이프라인에 넣기 전에 각 프레임에 적용할 함수 (예: 리사이즈)
+        """
+        if latency_budget_ms <= 0:
+            raise ValueError(f"latency_budget_ms must be positive, got {latency_budget_ms}")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}'. Available: {list(DROP_POLICIES)}")
+        unknown = [step for step in optional_steps if step not in pipeline.steps]
+        if unknown:
+            raise ValueError(f"Optional steps are not part of the pipeline: {[type(s).__name__ for s in unknown]}")
+        self.pipeline = pipeline
+        self.latency_budget_ms = latency_budget_ms
+        self.optional_steps = list(optional_steps)
+        self.drop_policy = drop_policy
+        self.recover_ratio = recover_ratio
+        self.recover_frames = recover_frames
+        self.frame_transform = frame_transform
+        self.degrade_level = 0
+        self._calm_frames = 0
+
+    @property
+    def skipped_steps(self) -> List[ProcessingStep]:
+        """현재 품질 수준에서 건너뛰는 스텝들"""
+        return self.optional_steps[len(self.optional_steps) - self.degrade_level:] if self.degrade_level else []
+
+    def _update_quality(self, processing_ms: float):
+        if processing_ms > self.latency_budget_ms:
+            self._calm_frames = 0
+            if self.degrade_level < len(self.optional_steps):
+                self.degrade_level += 1
+                print(f"Over latency budget ({processing_ms:.1f} ms): skipping "
+                      f"{[type(s).__name__ for s in self.skipped_steps]}")
+        elif processing_ms <= self.recover_ratio * self.latency_budget_ms and self.degrade_level:
+            self._calm_frames += 1
+            if self._calm_frames >= self.recover_frames:
+                self.degrade_level -= 1
+                self._calm_frames = 0
+        else:
+            self._calm_frames = 0
+
+    def run(self, capture, on_frame: Callable[[FrameContext], None] | None = None,
+            max_frames: Optional[int] = None) -> LatencyReport:
+        """
+        소스가 끝나거나 max_frames개를 처리할 때까지 프레임을 처리합니다.
+
+        Args:
+            capture: read()/isOpened()/release()를 제공하는 캡처 객체
+            on_frame: 처리된 FrameContext마다 호출되는 콜백
+            max_frames: 처리할 최대 프레임 수
+
+        Returns:
+            지연 시간 통계
+        """
+        report = LatencyReport()
+        grabber = FrameGrabber(capture, self.drop_policy).start()
+        prev_frame = None
+        frame_idx = 0
+        try:
+            while max_frames is None or report.processed < max_frames:
+                item = grabber.next()
+                if item is None:
+                    break
+                frame, captured_at = item
+                waited_ms = (time.perf_counter() - captured_at) * 1000.0
+                if self.drop_policy == "skip" and waited_ms > self.latency_budget_ms:
+                    report.dropped += 1
+                    continue
+
+                skip = self.skipped_steps
+                if skip:
+                    report.degraded += 1
+                start = time.perf_counter()
+                if self.frame_transform is not None:
+                    frame = self.frame_transform(frame)
+                builder = FrameContextBuilder(frame_index=frame_idx, original_frame=frame, prev_frame=prev_frame)
+                context = self.pipeline.run(builder, skip=skip)
+                done = time.perf_counter()
+
+                processing_ms = (done - start) * 1000.0
+                report.processing_ms.append(processing_ms)
+                report.latencies_ms.append((done - captured_at) * 1000.0)
+                report.processed += 1
+                self._update_quality(processing_ms)
+
+                if on_frame is not None:
+                    on_frame(context)
+                prev_frame = frame
+                frame_idx += 1
+        finally:
+            grabber.stop()
+        report.dropped += grabber.overwritten
+        return report
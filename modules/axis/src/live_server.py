@@ -0,0 +1,280 @@
+# src/live_server.py
+
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+# RFC 6455 핸드셰이크에 사용되는 고정 GUID
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+# 클라이언트 메시지는 제어 프레임(ping/close)만 처리하므로 제어 프레임의 최대 크기까지만 받음
+MAX_CLIENT_PAYLOAD = 125
+CLOSE_NORMAL, CLOSE_TOO_BIG = 1000, 1009
+
+
+class FrameTooLarge(ValueError):
+    """클라이언트 프레임이 허용 크기를 넘을 때 발생합니다."""
+    pass
+
+
+def websocket_accept_key(key: str) -> str:
+    """클라이언트의 Sec-WebSocket-Key에 대한 Sec-WebSocket-Accept 값을 계산합니다."""
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+def encode_frame(payload: bytes, opcode: int = OP_TEXT) -> bytes:
+    """서버 -> 클라이언트 방향의 (마스크 없는) 단일 WebSocket 프레임을 만듭니다."""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+
+def close_payload(code: int) -> bytes:
+    """close 프레임의 상태 코드 페이로드를 만듭니다."""
+    return struct.pack("!H", code)
+
+
+async def read_frame(reader: asyncio.StreamReader, max_payload: int = MAX_CLIENT_PAYLOAD) -> Tuple[int, bytes]:
+    """
+    클라이언트가 보낸 WebSocket 프레임 하나를 읽어 (opcode, payload)를 반환합니다.
+
+    Raises:
+        FrameTooLarge: 헤더의 페이로드 길이가 max_payload를 넘을 때 (페이로드를 읽기 전에 발생)
+    """
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > max_payload:
+        raise FrameTooLarge(f"Client frame of {length} bytes exceeds {max_payload} bytes")
+    mask = await reader.readexactly(4) if second & 0x80 else b""
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class ClientChannel:
+    """
+    클라이언트 하나의 송신 대기열.
+
+    큐 크기가 제한되어 있어 느린 클라이언트가 파이프라인이나 다른 클라이언트를 막지 않습니다.
+    큐가 가득 차면 가장 오래된 프레임을 버리고 최신 프레임을 넣습니다.
+    """
+
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.close_frame: Optional[bytes] = None
+
+    def offer(self, message: Optional[bytes]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    def close(self, close_frame: Optional[bytes] = None, discard_pending: bool = False):
+        """
+        송신 루프를 끝냅니다. close_frame이 있으면 마지막으로 보내며, None이면 아무것도 보내지 않습니다
+        (연결이 이미 끊긴 경우). discard_pending이면 대기 중인 프레임을 보내지 않고 버립니다.
+        """
+        self.close_frame = close_frame
+        if discard_pending:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.offer(None)
+
+
+class LiveResultsServer:
+    """
+    파이프라인 처리 결과를 프레임이 끝나는 대로 WebSocket 클라이언트에 푸시하는 비동기 서버.
+
+    서버는 별도 스레드의 asyncio 이벤트 루프에서 실행되고, 파이프라인(메인 스레드)은
+    publish()로 프레임 데이터를 넘깁니다. 새로 접속한 클라이언트는 hello 메시지와 함께
+    가장 최근 프레임을 먼저 받습니다. 메시지는 {"type": "frame" | "hello" | "done", ...} 형태의 JSON입니다.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, path: str = "/ws", max_pending: int = 8):
+        """
+        Args:
+            host: 바인딩할 주소 (기본값은 로컬 전용. 다른 기기에서 접속하려면 "0.0.0.0"을 명시)
+            port: 바인딩할 포트 (0이면 임의의 빈 포트)
+            path: WebSocket 엔드포인트 경로
+            max_pending: 클라이언트별로 대기시킬 최대 프레임 수 (백프레셔)
+        """
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be positive, got {max_pending}")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_pending = max_pending
+        self.frames_published = 0
+        self._clients: Set[ClientChannel] = set()
+        self._latest: Optional[bytes] = None
+        self._done = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    # --- 파이프라인 스레드에서 호출하는 API ---
+
+    def start_in_thread(self) -> "LiveResultsServer":
+        """백그라운드 스레드에서 서버를 시작하고 리스닝을 시작할 때까지 기다립니다."""
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        print(f"Live results WebSocket at ws://{self.host}:{self.port}{self.path}")
+        return self
+
+    def publish(self, frame_data: Dict[str, Any]):
+        """프레임 결과를 모든 클라이언트에 보냅니다. 어떤 스레드에서든 호출할 수 있습니다."""
+        # JSON 인코딩은 호출 스레드에서 수행하여 이벤트 루프를 막지 않음
+        message = encode_frame(json.dumps({"type": "frame", **frame_data}).encode())
+        self._loop.call_soon_threadsafe(self._broadcast, message, False)
+
+    def finish(self, **summary: Any):
+        """처리가 끝났음을 알립니다."""
+        message = encode_frame(json.dumps({"type": "done", **summary}).encode())
+        self._loop.call_soon_threadsafe(self._broadcast, message, True)
+
+    def close(self):
+        """대기 중인 메시지를 보낸 뒤 서버를 종료합니다."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=10)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    # --- 이벤트 루프 내부 ---
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    def _broadcast(self, message: bytes, done: bool):
+        if done:
+            self._done = True
+        else:
+            self._latest = message
+            self.frames_published += 1
+        for channel in self._clients:
+            channel.offer(message)
+
+    async def _shutdown(self):
+        # 모든 클라이언트 큐가 비거나 시간 제한이 지날 때까지 기다림
+        for _ in range(100):
+            if all(channel.queue.empty() for channel in self._clients):
+                break
+            await asyncio.sleep(0.05)
+        self._server.close()
+        for channel in list(self._clients):
+            channel.close(encode_frame(close_payload(CLOSE_NORMAL), OP_CLOSE))
+        await self._server.wait_closed()
+        self._loop.call_soon(self._loop.stop)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line, headers = await self._read_request(reader)
+        except (asyncio.IncompleteReadError, ValueError):
+            writer.close()
+            return
+
+        parts = request_line.split()
+        key = headers.get("sec-websocket-key")
+        if len(parts) < 2 or parts[1] != self.path or headers.get("upgrade", "").lower() != "websocket" or not key:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            return
+
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocket_accept_key(key)}\r\n\r\n".encode()
+        )
+        channel = ClientChannel(self.max_pending)
+        channel.offer(encode_frame(json.dumps(
+            {"type": "hello", "frames_published": self.frames_published, "done": self._done}).encode()))
+        if self._latest is not None:
+            channel.offer(self._latest)
+        self._clients.add(channel)
+
+        receiver = asyncio.ensure_future(self._receive(reader, writer, channel))
+        try:
+            await self._send(writer, channel)
+        finally:
+            self._clients.discard(channel)
+            receiver.cancel()
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str]]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return request_line, headers
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, channel: ClientChannel):
+        while True:
+            message = await channel.queue.get()
+            if message is None:
+                if channel.close_frame is not None:
+                    writer.write(channel.close_frame)
+                    try:
+                        await writer.drain()
+                    except ConnectionError:
+                        pass
+                return
+            writer.write(message)
+            try:
+                # 느린 클라이언트는 여기서 대기하며, 그동안 큐에서 오래된 프레임이 버려짐
+                await writer.drain()
+            except ConnectionError:
+                return
+
+    @staticmethod
+    async def _receive(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, channel: ClientChannel):
+        # 클라이언트 메시지는 제어 프레임만 처리 (ping/close)
+        try:
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == OP_PING:
+                    writer.write(encode_frame(payload, OP_PONG))
+                elif opcode == OP_CLOSE:
+                    # RFC 6455 5.5.1: 받은 상태 코드를 담은 close 프레임으로 응답한 뒤 연결을 끊음
+                    channel.close(encode_frame(payload[:2], OP_CLOSE), discard_pending=True)
+                    return
+        except FrameTooLarge:
+            channel.close(encode_frame(close_payload(CLOSE_TOO_BIG), OP_CLOSE), discard_pending=True)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # 연결이 끊겼으므로 보낼 것 없이 송신 루프만 종료
+            channel.close()
@@ -0,0 +1,86 @@
+# src/lod.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .steps.vectorization import simplify_polylines
+
+# 거친 레벨부터 세밀한 레벨 순서의 Douglas-Peucker 허용 오차 (픽셀)
+DEFAULT_LOD_TOLERANCES = (8.0, 2.0, 0.5)
+
+
+@dataclass
+class LinePyramid:
+    """
+    라인별 다중 해상도(LOD) 단순화 결과.
+
+    Douglas-Peucker는 허용 오차가 커질수록 남는 점이 작은 허용 오차 결과의 부분집합이 되므로,
+    레벨마다 점을 따로 저장하지 않고 가장 세밀한 레벨의 점만 연속으로 저장한 뒤 각 점이
+    처음 나타나는 레벨을 기록합니다. 레벨 L을 그리려면 levels <= L인 점만 순서대로 이으면 됩니다.
+    """
+    points: np.ndarray  # (M, 2) 가장 세밀한 레벨의 모든 라인 점
+    offsets: np.ndarray  # (K + 1,) 라인 시작 인덱스
+    levels: np.ndarray  # (M,) uint8, 점이 처음 포함되는 레벨 (0 = 가장 거침)
+    tolerances: Sequence[float]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def level_points(self, index: int, level: int) -> np.ndarray:
+        """index번째 라인의 level 레벨 점들을 반환합니다."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.points[start:end][self.levels[start:end] <= level]
+
+    def to_json_items(self, decimals: int = 2) -> List[Dict[str, Any]]:
+        """scene_data.json용 항목 목록 ({"id", "points", "lod"})으로 변환합니다."""
+        points = np.round(self.points, decimals) if self.points.dtype.kind == "f" else self.points
+        points, levels = points.tolist(), self.levels.tolist()
+        offsets = self.offsets.tolist()
+        return [
+            {"id": i, "points": points[offsets[i]:offsets[i + 1]], "lod": levels[offsets[i]:offsets[i + 1]]}
+            for i in range(len(offsets) - 1)
+        ]
+
+
+def build_line_pyramid(lines: Sequence[np.ndarray], tolerances: Sequence[float] = DEFAULT_LOD_TOLERANCES) -> LinePyramid:
+    """
+    모든 라인에 대해 여러 허용 오차의 Douglas-Peucker 단순화를 일괄 계산합니다.
+
+    Args:
+        lines: (N_i, 2) 형태의 라인 점 배열 목록
+        tolerances: 거친 레벨부터 세밀한 레벨 순서의 허용 오차 (내림차순)
+
+    Returns:
+        가장 작은 허용 오차에서 제거되는 점을 뺀 LinePyramid
+    """
+    tolerances = [float(t) for t in tolerances]
+    if not tolerances or any(t < 0 for t in tolerances) or tolerances != sorted(tolerances, reverse=True):
+        raise ValueError(f"tolerances must be non-negative and in descending order, got {tolerances}")
+    if len(tolerances) > 254:
+        raise ValueError("At most 254 levels are supported")
+
+    lengths = np.array([len(line) for line in lines], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    if not len(lines) or offsets[-1] == 0:
+        return LinePyramid(points=np.empty((0, 2)), offsets=np.zeros(len(lines) + 1, dtype=np.int64),
+                           levels=np.empty(0, dtype=np.uint8), tolerances=tuple(tolerances))
+    points = np.concatenate([np.asarray(line).reshape(-1, 2) for line in lines])
+
+    # 세밀한 레벨부터 계산하며 각 점이 포함되는 가장 거친 레벨을 기록
+    levels = np.full(len(points), len(tolerances), dtype=np.uint8)
+    for level in range(len(tolerances) - 1, -1, -1):
+        keep = simplify_polylines(points, offsets, np.full(len(lines), tolerances[level]))
+        levels[keep] = level
+
+    # 가장 세밀한 레벨에도 포함되지 않는 점은 내보내지 않음
+    kept = levels < len(tolerances)
+    line_ids = np.repeat(np.arange(len(lines)), lengths)
+    kept_counts = np.bincount(line_ids[kept], minlength=len(lines))
+    return LinePyramid(
+        points=points[kept],
+        offsets=np.concatenate([[0], np.cumsum(kept_counts)]),
+        levels=levels[kept],
+        tolerances=tuple(tolerances),
+    )
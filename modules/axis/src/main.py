@@ -4,9 +4,17 @@ import argparse
 import numpy as np
 import json
 import dataclasses
-from typing import List
+import gzip
+import shutil
+from typing import List, Sequence
 
-from AXIS.src.pipeline import Pipeline, FrameContextBuilder
+from AXIS.src.pipeline import Pipeline, FrameContextBuilder, RetentionPolicy, unwrap_step
+from AXIS.src.live import DROP_POLICIES, LiveRunner, open_live_source
+from AXIS.src.live_server import LiveResultsServer
+from AXIS.src.lod import DEFAULT_LOD_TOLERANCES, build_line_pyramid
+from AXIS.src.profiling import PipelineProfiler
+from AXIS.src.checkpoint import (Checkpoint, checkpoint_path, collect_step_states, load_checkpoint,
+                                 restore_step_states, save_checkpoint)
 from AXIS.src.data_models import Line3D, Curve2D
 from AXIS.src.steps.detection import EdgeDetectionStep
 from AXIS.src.steps.estimation import DepthEstimationStep, FlowEstimationStep
@@ -14,7 +22,9 @@ from AXIS.src.steps.vectorization import LineVectorizationStep
 from AXIS.src.steps.fitting import CurveFittingStep
 from AXIS.src.steps.projection import Backprojection3DStep, CAMERA_INTRINSICS
 from AXIS.src.steps.tracking import LineTrackingStep
-from AXIS.src.strategies.detectors import CannyDetector
+from AXIS.src.steps.memoization import MemoizedStep
+from AXIS.src.steps.multiresolution import PyramidLevelStep
+from AXIS.src.strategies.detectors import CannyDetector, TiledEdgeDetector
 from AXIS.src.strategies.estimators import MiDaSEstimator, RAFTEstimator
 
 def _project_3d_to_2d(lines_3d: List[Line3D], h: int, w: int) -> List[np.ndarray]:
@@ -68,79 +78,248 @@ def save_frame_visuals(context, base_output_dir: str):
             cv2.polylines(overlay_canvas, [np.int32(curve.points)], isClosed=False, color=(255, 0, 0, 255), thickness=1)
     cv2.imwrite(os.path.join(output_dir, "overlay.png"), overlay_canvas)
 
+def build_frame_data(context, lod_tolerances: Sequence[float] = ()) -> dict:
+    """
+    FrameContext에서 scene_data.json에 기록할 프레임 데이터를 만듭니다.
+
+    lod_tolerances가 주어지면 각 라인/곡선을 여러 단순화 레벨로 내보냅니다. 가장 세밀한 레벨의 점만
+    저장하고 점마다 처음 포함되는 레벨("lod")을 기록하므로, 뷰어는 줌과 재생 속도에 맞춰 레벨을 고릅니다.
+    """
+    frame_data = {"frame_index": context.frame_index}
+    if lod_tolerances and (context.lines_2d or context.curves_2d):
+        frame_data["lod_tolerances"] = list(lod_tolerances)
+    for key, items in (("lines", context.lines_2d), ("curves", context.curves_2d)):
+        if not items:
+            continue
+        if lod_tolerances:
+            frame_data[key] = build_line_pyramid([item.points for item in items], lod_tolerances).to_json_items()
+        else:
+            frame_data[key] = [{"id": i, "points": item.points.tolist()} for i, item in enumerate(items)]
+    return frame_data
+
+def write_gzip_sibling(path: str) -> str:
+    """정적 서버가 그대로 전송할 수 있도록 파일 옆에 미리 압축한 `.gz` 파일을 만듭니다."""
+    gz_path = path + ".gz"
+    with open(path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    return gz_path
+
+def seek_to_frame(cap, frame_index: int):
+    """캡처를 frame_index 프레임 앞으로 이동합니다. 탐색이 부정확한 코덱에서는 프레임을 읽어 넘깁니다."""
+    if frame_index <= 0:
+        return
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_index:
+        return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame_index):
+        if not cap.grab():
+            break
+
+def resize_to_max_height(frame: np.ndarray, max_height: int) -> np.ndarray:
+    """max_height보다 높은 프레임을 비율을 유지하며 축소합니다 (0이면 그대로)."""
+    h, w = frame.shape[:2]
+    if max_height and h > max_height:
+        scale = max_height / h
+        new_w, new_h = int(w * scale), int(h * scale)
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    return frame
+
 def main():
     parser = argparse.ArgumentParser(description="Generate visualization data from a video.")
-    parser.add_argument('--video', type=str, required=True, help="Path to the input video file.")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--video', type=str, help="Path to the input video file.")
+    source_group.add_argument('--live', type=str, help="Live source: webcam index (e.g. 0), 'synthetic', or a named pipe / stream URL.")
     parser.add_argument('--output_json', type=str, required=True, help="Path to save the output scene_data.json file.")
     parser.add_argument('--output_dir', type=str, required=True, help="Directory to save the output PNG images.")
     parser.add_argument('--max_frames', type=int, default=None, help='Maximum number of frames to process for testing.')
+    parser.add_argument('--max_height', type=int, default=512, help='Resize frames taller than this before processing (0 keeps the original resolution).')
+    parser.add_argument('--edge_tile_size', type=int, default=0, help='Run edge detection on overlapping tiles of this size across a thread pool (0 disables tiling).')
+    parser.add_argument('--fit_workers', type=int, default=1, help='Worker processes for curve fitting (default: 1, fits in-process). Larger values start a process pool.')
+    parser.add_argument('--adaptive_fit_samples', action='store_true', help='Sample fitted curves by arc length instead of a fixed 100 points per curve.')
+    parser.add_argument('--retain_contexts', type=int, default=1, help='Number of recent FrameContexts the pipeline keeps in memory.')
+    parser.add_argument('--map_dtype', type=str, default='float32', choices=['float32', 'float16', 'uint8'], help='Storage precision for depth and flow maps (uint8 quantizes depth maps only; flow maps are then stored as float16). Maps are never widened.')
+    parser.add_argument('--cache_dir', type=str, default=None, help='Directory for per-step disk memoization. Upstream results are reloaded when only downstream parameters change.')
+    parser.add_argument('--latency_budget_ms', type=float, default=100.0, help='Live mode: per-frame latency budget in milliseconds.')
+    parser.add_argument('--drop_policy', type=str, default='latest', choices=list(DROP_POLICIES), help='Live mode: how to drop frames when processing falls behind.')
+    parser.add_argument('--optional_steps', type=str, nargs='*', default=['CurveFittingStep'], help='Live mode: step class names that may be skipped when over budget, most important first.')
+    parser.add_argument('--lod_tolerances', type=float, nargs='*', default=list(DEFAULT_LOD_TOLERANCES), help='Douglas-Peucker tolerances (pixels, coarse to fine) for the exported level-of-detail pyramid. Pass no values to export full-density points.')
+    parser.add_argument('--no_precompress', action='store_true', help='Do not write a gzip sibling (.gz) of the output JSON for the static server.')
+    parser.add_argument('--profile_dir', type=str, default=None, help='Record per-step wall time and per-frame object counts; write a CSV, histograms and a report here.')
+    parser.add_argument('--profile_allocations', action='store_true', help='With --profile_dir, also record peak memory allocated per step (tracemalloc; slower).')
+    parser.add_argument('--checkpoint_every', type=int, default=100, help='Video mode: flush outputs and save a resumable checkpoint every N frames (0 disables).')
+    parser.add_argument('--resume', action='store_true', help='Video mode: continue from the last checkpoint of --output_json instead of starting over.')
+    parser.add_argument('--ws_port', type=int, default=None, help='Push each processed frame to web_visualizer clients over WebSocket on this port while processing.')
+    parser.add_argument('--ws_host', type=str, default='127.0.0.1', help="Address the WebSocket server binds to (use 0.0.0.0 to accept other machines).")
     args = parser.parse_args()
 
-    print(f"--- Generating visualization data for {args.video} ---")
-    
-    if not os.path.exists(args.video):
+    print(f"--- Generating visualization data for {args.video or args.live} ---")
+
+    if args.video and not os.path.exists(args.video):
         print(f"Error: Input video not found at {args.video}")
         return
 
+    ckpt_path = checkpoint_path(args.output_json)
+    resume_from = None
+    if args.resume:
+        if args.live:
+            parser.error("--resume is only supported with --video")
+        resume_from = load_checkpoint(ckpt_path)
+        if resume_from is None:
+            print(f"No checkpoint found at {ckpt_path}; starting from the beginning.")
+        elif os.path.abspath(resume_from.source) != os.path.abspath(args.video):
+            parser.error(f"Checkpoint {ckpt_path} was written for {resume_from.source}, not {args.video}")
+
     os.makedirs(args.output_dir, exist_ok=True)
 
     print("Initializing strategies...")
-    pipeline = Pipeline(steps=[
-        EdgeDetectionStep(strategy=CannyDetector()),
+    edge_detector = CannyDetector()
+    if args.edge_tile_size > 0:
+        edge_detector = TiledEdgeDetector(edge_detector, tile_size=args.edge_tile_size)
+
+    steps = [
+        EdgeDetectionStep(strategy=edge_detector),
         LineVectorizationStep(),
-        CurveFittingStep(), # New step
-        # DepthEstimationStep(strategy=MiDaSEstimator()),
+        CurveFittingStep(num_samples=None if args.adaptive_fit_samples else 100, max_workers=args.fit_workers),
+        # MiDaS는 원본 해상도가 필요 없으므로 피라미드 레벨 2(1/4 해상도)에서 실행
+        # PyramidLevelStep(DepthEstimationStep(strategy=MiDaSEstimator()), level=2),
         # FlowEstimationStep(strategy=RAFTEstimator(model_name="raft_small")),
         # Backprojection3DStep(),
         # LineTrackingStep(),
-    ])
-
-    cap = cv2.VideoCapture(args.video)
-    prev_frame = None
-    frame_idx = 0
-    all_frames_data = []
-    
-    print("Starting video processing...")
-    while cap.isOpened():
-        if args.max_frames is not None and frame_idx >= args.max_frames:
-            print(f"Reached max_frames limit of {args.max_frames}.")
-            break
+    ]
+    if args.cache_dir:
+        # LineTrackingStep은 프레임 간 상태를 가지므로 메모이즈하지 않음
+        steps = [step if isinstance(step, LineTrackingStep) else MemoizedStep(step, args.cache_dir) for step in steps]
+    map_dtypes = {}
+    if args.map_dtype != 'float32':
+        # flow_map은 부호와 크기가 의미를 가지므로 uint8 대신 float16으로 저장
+        map_dtypes = {"depth_map": args.map_dtype, "flow_map": 'float16'}
+    retention = RetentionPolicy(max_contexts=args.retain_contexts, map_dtypes=map_dtypes)
+    profiler = PipelineProfiler(track_allocations=args.profile_allocations) if args.profile_dir else None
+    pipeline_steps = profiler.wrap(steps) if profiler else steps
+    pipeline = Pipeline(steps=pipeline_steps, retention=retention)
+    if profiler:
+        pipeline.add_observer(profiler)
+
+    # 프레임 결과를 메모리에 쌓지 않고 바로 JSON 배열로 스트리밍하여 메모리 사용량을 일정하게 유지
+    output_json_dir = os.path.dirname(args.output_json)
+    if output_json_dir: os.makedirs(output_json_dir, exist_ok=True)
+    if resume_from is not None:
+        # 마지막 체크포인트 이후에 기록된 (불완전할 수 있는) 프레임을 잘라내고 이어서 기록
+        json_file = open(args.output_json, 'r+', encoding='utf-8')
+        json_file.truncate(resume_from.json_offset)
+        json_file.seek(resume_from.json_offset)
+        restore_step_states(steps, resume_from.step_states)
+    else:
+        json_file = open(args.output_json, 'w', encoding='utf-8')
+        json_file.write("[")
 
-        ret, frame = cap.read()
-        if not ret: break
+    live_server = LiveResultsServer(host=args.ws_host, port=args.ws_port).start_in_thread() if args.ws_port is not None else None
 
-        max_height = 512
-        h, w, _ = frame.shape
-        if h > max_height:
-            scale = max_height / h
-            new_w, new_h = int(w * scale), int(h * scale)
-            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    preprocess_hits = preprocess_misses = 0
+    frames_written = resume_from.frames_written if resume_from else 0
+    last_context = None
 
-        builder = FrameContextBuilder(frame_index=frame_idx, original_frame=frame, prev_frame=prev_frame)
-        print(f"Running pipeline for frame {frame_idx}...")
-        processed_context = pipeline.run(builder)
+    def write_frame(context):
+        nonlocal preprocess_hits, preprocess_misses, frames_written, last_context
+        if context.metrics:
+            preprocess_hits += int(context.metrics.get("preprocess_cache_hits", 0))
+            preprocess_misses += int(context.metrics.get("preprocess_cache_misses", 0))
+        frame_data = build_frame_data(context, args.lod_tolerances)
+        if frames_written > 0: json_file.write(",")
+        json.dump(frame_data, json_file)
+        if live_server is not None:
+            live_server.publish(frame_data)
+        frames_written += 1
+        last_context = context
 
-        save_frame_visuals(processed_context, args.output_dir)
+    if args.live:
+        # 라이브 모드: 프레임마다 PNG를 쓰면 예산을 잡아먹으므로 마지막 프레임만 저장
+        step_names = {step: type(unwrap_step(step)).__name__ for step in pipeline_steps}
+        optional = sorted((step for step in pipeline_steps if step_names[step] in args.optional_steps),
+                          key=lambda step: args.optional_steps.index(step_names[step]))
+        runner = LiveRunner(
+            pipeline,
+            latency_budget_ms=args.latency_budget_ms,
+            optional_steps=optional,
+            drop_policy=args.drop_policy,
+            frame_transform=lambda frame: resize_to_max_height(frame, args.max_height),
+        )
+        print("Starting live processing...")
+        report = runner.run(open_live_source(args.live), on_frame=write_frame, max_frames=args.max_frames)
+        if last_context is not None:
+            save_frame_visuals(last_context, args.output_dir)
+        print("Live processing finished.")
+        print(report.summary())
+    else:
+        cap = cv2.VideoCapture(args.video)
+        prev_frame = None
+        frame_idx = 0
+        if resume_from is not None:
+            frame_idx = resume_from.next_frame_index
+            prev_frame = resume_from.prev_frame
+            seek_to_frame(cap, frame_idx)
+            print(f"Resuming from checkpoint at frame {frame_idx} ({frames_written} frames already written).")
 
-        frame_data = {"frame_index": frame_idx}
-        if processed_context.lines_2d:
-            frame_data["lines"] = [{"id": i, "points": line.points.tolist()} for i, line in enumerate(processed_context.lines_2d)]
-        if processed_context.curves_2d:
-            frame_data["curves"] = [{"id": i, "points": curve.points.tolist()} for i, curve in enumerate(processed_context.curves_2d)]
-        all_frames_data.append(frame_data)
+        def write_checkpoint():
+            # 완료된 프레임 출력을 디스크에 내린 뒤, 그 위치와 스텝 상태를 함께 저장
+            json_file.flush()
+            os.fsync(json_file.fileno())
+            save_checkpoint(ckpt_path, Checkpoint(
+                source=args.video,
+                next_frame_index=frame_idx,
+                frames_written=frames_written,
+                json_offset=os.fstat(json_file.fileno()).st_size,
+                prev_frame=prev_frame,
+                step_states=collect_step_states(steps),
+            ))
 
-        prev_frame = frame
-        frame_idx += 1
+        print("Starting video processing...")
+        while cap.isOpened():
+            if args.max_frames is not None and frame_idx >= args.max_frames:
+                print(f"Reached max_frames limit of {args.max_frames}.")
+                break
 
-    cap.release()
-    print("Video processing finished.")
+            ret, frame = cap.read()
+            if not ret: break
 
-    output_json_dir = os.path.dirname(args.output_json)
-    if output_json_dir: os.makedirs(output_json_dir, exist_ok=True)
-        
-    with open(args.output_json, 'w') as f:
-        json.dump(all_frames_data, f)
+            frame = resize_to_max_height(frame, args.max_height)
+
+            builder = FrameContextBuilder(frame_index=frame_idx, original_frame=frame, prev_frame=prev_frame)
+            print(f"Running pipeline for frame {frame_idx}...")
+            processed_context = pipeline.run(builder)
+
+            save_frame_visuals(processed_context, args.output_dir)
+            write_frame(processed_context)
+
+            prev_frame = frame
+            frame_idx += 1
+            if args.checkpoint_every > 0 and frame_idx % args.checkpoint_every == 0:
+                write_checkpoint()
+
+        cap.release()
+        print("Video processing finished.")
+    print(f"Preprocessing cache: {preprocess_hits} hits, {preprocess_misses} misses")
+    if profiler:
+        print(profiler.report())
+        print(f"Saved profile to {profiler.save(args.profile_dir)['csv']}")
+    for step in steps:
+        if isinstance(step, MemoizedStep):
+            print(f"Cache {type(step.step).__name__}: {step.hits} hits, {step.misses} misses")
+        inner_step = unwrap_step(step)
+        if isinstance(inner_step, CurveFittingStep):
+            print(f"Curve fit cache: {inner_step.cache_hits} hits, {inner_step.cache_misses} misses")
+            inner_step.close()
+
+    json_file.write("]")
+    json_file.close()
+    if os.path.exists(ckpt_path):
+        os.remove(ckpt_path)
     print(f"Successfully saved JSON data to {args.output_json}")
+    if not args.no_precompress:
+        print(f"Precompressed JSON to {write_gzip_sibling(args.output_json)}")
+    if live_server is not None:
+        live_server.finish(frames=frames_written)
+        live_server.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,19 @@
 # src/pipeline.py
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Collection, Deque, Tuple
 import numpy as np
 from .data_models import FrameContext, Circle, Triangle, Line2D, Line3D
+from .preprocessing import FramePreprocessor
 
 import dataclasses
 
+# 스텝 실행이 끝나면 해제할 수 있는 대용량 중간 맵들.
+# original_frame은 옵저버와 시각화가 사용하므로 해제 대상이 아닙니다.
+RELEASABLE_MAPS: Tuple[str, ...] = ("prev_frame", "grayscale_frame", "edge_map", "depth_map", "flow_map")
+
 # --- Builder Pattern ---
 class FrameContextBuilder:
     """FrameContext 객체의 생성을 단계별로 처리하는 빌더 클래스"""
@@ -17,6 +24,7 @@ class FrameContextBuilder:
         }
         if prev_frame is not None:
             self._context_data["prev_frame"] = prev_frame
+        self.preprocessor = FramePreprocessor(self.get)
 
     def get(self, key: str, default: Any = None) -> Any:
         return self._context_data.get(key, default)
@@ -25,6 +33,14 @@ class FrameContextBuilder:
         self._context_data[key] = value
         return self
 
+    def get_pyramid_level(self, level: int, key: str = "original_frame") -> np.ndarray:
+        """지정한 이미지의 가우시안 피라미드 레벨을 반환합니다 (프레임당 한 번 계산)."""
+        return self.preprocessor.pyramid_level(level, key)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """현재까지 누적된 데이터의 얕은 복사본을 반환합니다."""
+        return dict(self._context_data)
+
     def set_circles(self, circles: List[Circle]):
         return self.set("circles", circles)
 
@@ -48,16 +64,47 @@ class FrameContextBuilder:
             for key, value in self._context_data.items()
             if key in valid_field_names
         }
+        if self.preprocessor.hits or self.preprocessor.misses:
+            filtered_data["metrics"] = {**(filtered_data.get("metrics") or {}), **self.preprocessor.stats()}
         return FrameContext(**filtered_data)
 
 # --- Pipeline Pattern ---
 class ProcessingStep(ABC):
-    """파이프라인의 각 단계를 나타내는 추상 베이스 클래스"""
+    """파이프라인의 각 단계를 나타내는 추상 베이스 클래스
+
+    Attributes:
+        consumes: 스텝이 읽는 빌더 키 목록. None이면 모든 키를 읽을 수 있는 것으로 간주하여
+            RetentionPolicy가 이 스텝 이전에 맵을 해제하지 않습니다.
+    """
+    consumes: Tuple[str, ...] | None = None
+
     @abstractmethod
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         """빌더를 받아 컨텍스트를 업데이트하고 다시 빌더를 반환합니다."""
         pass
 
+    def cache_config(self) -> Dict[str, Any] | None:
+        """
+        출력에 영향을 주는 설정만 담은 딕셔너리를 반환합니다 (MemoizedStep의 캐시 키용).
+        None이면 '_'로 시작하지 않는 인스턴스 속성에서 자동으로 추출합니다.
+        워커 수처럼 결과를 바꾸지 않는 런타임 설정을 가진 스텝은 이를 재정의하십시오.
+        """
+        return None
+
+    def get_state(self) -> Dict[str, Any] | None:
+        """프레임 사이에 유지되는 내부 상태를 반환합니다 (체크포인트용). 상태가 없는 스텝은 None을 반환합니다."""
+        return None
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """get_state()로 저장한 상태를 복원합니다."""
+        pass
+
+def unwrap_step(step: ProcessingStep) -> ProcessingStep:
+    """MemoizedStep, PyramidLevelStep 같은 래퍼 스텝(step 속성)을 벗겨 실제 스텝을 반환합니다."""
+    while isinstance(getattr(step, "step", None), ProcessingStep):
+        step = step.step
+    return step
+
 # --- Observer Pattern ---
 class PipelineObserver(ABC):
     """파이프라인의 이벤트를 수신하는 옵저버의 추상 베이스 클래스"""
@@ -66,26 +113,113 @@ class PipelineObserver(ABC):
         """프레임 처리가 완료될 때 호출됩니다."""
         pass
 
+# --- Memory Retention ---
+def compact_map(array: np.ndarray, dtype: Any) -> np.ndarray:
+    """
+    맵을 저정밀도 타입으로 변환합니다.
+
+    float16은 값을 그대로 캐스팅하고, uint8은 최소-최대 정규화로 0-255 범위로 양자화합니다.
+    uint8 양자화는 부호와 크기가 의미를 가지는 flow_map에는 사용할 수 없습니다.
+    대상 타입이 더 크면(예: MiDaS의 uint8 depth_map을 float32로) 메모리만 늘어나므로 그대로 반환합니다.
+    """
+    dtype = np.dtype(dtype)
+    if array.dtype == dtype or array.dtype.itemsize < dtype.itemsize:
+        return array
+    if dtype == np.uint8:
+        lo, hi = float(np.min(array)), float(np.max(array))
+        scale = 255.0 / (hi - lo) if hi > lo else 0.0
+        return ((array - lo) * scale).astype(np.uint8)
+    return array.astype(dtype)
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    파이프라인의 메모리 보존 정책.
+
+    Attributes:
+        max_contexts: Pipeline.recent_contexts 링 버퍼에 보관할 최근 FrameContext 수
+        release_consumed_maps: True이면 RELEASABLE_MAPS의 맵을 마지막 소비 스텝 실행 직후 해제
+        keep_maps: 소비 여부와 관계없이 최종 컨텍스트에 남겨둘 맵 이름
+        map_dtypes: 맵 이름별 저장 타입 (예: {"depth_map": np.float16, "flow_map": np.float16})
+    """
+    max_contexts: int = 1
+    release_consumed_maps: bool = True
+    keep_maps: Tuple[str, ...] = ()
+    map_dtypes: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.max_contexts < 0:
+            raise ValueError(f"max_contexts must be >= 0, got {self.max_contexts}")
+        for name, dtype in self.map_dtypes.items():
+            dtype = np.dtype(dtype)
+            if dtype not in (np.float16, np.float32, np.uint8):
+                raise ValueError(f"Unsupported storage dtype for {name}: {dtype}")
+            if name == "flow_map" and dtype == np.uint8:
+                raise ValueError("flow_map cannot be stored as uint8; use float16 instead.")
+
+
 # --- Main Pipeline Class ---
 class Pipeline:
     """ProcessingStep들을 순차적으로 실행하는 파이프라인 실행기"""
-    def __init__(self, steps: List[ProcessingStep]):
+    def __init__(self, steps: List[ProcessingStep], retention: RetentionPolicy | None = None):
         self._steps = steps
         self._observers: List[PipelineObserver] = []
+        self._retention = retention
+        self.recent_contexts: Deque[FrameContext] = deque(maxlen=retention.max_contexts if retention else None)
+        self._release_after = self._plan_releases() if retention and retention.release_consumed_maps else {}
+
+    def _plan_releases(self) -> Dict[int, List[str]]:
+        """각 맵을 마지막으로 소비하는 스텝 인덱스를 계산합니다."""
+        last_consumer: Dict[str, int] = {}
+        for idx, step in enumerate(self._steps):
+            consumes = step.consumes
+            for name in RELEASABLE_MAPS:
+                if consumes is None or name in consumes:
+                    last_consumer[name] = idx
+
+        releases: Dict[int, List[str]] = {}
+        for name, idx in last_consumer.items():
+            if name not in self._retention.keep_maps:
+                releases.setdefault(idx, []).append(name)
+        return releases
 
     def add_observer(self, observer: PipelineObserver):
         self._observers.append(observer)
 
-    def run(self, initial_builder: FrameContextBuilder) -> FrameContext:
-        """주어진 빌더로 파이프라인의 모든 단계를 실행합니다."""
+    @property
+    def steps(self) -> List[ProcessingStep]:
+        return list(self._steps)
+
+    def run(self, initial_builder: FrameContextBuilder, skip: Collection[ProcessingStep] = ()) -> FrameContext:
+        """
+        주어진 빌더로 파이프라인의 모든 단계를 실행합니다.
+
+        Args:
+            initial_builder: 프레임 입력이 담긴 빌더
+            skip: 이번 프레임에서 실행하지 않을 스텝들 (라이브 모드의 품질 저하 등에 사용)
+        """
         builder = initial_builder
-        for step in self._steps:
-            builder = step.execute(builder)
-        
+        for idx, step in enumerate(self._steps):
+            if step not in skip:
+                builder = step.execute(builder)
+            if self._retention is not None:
+                self._apply_retention(builder, idx)
+
         final_context = builder.build()
+        if self._retention is not None:
+            self.recent_contexts.append(final_context)
         self._notify(final_context)
         return final_context
 
+    def _apply_retention(self, builder: FrameContextBuilder, step_idx: int):
+        for name, dtype in self._retention.map_dtypes.items():
+            value = builder.get(name)
+            if isinstance(value, np.ndarray):
+                builder.set(name, compact_map(value, dtype))
+        for name in self._release_after.get(step_idx, ()):
+            builder.set(name, None)
+
     def _notify(self, context: FrameContext):
         for observer in self._observers:
             observer.on_frame_processed(context)
\ No newline at end of file
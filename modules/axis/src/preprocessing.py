@@ -0,0 +1,96 @@
+# src/preprocessing.py
+
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import cv2
+import numpy as np
+
+
+class FramePreprocessor:
+    """
+    프레임 단위로 공유되는 메모이즈 전처리 서비스.
+
+    그레이스케일 변환, 블러, 적응형 이진화, 이미지 피라미드처럼 여러 스텝과 전략이
+    같은 프레임에 대해 반복하던 연산을 한 번만 계산하고 결과를 공유합니다.
+    FrameContextBuilder마다 하나씩 생성되므로 캐시 수명은 한 프레임입니다.
+
+    캐시 항목은 원본 배열의 동일성(identity)과 함께 저장되므로, 빌더의 원본 키가 다른
+    배열로 교체되면(예: PyramidLevelStep 실행 중) 자동으로 새로 계산됩니다.
+    반환된 배열은 여러 소비자가 공유하므로 제자리(in-place)에서 수정하면 안 됩니다.
+    """
+
+    def __init__(self, source_getter: Callable[[str], Any]):
+        """
+        Args:
+            source_getter: 키로 원본 이미지를 조회하는 함수 (보통 FrameContextBuilder.get)
+        """
+        self._get_source = source_getter
+        self._cache: Dict[Hashable, Tuple[np.ndarray, np.ndarray]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _source(self, key: str) -> np.ndarray:
+        source = self._get_source(key)
+        if source is None:
+            raise KeyError(f"Cannot preprocess missing key '{key}'")
+        return source
+
+    def _memo(self, source: np.ndarray, op: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        cache_key = (op, id(source))
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] is source:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        result = compute()
+        self._cache[cache_key] = (source, result)
+        return result
+
+    def grayscale(self, key: str = "original_frame") -> np.ndarray:
+        """BGR 이미지를 그레이스케일로 변환합니다. 이미 단일 채널이면 그대로 반환합니다."""
+        source = self._source(key)
+        if source.ndim == 2:
+            return source
+        return self._memo(source, ("grayscale",), lambda: cv2.cvtColor(source, cv2.COLOR_BGR2GRAY))
+
+    def gaussian_blur(self, sigma: float, key: str = "original_frame", gray: bool = True) -> np.ndarray:
+        """(그레이스케일) 이미지에 주어진 sigma의 가우시안 블러를 적용합니다."""
+        source = self._source(key)
+        image = self.grayscale(key) if gray else source
+        return self._memo(source, ("gaussian_blur", float(sigma), gray),
+                          lambda: cv2.GaussianBlur(image, (0, 0), sigmaX=sigma))
+
+    def median_blur(self, ksize: int, key: str = "original_frame", gray: bool = True) -> np.ndarray:
+        """(그레이스케일) 이미지에 주어진 커널 크기의 미디언 블러를 적용합니다."""
+        source = self._source(key)
+        image = self.grayscale(key) if gray else source
+        return self._memo(source, ("median_blur", int(ksize), gray), lambda: cv2.medianBlur(image, ksize))
+
+    def adaptive_threshold(self, block_size: int = 11, c: float = 2,
+                           method: int = cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                           threshold_type: int = cv2.THRESH_BINARY_INV,
+                           key: str = "original_frame") -> np.ndarray:
+        """그레이스케일 이미지에 적응형 이진화를 적용합니다."""
+        source = self._source(key)
+        gray = self.grayscale(key)
+        return self._memo(source, ("adaptive_threshold", block_size, c, method, threshold_type),
+                          lambda: cv2.adaptiveThreshold(gray, 255, method, threshold_type, block_size, c))
+
+    def pyramid_level(self, level: int, key: str = "original_frame") -> np.ndarray:
+        """
+        가우시안 피라미드 레벨을 반환합니다.
+
+        레벨 0은 원본 이미지이고, 레벨이 하나 오를 때마다 cv2.pyrDown으로 해상도가 절반이 됩니다.
+        중간 레벨도 캐시되므로 피라미드는 프레임당 한 번만 계산됩니다.
+        """
+        if level < 0:
+            raise ValueError(f"Pyramid level must be >= 0, got {level}")
+        source = self._source(key)
+        if level == 0:
+            return source
+        parent = self.pyramid_level(level - 1, key)
+        return self._memo(source, ("pyramid", level), lambda: cv2.pyrDown(parent))
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미스 횟수를 metrics 형식으로 반환합니다."""
+        return {"preprocess_cache_hits": float(self.hits), "preprocess_cache_misses": float(self.misses)}
@@ -0,0 +1,188 @@
+# src/profiling.py
+
+import csv
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .data_models import FrameContext
+from .pipeline import PipelineObserver, ProcessingStep, FrameContextBuilder, unwrap_step
+
+# 프레임 결과에서 개수를 기록할 FrameContext 필드
+COUNTED_FIELDS: Tuple[str, ...] = ("lines_2d", "curves_2d", "lines", "circles", "triangles")
+# 스텝이 metrics에 남기는 개수 항목 (LineVectorizationStep의 컨투어 수, FramePreprocessor의 캐시 적중/미스)
+COUNTED_METRICS: Tuple[str, ...] = ("contours", "preprocess_cache_hits", "preprocess_cache_misses")
+
+
+class ProfiledStep(ProcessingStep):
+    """
+    임의의 ProcessingStep을 감싸 실행 시간(과 선택적으로 메모리 할당량)을 PipelineProfiler에 기록하는 래퍼 스텝.
+    """
+
+    def __init__(self, step: ProcessingStep, profiler: "PipelineProfiler", name: Optional[str] = None):
+        """
+        Args:
+            step: 감쌀 파이프라인 스텝
+            profiler: 측정값을 받을 프로파일러
+            name: 보고서에 사용할 이름 (기본값: 실제 스텝 클래스 이름)
+        """
+        self.step = step
+        self.profiler = profiler
+        self.name = name or type(unwrap_step(step)).__name__
+
+    @property
+    def consumes(self):
+        return self.step.consumes
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        track = self.profiler.track_allocations
+        if track:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        builder = self.step.execute(builder)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        allocated = None
+        if track:
+            _, peak = tracemalloc.get_traced_memory()
+            allocated = max(peak - before, 0)
+        self.profiler.record_step(self.name, elapsed_ms, allocated)
+        return builder
+
+
+class PipelineProfiler(PipelineObserver):
+    """
+    스텝별/프레임별 실행 시간, 객체 수, 메모리 할당량을 수집하는 프로파일링 옵저버.
+
+    wrap()으로 파이프라인 스텝을 ProfiledStep으로 감싸고 add_observer()로 등록하면,
+    스텝 측정값은 실행 중에 쌓이고 on_frame_processed에서 한 프레임 행으로 확정됩니다.
+    실행이 끝나면 save()로 프레임별 CSV와 스텝별 히스토그램을 저장합니다.
+    """
+
+    def __init__(self, track_allocations: bool = False, histogram_bins: int = 20):
+        """
+        Args:
+            track_allocations: True이면 tracemalloc으로 스텝별 최대 메모리 할당량을 측정 (실행이 느려짐)
+            histogram_bins: 스텝별 지연 시간 히스토그램의 구간 수
+        """
+        self.track_allocations = track_allocations
+        self.histogram_bins = histogram_bins
+        self.step_names: List[str] = []
+        self.rows: List[Dict[str, Any]] = []
+        self._pending: Dict[str, float] = {}
+        self._pending_alloc: Dict[str, int] = {}
+        self._frame_start: Optional[float] = None
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def wrap(self, steps: List[ProcessingStep]) -> List[ProcessingStep]:
+        """스텝 목록을 ProfiledStep으로 감쌉니다."""
+        wrapped = []
+        for step in steps:
+            profiled = ProfiledStep(step, self)
+            # 같은 클래스의 스텝이 여러 개면 순번을 붙여 구분
+            base = profiled.name
+            count = sum(1 for name in self.step_names if name.split("#")[0] == base)
+            if count:
+                profiled.name = f"{base}#{count}"
+            self.step_names.append(profiled.name)
+            wrapped.append(profiled)
+        return wrapped
+
+    def record_step(self, name: str, elapsed_ms: float, allocated_bytes: Optional[int] = None):
+        if self._frame_start is None:
+            self._frame_start = time.perf_counter() - elapsed_ms / 1000.0
+        self._pending[name] = self._pending.get(name, 0.0) + elapsed_ms
+        if allocated_bytes is not None:
+            self._pending_alloc[name] = max(self._pending_alloc.get(name, 0), allocated_bytes)
+
+    def on_frame_processed(self, context: FrameContext):
+        total_ms = (time.perf_counter() - self._frame_start) * 1000.0 if self._frame_start is not None else 0.0
+        row: Dict[str, Any] = {"frame_index": context.frame_index, "total_ms": total_ms}
+        for name in self.step_names:
+            # 라이브 모드에서 건너뛴 스텝은 빈 값으로 남김
+            row[f"{name}_ms"] = self._pending.get(name)
+            if self.track_allocations:
+                row[f"{name}_alloc_bytes"] = self._pending_alloc.get(name)
+        for field_name in COUNTED_FIELDS:
+            value = getattr(context, field_name)
+            row[field_name] = len(value) if value is not None else 0
+        metrics = context.metrics or {}
+        for metric in COUNTED_METRICS:
+            row[metric] = int(metrics[metric]) if metric in metrics else None
+        self.rows.append(row)
+        self._pending, self._pending_alloc, self._frame_start = {}, {}, None
+
+    def step_times(self, name: str) -> np.ndarray:
+        return np.array([row[f"{name}_ms"] for row in self.rows if row.get(f"{name}_ms") is not None])
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        """스텝별 지연 시간 통계와 히스토그램을 반환합니다."""
+        result = {}
+        for name in self.step_names + ["total"]:
+            times = self.step_times(name)
+            if not len(times):
+                continue
+            counts, edges = np.histogram(times, bins=self.histogram_bins)
+            p50, p95, p99 = np.percentile(times, [50, 95, 99])
+            result[name] = {
+                "frames": int(len(times)),
+                "total_ms": float(times.sum()),
+                "mean_ms": float(times.mean()),
+                "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+                "max_ms": float(times.max()),
+                "counts": counts.tolist(),
+                "edges_ms": edges.tolist(),
+            }
+        return result
+
+    def report(self, width: int = 40) -> str:
+        """스텝을 총 소요 시간 순으로 정렬한 텍스트 보고서와 ASCII 히스토그램을 만듭니다."""
+        stats = self.histograms()
+        total = stats.get("total", {}).get("total_ms", 0.0) or sum(s["total_ms"] for s in stats.values())
+        lines = [f"Profiled {len(self.rows)} frames"]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]["total_ms"]):
+            if name == "total":
+                continue
+            share = 100.0 * s["total_ms"] / total if total else 0.0
+            lines.append(f"{name}: {share:5.1f}% | mean {s['mean_ms']:.2f} ms | p50 {s['p50_ms']:.2f} | "
+                         f"p95 {s['p95_ms']:.2f} | p99 {s['p99_ms']:.2f} | max {s['max_ms']:.2f} ms")
+            peak = max(s["counts"]) or 1
+            for count, lo, hi in zip(s["counts"], s["edges_ms"][:-1], s["edges_ms"][1:]):
+                if count:
+                    lines.append(f"  {lo:9.2f}-{hi:9.2f} ms | {'#' * max(1, round(width * count / peak))} {count}")
+        for field_name in COUNTED_FIELDS + COUNTED_METRICS:
+            values = [row[field_name] for row in self.rows if row.get(field_name) is not None]
+            if values and max(values):
+                worst = max(self.rows, key=lambda row: row.get(field_name) or 0)
+                lines.append(f"{field_name}: mean {np.mean(values):.1f}, max {max(values)} "
+                             f"(frame {worst['frame_index']})")
+        return "\n".join(lines)
+
+    def write_csv(self, path: str):
+        """프레임별 측정값을 CSV로 저장합니다."""
+        if not self.rows:
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def save(self, output_dir: str) -> Dict[str, str]:
+        """프레임별 CSV, 히스토그램 JSON, 텍스트 보고서를 output_dir에 저장합니다."""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {
+            "csv": os.path.join(output_dir, "profile_frames.csv"),
+            "histograms": os.path.join(output_dir, "profile_histograms.json"),
+            "report": os.path.join(output_dir, "profile_report.txt"),
+        }
+        self.write_csv(paths["csv"])
+        with open(paths["histograms"], "w") as f:
+            json.dump(self.histograms(), f, indent=2)
+        with open(paths["report"], "w") as f:
+            f.write(self.report() + "\n")
+        return paths
@@ -1,16 +1,15 @@
 # src/steps/conversion.py
 
-import cv2
 from pipeline import ProcessingStep, FrameContextBuilder
 
 class GrayscaleConversionStep(ProcessingStep):
     """(테스트용) 원본 프레임을 흑백으로 변환하는 간단한 스텝"""
+    consumes = ("original_frame",)
+
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         print("Running GrayscaleConversionStep...")
-        original_frame = builder.get("original_frame")
-        
-        # OpenCV를 사용하여 흑백으로 변환
-        grayscale_frame = cv2.cvtColor(original_frame, cv2.COLOR_BGR2GRAY)
+        # 공유 전처리 캐시에서 흑백 프레임을 가져옴 (다른 스텝과 변환 결과를 공유)
+        grayscale_frame = builder.preprocessor.grayscale()
         
         # 빌더에 결과 추가
         builder.set("grayscale_frame", grayscale_frame)
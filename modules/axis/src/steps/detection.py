@@ -1,19 +1,32 @@
 # src/steps/detection.py
 
+from typing import Any, Dict
+
 from ..pipeline import ProcessingStep, FrameContextBuilder
 from ..strategies.base import IEdgeDetector
+from .memoization import describe_config
 
 class EdgeDetectionStep(ProcessingStep):
     """엣지 검출 전략을 실행하는 파이프라인 스텝"""
+    consumes = ("original_frame",)
+
     def __init__(self, strategy: IEdgeDetector):
         self._strategy = strategy
 
+    def cache_config(self) -> Dict[str, Any]:
+        # 결과는 주입된 전략과 그 설정(임계값, 감싼 검출기 등)이 결정
+        return {"strategy": describe_config(self._strategy)}
+
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         print("Running EdgeDetectionStep...")
-        original_frame = builder.get("original_frame")
-        
+        if self._strategy.input_kind == "gray":
+            # 그레이스케일 변환은 공유 전처리 캐시에서 한 번만 수행
+            frame = builder.preprocessor.grayscale()
+        else:
+            frame = builder.get("original_frame")
+
         # 주입된 전략을 사용하여 엣지 맵 검출
-        edge_map = self._strategy.detect(original_frame)
+        edge_map = self._strategy.detect(frame)
         
         # 빌더에 결과 추가
         builder.set("edge_map", edge_map)
@@ -1,13 +1,22 @@
 # src/steps/estimation.py
 
+from typing import Any, Dict
+
 from ..pipeline import ProcessingStep, FrameContextBuilder
 from ..strategies.base import IDepthEstimator, IOpticalFlowEstimator
+from .memoization import describe_config
 
 class DepthEstimationStep(ProcessingStep):
     """뎁스 추정 전략을 실행하는 파이프라인 스텝"""
+    consumes = ("original_frame",)
+
     def __init__(self, strategy: IDepthEstimator):
         self._strategy = strategy
 
+    def cache_config(self) -> Dict[str, Any]:
+        # 결과는 주입된 전략과 그 설정이 결정
+        return {"strategy": describe_config(self._strategy)}
+
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         print("Running DepthEstimationStep...")
         original_frame = builder.get("original_frame")
@@ -22,9 +31,15 @@ class DepthEstimationStep(ProcessingStep):
 
 class FlowEstimationStep(ProcessingStep):
     """옵티컬 플로우 추정 전략을 실행하는 파이프라인 스텝"""
+    consumes = ("prev_frame", "original_frame")
+
     def __init__(self, strategy: IOpticalFlowEstimator):
         self._strategy = strategy
 
+    def cache_config(self) -> Dict[str, Any]:
+        # 결과는 주입된 전략과 그 설정이 결정
+        return {"strategy": describe_config(self._strategy)}
+
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         print("Running FlowEstimationStep...")
         prev_frame = builder.get("prev_frame")
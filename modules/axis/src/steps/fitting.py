@@ -1,13 +1,16 @@
 # AXIS/src/steps/fitting.py
 
+import os
 import numpy as np
 import logging
-from typing import List
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from scipy.interpolate import splev, splprep
 
 from ..pipeline import ProcessingStep, FrameContextBuilder
 from ..data_models import Curve2D
+from .memoization import hash_array
 
 logger = logging.getLogger(__name__)
 
@@ -17,26 +20,143 @@ class CurveFittingError(Exception):
     pass
 
 
+def adaptive_sample_count(points: np.ndarray, sample_spacing: float, min_samples: int, max_samples: int) -> int:
+    """
+    Choose the number of curve samples from the polyline arc length.
+
+    Args:
+        points: (N, 2) polyline points
+        sample_spacing: Target distance in pixels between consecutive samples
+        min_samples: Lower bound on the sample count
+        max_samples: Upper bound on the sample count
+
+    Returns:
+        Sample count in [min_samples, max_samples]
+    """
+    arc_length = float(np.hypot(*np.diff(points, axis=0).T).sum()) if len(points) > 1 else 0.0
+    return int(np.clip(np.ceil(arc_length / sample_spacing) + 1, min_samples, max_samples))
+
+
+def fit_line_chunk(
+    lines: List[np.ndarray],
+    smoothing_factor: float,
+    spline_degree: int,
+    num_samples: Optional[int],
+    sample_spacing: float,
+    min_samples: int,
+    max_samples: int,
+) -> List[Tuple[Optional[np.ndarray], Optional[str]]]:
+    """
+    Fit B-splines to a chunk of lines.
+
+    Module-level so it can be shipped to worker processes. Errors are returned
+    rather than logged so the parent process reports them with the line index.
+
+    Returns:
+        One (points, error) pair per input line; points is None when the line was skipped.
+    """
+    results = []
+    min_points = spline_degree + 1
+    for line_points in lines:
+        if len(line_points) < min_points:
+            results.append((None, f"only {len(line_points)} points (need at least {min_points} "
+                                  f"for degree {spline_degree} spline)"))
+            continue
+        try:
+            # Convert to (2, N) shape for splprep
+            tck, u = splprep(line_points.T, s=smoothing_factor, k=spline_degree)
+
+            if num_samples is None:
+                count = adaptive_sample_count(line_points, sample_spacing, min_samples, max_samples)
+            else:
+                count = num_samples
+            # Sample uniform points along the curve and convert back to (N, 2) shape
+            u_new = np.linspace(u.min(), u.max(), count)
+            results.append((np.array(splev(u_new, tck)).T, None))
+        except ValueError as e:
+            # Specific error from splprep (e.g., collinear points, NaN values)
+            results.append((None, f"likely collinear/degenerate points: {e}"))
+        except Exception as e:
+            results.append((None, f"unexpected {type(e).__name__}: {e}"))
+    return results
+
+
 class CurveFittingStep(ProcessingStep):
     """
     Pipeline step to fit smooth B-spline curves to 2D lines.
 
     Uses scipy's splprep to fit cubic B-splines with configurable smoothing.
     Lines with fewer than 4 points are skipped (insufficient for cubic spline fitting).
+
+    Lines can be fitted in chunks across an opt-in process pool (splprep holds the
+    GIL, so threads would not help). Fits are cached by a hash of each line's points for
+    one frame, so static lines carried over from the previous frame reuse their
+    Curve2D instead of being refitted.
     """
+    consumes = ("lines_2d",)
 
-    def __init__(self, smoothing_factor: float = 2.0, spline_degree: int = 3, num_samples: int = 100):
+    def __init__(self, smoothing_factor: float = 2.0, spline_degree: int = 3, num_samples: Optional[int] = 100,
+                 sample_spacing: float = 2.0, min_samples: int = 8, max_samples: int = 100,
+                 max_workers: int = 1, chunk_size: int = 64):
         """
         Initialize the curve fitting step.
 
         Args:
             smoothing_factor: Smoothing factor for splprep (higher = more smoothing)
             spline_degree: Degree of the B-spline (3 = cubic)
-            num_samples: Number of points to sample from fitted curve
+            num_samples: Fixed number of points to sample from each fitted curve.
+                None picks the count from the line's arc length (see sample_spacing).
+            sample_spacing: Target distance in pixels between samples when num_samples is None
+            min_samples: Minimum adaptive sample count
+            max_samples: Maximum adaptive sample count
+            max_workers: Worker processes for fitting (1 = fit in-process, the default;
+                None = CPU count). The pool forks, so only raise it when no other threads are running.
+            chunk_size: Number of lines sent to a worker per task
         """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        if not 1 <= min_samples <= max_samples:
+            raise ValueError(f"Invalid sample bounds: min_samples={min_samples}, max_samples={max_samples}")
         self.smoothing_factor = smoothing_factor
         self.spline_degree = spline_degree
         self.num_samples = num_samples
+        self.sample_spacing = sample_spacing
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._fit_cache: Dict[str, Optional[Curve2D]] = {}
+        self._executor: Optional[Executor] = None
+
+    def cache_config(self) -> Dict[str, object]:
+        # Worker count, chunking and the fit cache do not change the fitted curves
+        return {"smoothing_factor": self.smoothing_factor, "spline_degree": self.spline_degree,
+                "num_samples": self.num_samples, "sample_spacing": self.sample_spacing,
+                "min_samples": self.min_samples, "max_samples": self.max_samples}
+
+    def _fit_args(self) -> tuple:
+        return (self.smoothing_factor, self.spline_degree, self.num_samples,
+                self.sample_spacing, self.min_samples, self.max_samples)
+
+    def _fit_lines(self, lines: List[np.ndarray]) -> List[Tuple[Optional[np.ndarray], Optional[str]]]:
+        """Fit lines in chunks, in-process or across the worker pool."""
+        chunks = [lines[i:i + self.chunk_size] for i in range(0, len(lines), self.chunk_size)]
+        if self.max_workers <= 1 or len(chunks) <= 1:
+            return [result for chunk in chunks for result in fit_line_chunk(chunk, *self._fit_args())]
+
+        if self._executor is None:
+            # The pool is kept across frames; process start-up is far more expensive than a frame's fitting
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        futures = [self._executor.submit(fit_line_chunk, chunk, *self._fit_args()) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         """
@@ -56,53 +176,38 @@ class CurveFittingStep(ProcessingStep):
 
         if not lines_2d:
             logger.debug("No 2D lines to fit curves to.")
+            self._fit_cache = {}
             builder.set_curves_2d([])
             return builder
 
-        detected_curves: List[Curve2D] = []
-        skipped_count = 0
-
-        for idx, line in enumerate(lines_2d):
-            try:
-                points = line.points.T  # Convert to (2, N) shape for splprep
-
-                # B-spline fitting requires at least (degree + 1) points
-                min_points = self.spline_degree + 1
-                if points.shape[1] < min_points:
-                    logger.debug(
-                        f"Line {idx} has only {points.shape[1]} points. "
-                        f"Skipping (need at least {min_points} for degree {self.spline_degree} spline)."
-                    )
-                    skipped_count += 1
-                    continue
-
-                # Try to fit B-spline curve
-                tck, u = splprep(
-                    points,
-                    s=self.smoothing_factor,
-                    k=self.spline_degree
-                )
-
-                # Sample uniform points along the curve
-                u_new = np.linspace(u.min(), u.max(), self.num_samples)
-                new_points = splev(u_new, tck)
-
-                # Convert back to (N, 2) shape
-                detected_curves.append(Curve2D(points=np.array(new_points).T))
-                logger.debug(f"Line {idx} fitted successfully")
-
-            except ValueError as e:
-                # Specific error from splprep (e.g., collinear points, NaN values)
-                logger.warning(f"Line {idx} fitting failed (likely collinear/degenerate points): {e}")
-                skipped_count += 1
-            except Exception as e:
-                # Unexpected error
-                logger.error(f"Unexpected error fitting line {idx}: {type(e).__name__}: {e}")
-                skipped_count += 1
+        # Reuse fits of lines that are identical to ones seen in the previous frame
+        keys = [hash_array(line.points) for line in lines_2d]
+        frame_cache: Dict[str, Optional[Curve2D]] = {}
+        pending: Dict[str, int] = {}
+        for idx, key in enumerate(keys):
+            if key in self._fit_cache:
+                frame_cache[key] = self._fit_cache[key]
+            elif key not in pending:
+                pending[key] = idx
+        self.cache_hits += len(keys) - len(pending)
+        self.cache_misses += len(pending)
+
+        fitted = self._fit_lines([lines_2d[idx].points for idx in pending.values()])
+        for (key, idx), (points, error) in zip(pending.items(), fitted):
+            if error is not None and len(lines_2d[idx].points) <= self.spline_degree:
+                logger.debug(f"Line {idx} skipped: {error}")
+            elif error is not None:
+                logger.warning(f"Line {idx} fitting failed ({error})")
+            frame_cache[key] = Curve2D(points=points) if points is not None else None
+        # Only the current frame's fits are kept, so the cache never outgrows one frame
+        self._fit_cache = frame_cache
+
+        detected_curves: List[Curve2D] = [frame_cache[key] for key in keys if frame_cache[key] is not None]
+        skipped_count = len(keys) - len(detected_curves)
 
         logger.info(
             f"Curve fitting complete: {len(detected_curves)} curves fitted, "
-            f"{skipped_count} lines skipped."
+            f"{skipped_count} lines skipped, {len(keys) - len(pending)} reused from cache."
         )
         builder.set_curves_2d(detected_curves)
         return builder
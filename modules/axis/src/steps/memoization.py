@@ -0,0 +1,188 @@
+# src/steps/memoization.py
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..pipeline import ProcessingStep, FrameContextBuilder
+from ..data_models import Line2D, Curve2D
+
+logger = logging.getLogger(__name__)
+
+# 빌더에 저장되는 상위 메모이즈 스텝들의 누적 키.
+# 하위 스텝의 키에 포함되어, 상위 설정이 바뀌면 하위 캐시도 자동으로 무효화됩니다.
+MEMO_CHAIN_KEY = "_memo_chain_key"
+
+# 포인트 배열 하나만 가지는 라인 컨테이너는 컬럼 형태(포인트 + 오프셋)로 저장합니다.
+_POINT_CONTAINERS = {cls.__name__: cls for cls in (Line2D, Curve2D)}
+
+
+def hash_array(array: np.ndarray) -> str:
+    """배열의 shape, dtype, 내용을 포함한 SHA-1 해시를 반환합니다."""
+    digest = hashlib.sha1()
+    digest.update(str(array.shape).encode())
+    digest.update(str(array.dtype).encode())
+    digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+
+def describe_config(obj: Any, depth: int = 0) -> Any:
+    """
+    스텝(또는 전략) 객체의 설정을 JSON 직렬화 가능한 안정적인 형태로 변환합니다.
+
+    원시 타입과 컨테이너는 그대로, 배열은 해시로, 객체는 클래스 이름과
+    속성을 재귀적으로 기술합니다. 모델 가중치처럼 깊은 객체는 클래스 이름만 남깁니다.
+    cache_config()가 설정을 반환하는 객체는 그 설정만 기술하고, 그 외에는 '_'로 시작하는
+    내부 속성(실행기, 캐시 등)을 제외합니다. 따라서 결과에 영향을 주는 설정을 '_' 속성에
+    보관하는 스텝(예: 전략을 감싸는 EdgeDetectionStep)은 cache_config()로 이를 노출해야 합니다.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return {"ndarray": hash_array(obj)}
+    if isinstance(obj, (list, tuple)):
+        return [describe_config(v, depth) for v in obj]
+    if isinstance(obj, dict):
+        return {str(k): describe_config(v, depth) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+
+    cls_name = f"{type(obj).__module__}.{type(obj).__qualname__}"
+    if depth >= 2 or not hasattr(obj, "__dict__"):
+        return cls_name
+    cache_config = getattr(obj, "cache_config", None)
+    config = cache_config() if callable(cache_config) else None
+    if config is None:
+        config = {k: v for k, v in vars(obj).items() if not k.startswith("_")}
+    return {
+        "class": cls_name,
+        "attrs": {k: describe_config(v, depth + 1) for k, v in sorted(config.items())},
+    }
+
+
+class MemoizedStep(ProcessingStep):
+    """
+    임의의 ProcessingStep을 감싸 결과를 디스크에 캐시하는 래퍼 스텝.
+
+    캐시 키는 프레임 내용 해시(original_frame, prev_frame), 스텝 클래스, 스텝 설정,
+    그리고 앞선 MemoizedStep들의 누적 키로 구성됩니다. 따라서 하위 스텝의 파라미터만
+    바꿔 다시 실행하면 상위 스텝 결과는 캐시에서 읽어옵니다.
+
+    Note:
+        LineTrackingStep처럼 프레임 간 내부 상태를 가지는 스텝은 감싸지 마십시오.
+        메모이즈된 스텝 앞에 있는 스텝들도 메모이즈되어 있어야 키가 입력을 완전히 반영합니다.
+    """
+
+    def __init__(self, step: ProcessingStep, cache_dir: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            step: 감쌀 파이프라인 스텝
+            cache_dir: 캐시 파일을 저장할 로컬 디렉토리
+            config: 자동 추출 대신 사용할 명시적 스텝 설정 (선택)
+        """
+        self.step = step
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        config_desc = describe_config(step) if config is None else describe_config(config)
+        self._step_signature = json.dumps(
+            {"step": f"{type(step).__module__}.{type(step).__qualname__}", "config": config_desc},
+            sort_keys=True,
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def consumes(self):
+        # 캐시 키 계산에 original_frame과 prev_frame을 사용하므로 함께 선언
+        if self.step.consumes is None:
+            return None
+        return tuple(self.step.consumes) + ("original_frame", "prev_frame")
+
+    def _cache_key(self, builder: FrameContextBuilder) -> str:
+        digest = hashlib.sha1()
+        digest.update(self._step_signature.encode())
+        digest.update(str(builder.get(MEMO_CHAIN_KEY, "")).encode())
+        for name in ("original_frame", "prev_frame"):
+            frame = builder.get(name)
+            digest.update(name.encode())
+            digest.update(hash_array(frame).encode() if frame is not None else b"none")
+        return digest.hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{type(self.step).__name__}_{key}.npz")
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        key = self._cache_key(builder)
+        path = self._cache_path(key)
+
+        outputs = self._load(path) if os.path.exists(path) else None
+        if outputs is not None:
+            self.hits += 1
+            logger.debug(f"Cache hit for {type(self.step).__name__}: {path}")
+            for name, value in outputs.items():
+                builder.set(name, value)
+        else:
+            self.misses += 1
+            before = builder.as_dict()
+            builder = self.step.execute(builder)
+            outputs = {
+                name: value
+                for name, value in builder.as_dict().items()
+                if name != MEMO_CHAIN_KEY and (name not in before or before[name] is not value)
+            }
+            self._save(path, outputs)
+
+        builder.set(MEMO_CHAIN_KEY, key)
+        return builder
+
+    @staticmethod
+    def _save(path: str, outputs: Dict[str, Any]):
+        arrays: Dict[str, np.ndarray] = {}
+        meta: Dict[str, str] = {}
+        for name, value in outputs.items():
+            if isinstance(value, np.ndarray):
+                meta[name] = "ndarray"
+                arrays[name] = value
+            elif isinstance(value, list) and value and all(type(v) is type(value[0]) for v in value) \
+                    and type(value[0]).__name__ in _POINT_CONTAINERS:
+                meta[name] = type(value[0]).__name__
+                lengths = np.array([len(v.points) for v in value], dtype=np.int64)
+                arrays[f"{name}__offsets"] = np.concatenate([[0], np.cumsum(lengths)])
+                arrays[f"{name}__points"] = np.concatenate([v.points.reshape(-1, 2) for v in value])
+            else:
+                meta[name] = "object"
+                holder = np.empty(1, dtype=object)
+                holder[0] = value
+                arrays[name] = holder
+        arrays["__meta__"] = np.array(json.dumps(meta))
+
+        # 중단되더라도 손상된 캐시 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _load(path: str) -> Dict[str, Any] | None:
+        try:
+            with np.load(path, allow_pickle=True) as data:
+                meta = json.loads(str(data["__meta__"]))
+                outputs: Dict[str, Any] = {}
+                for name, kind in meta.items():
+                    if kind == "ndarray":
+                        outputs[name] = data[name]
+                    elif kind in _POINT_CONTAINERS:
+                        cls = _POINT_CONTAINERS[kind]
+                        points, offsets = data[f"{name}__points"], data[f"{name}__offsets"]
+                        outputs[name] = [cls(points=points[s:e]) for s, e in zip(offsets[:-1], offsets[1:])]
+                    else:
+                        outputs[name] = data[name][0]
+                return outputs
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cache file {path}: {e}")
+            return None
+
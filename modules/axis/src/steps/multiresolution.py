@@ -0,0 +1,137 @@
+# src/steps/multiresolution.py
+
+import dataclasses
+import logging
+from typing import Any, Dict, Tuple
+
+import cv2
+import numpy as np
+
+from ..pipeline import ProcessingStep, FrameContextBuilder
+from ..data_models import Circle, Triangle, Point2D, Line2D, Curve2D
+
+logger = logging.getLogger(__name__)
+
+# 피라미드에서 직접 가져오는 입력 이미지
+PYRAMID_INPUTS: Tuple[str, ...] = ("original_frame", "prev_frame")
+# 값 보간이 의미 없는 이진 맵은 최근접 보간으로 크기를 바꿉니다.
+NEAREST_MAPS: Tuple[str, ...] = ("edge_map",)
+
+
+def _resize_map(name: str, array: np.ndarray, size: Tuple[int, int], vector_scale: Tuple[float, float]) -> np.ndarray:
+    """맵을 (w, h) 크기로 변환하고, flow_map은 벡터 크기도 보정합니다."""
+    interpolation = cv2.INTER_NEAREST if name in NEAREST_MAPS else cv2.INTER_LINEAR
+    resized = cv2.resize(array, size, interpolation=interpolation)
+    if name == "flow_map":
+        resized = resized.astype(np.float32, copy=False) * np.array(vector_scale, dtype=np.float32)
+        resized = resized.astype(array.dtype, copy=False)
+    return resized
+
+
+def _scale_points(points: np.ndarray, sx: float, sy: float) -> np.ndarray:
+    scaled = points * np.array([sx, sy])
+    if np.issubdtype(points.dtype, np.integer):
+        return np.rint(scaled).astype(points.dtype)
+    return scaled.astype(points.dtype, copy=False)
+
+
+def _scale_point(point: Point2D, sx: float, sy: float) -> Point2D:
+    x, y = point.x * sx, point.y * sy
+    if isinstance(point.x, int):
+        x, y = int(round(x)), int(round(y))
+    return Point2D(x=x, y=y)
+
+
+def scale_geometry(value: Any, sx: float, sy: float) -> Any:
+    """
+    2D 기하 결과(Line2D, Curve2D, Circle, Triangle의 리스트)의 좌표를 스케일합니다.
+
+    알 수 없는 타입은 그대로 반환합니다 (예: 3D 좌표를 가지는 Line3D).
+    """
+    if not isinstance(value, list):
+        return value
+    scaled = []
+    for item in value:
+        if isinstance(item, (Line2D, Curve2D)):
+            scaled.append(dataclasses.replace(item, points=_scale_points(item.points, sx, sy)))
+        elif isinstance(item, Circle):
+            radius = item.radius * (sx + sy) / 2
+            scaled.append(Circle(center=_scale_point(item.center, sx, sy),
+                                 radius=int(round(radius)) if isinstance(item.radius, int) else radius))
+        elif isinstance(item, Triangle):
+            scaled.append(Triangle(vertices=tuple(_scale_point(v, sx, sy) for v in item.vertices)))
+        else:
+            scaled.append(item)
+    return scaled
+
+
+class PyramidLevelStep(ProcessingStep):
+    """
+    감싼 스텝을 이미지 피라미드의 지정 레벨에서 실행하는 래퍼 스텝.
+
+    입력 프레임은 FrameContextBuilder.get_pyramid_level()에서 가져오고(프레임당 한 번 계산),
+    스텝이 읽는 다른 맵과 2D 기하 입력은 해당 레벨 해상도로 축소합니다. 실행 후 새로 생성된
+    맵은 원본 해상도로 확대되고, 좌표 결과는 원본 좌표계로 스케일되어 빌더에 기록됩니다.
+    이를 통해 HoughCircles나 MiDaS 같은 비싼 스텝은 저해상도에서, 라인 추출은 원본 해상도에서
+    실행할 수 있습니다.
+    """
+
+    def __init__(self, step: ProcessingStep, level: int):
+        """
+        Args:
+            step: 감쌀 파이프라인 스텝
+            level: 피라미드 레벨 (0 = 원본 해상도, 1 = 1/2, 2 = 1/4, ...)
+        """
+        if level < 0:
+            raise ValueError(f"Pyramid level must be >= 0, got {level}")
+        self.step = step
+        self.level = level
+
+    @property
+    def consumes(self):
+        return self.step.consumes
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        if self.level == 0:
+            return self.step.execute(builder)
+
+        full_frame = builder.get("original_frame")
+        full_h, full_w = full_frame.shape[:2]
+        level_h, level_w = builder.get_pyramid_level(self.level).shape[:2]
+        sx, sy = full_w / level_w, full_h / level_h
+
+        consumes = self.step.consumes
+        input_keys = set(PYRAMID_INPUTS) | (set(consumes) if consumes is not None else set())
+
+        # 1. 입력을 피라미드 레벨 해상도로 교체
+        originals: Dict[str, Any] = {}
+        for name in input_keys:
+            value = builder.get(name)
+            if value is None:
+                continue
+            if name in PYRAMID_INPUTS:
+                reduced = builder.get_pyramid_level(self.level, key=name)
+            elif isinstance(value, np.ndarray) and value.shape[:2] == (full_h, full_w):
+                reduced = _resize_map(name, value, (level_w, level_h), (1 / sx, 1 / sy))
+            else:
+                reduced = scale_geometry(value, 1 / sx, 1 / sy)
+            originals[name] = value
+            builder.set(name, reduced)
+
+        before = builder.as_dict()
+        builder = self.step.execute(builder)
+        after = builder.as_dict()
+
+        # 2. 스텝이 새로 쓴 결과는 원본 좌표계로 확대, 나머지 입력은 원래 값으로 복원
+        for name, value in after.items():
+            if name in before and before[name] is value:
+                if name in originals:
+                    builder.set(name, originals[name])
+                continue
+            if isinstance(value, np.ndarray) and value.shape[:2] == (level_h, level_w):
+                builder.set(name, _resize_map(name, value, (full_w, full_h), (sx, sy)))
+            else:
+                builder.set(name, scale_geometry(value, sx, sy))
+
+        logger.debug(f"{type(self.step).__name__} ran at pyramid level {self.level} ({level_w}x{level_h}).")
+        return builder
@@ -24,6 +24,8 @@ CAMERA_INTRINSICS = np.array([
 
 class Backprojection3DStep(ProcessingStep):
     """2D 라인을 뎁스 맵을 이용해 3D 라인으로 역투영하는 파이프라인 스텝"""
+    consumes = ("lines_2d", "depth_map")
+
     def __init__(self, camera_matrix: np.ndarray = CAMERA_INTRINSICS):
         self._k = camera_matrix
         self._fx = self._k[0, 0]
@@ -9,12 +9,10 @@ from ..data_models import Circle, Triangle, Point2D
 
 class CircleDetectionStep(ProcessingStep):
     """A pipeline step to detect circles in a frame."""
-    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
-        context = builder.build()
-        frame = context.original_frame
+    consumes = ("original_frame",)
 
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred_frame = cv2.medianBlur(gray_frame, 5)
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        blurred_frame = builder.preprocessor.median_blur(5)
 
         circles = cv2.HoughCircles(
             blurred_frame,
@@ -42,13 +40,14 @@ class CircleDetectionStep(ProcessingStep):
 
 class TriangleDetectionStep(ProcessingStep):
     """A pipeline step to detect triangles in a frame."""
-    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
-        context = builder.build()
-        frame = context.original_frame
+    consumes = ("original_frame",)
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, \
-                                     cv2.THRESH_BINARY_INV, 11, 2)
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        thresh = builder.preprocessor.adaptive_threshold(
+            block_size=11, c=2,
+            method=cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            threshold_type=cv2.THRESH_BINARY_INV,
+        )
 
         contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
 
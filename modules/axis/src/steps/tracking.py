@@ -1,7 +1,7 @@
 # src/steps/tracking.py
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Tuple
 from scipy.optimize import linear_sum_assignment
 from scipy.spatial.distance import directed_hausdorff
 
@@ -11,12 +11,22 @@ from .projection import CAMERA_INTRINSICS # Import placeholder K
 
 class LineTrackingStep(ProcessingStep):
     """시간에 따라 3D 라인을 추적하고 일관된 ID를 부여하는 파이프라인 스텝"""
+    consumes = ("lines", "flow_map", "original_frame")
+
     def __init__(self, matching_threshold=30.0, camera_matrix: np.ndarray = CAMERA_INTRINSICS):
         self.live_lines: Dict[int, Line3D] = {}
         self.next_line_id = 0
         self.matching_threshold = matching_threshold
         self._k = camera_matrix
 
+    def get_state(self) -> Dict[str, Any]:
+        # 재개 후에도 같은 라인 ID가 이어지도록 추적 중인 라인과 다음 ID를 저장
+        return {"live_lines": dict(self.live_lines), "next_line_id": self.next_line_id}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.live_lines = dict(state["live_lines"])
+        self.next_line_id = state["next_line_id"]
+
     def _project_3d_to_2d(self, lines_3d: List[Line3D], h: int, w: int) -> List[Line2D]:
         """Helper to project a list of 3D lines to 2D screen space."""
         # Adjust camera intrinsics for the actual frame dimensions
@@ -5,18 +5,156 @@ import numpy as np
 from typing import List
 
 from ..pipeline import ProcessingStep, FrameContextBuilder
-from ..data_models import Line2D
+from ..data_models import Line2D, LineSet
+
+
+def simplify_polylines(points: np.ndarray, offsets: np.ndarray, epsilons: np.ndarray) -> np.ndarray:
+    """
+    이어 붙인 포인트 버퍼의 모든 폴리라인을 한꺼번에 단순화합니다.
+
+    열린 폴리라인에 대한 cv2.approxPolyDP(curve, epsilon, False)와 같은 점을 남깁니다.
+    Douglas-Peucker 분할은 각 반복에서 아직 분할 중인 모든 구간의 최대 거리 점을 한 번의 벡터 연산으로
+    찾으므로 반복 횟수는 라인 수가 아니라 재귀 깊이에 비례하고, 이어지는 거의 일직선인 점 제거 패스도
+    모든 폴리라인에 대해 나란히 진행합니다. 시작점과 끝점이 같은 폴리라인은 OpenCV가 닫힌 곡선으로
+    처리하므로 결과가 다를 수 있습니다.
+
+    Args:
+        points: (M, 2) 형태로 모든 폴리라인을 이어 붙인 좌표 버퍼
+        offsets: (K + 1,) 형태의 폴리라인 시작 인덱스 배열
+        epsilons: (K,) 형태의 폴리라인별 허용 오차
+
+    Returns:
+        (M,) 형태의 불리언 마스크. True인 점이 단순화 결과에 남습니다.
+    """
+    pts = points.astype(np.float64, copy=False)
+    xs, ys = pts[:, 0], pts[:, 1]
+    keep = np.zeros(len(points), dtype=bool)
+    epsilons = np.asarray(epsilons, dtype=np.float64)
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    nonempty = ends >= starts
+    keep[starts[nonempty]] = True
+    keep[ends[nonempty]] = True
+
+    seg_start, seg_end, seg_eps = starts[nonempty], ends[nonempty], epsilons[nonempty]
+    while True:
+        splittable = seg_end - seg_start > 1
+        seg_start, seg_end, seg_eps = seg_start[splittable], seg_end[splittable], seg_eps[splittable]
+        if not len(seg_start):
+            break
+
+        # 모든 구간의 내부 점 인덱스를 하나의 배열로 펼침
+        counts = seg_end - seg_start - 1
+        group_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        seg_ids = np.repeat(np.arange(len(seg_start)), counts)
+        idx = np.arange(counts.sum()) + np.repeat(seg_start + 1 - group_starts, counts)
+
+        # 현재 구간의 현(chord)에 대한 수직 거리 * 현의 길이
+        sx, sy = xs[seg_start], ys[seg_start]
+        dx, dy = xs[seg_end] - sx, ys[seg_end] - sy
+        dist = np.abs((ys[idx] - sy[seg_ids]) * dx[seg_ids] - (xs[idx] - sx[seg_ids]) * dy[seg_ids])
+
+        # 구간별 최대 거리 점 (동률이면 앞쪽 점)
+        max_dist = np.maximum.reduceat(dist, group_starts)
+        candidates = np.where(dist == max_dist[seg_ids], idx, len(points))
+        best = np.minimum.reduceat(candidates, group_starts)
+
+        split = max_dist * max_dist > seg_eps * seg_eps * (dx * dx + dy * dy)
+        split_idx = best[split]
+        keep[split_idx] = True
+        seg_start = np.concatenate([seg_start[split], split_idx])
+        seg_end = np.concatenate([split_idx, seg_end[split]])
+        seg_eps = np.concatenate([seg_eps[split], seg_eps[split]])
+
+    kept = np.flatnonzero(keep)
+    kept_offsets = np.searchsorted(kept, offsets)
+    keep[kept[_collinear_points(pts[kept], kept_offsets, epsilons)]] = False
+    return keep
+
+
+def _collinear_points(points: np.ndarray, offsets: np.ndarray, epsilons: np.ndarray) -> np.ndarray:
+    """
+    cv2.approxPolyDP의 마지막 패스: Douglas-Peucker 결과에서 거의 일직선 위에 있는 점을 찾습니다.
+
+    OpenCV와 같이 각 폴리라인을 앞에서부터 (시작점, 가운데 점, 다음 점) 세 점씩 훑으며, 가운데 점을
+    지우면 다음 점이 새 시작점이 됩니다. 모든 폴리라인의 스캔을 한 점씩 나란히 진행합니다.
+
+    Returns:
+        (M,) 형태의 불리언 마스크. True인 점이 제거됩니다.
+    """
+    xs, ys = points[:, 0], points[:, 1]
+    removed = np.zeros(len(points), dtype=bool)
+    last = offsets[1:] - 1
+    start, middle = offsets[:-1].copy(), offsets[:-1] + 1
+    remaining = np.diff(offsets)
+    half_eps = 0.5 * epsilons * epsilons
+    while True:
+        active = (middle < last) & (remaining > 2)
+        if not active.any():
+            break
+        s, m, line = start[active], middle[active], np.flatnonzero(active)
+        e = m + 1
+        dx, dy = xs[e] - xs[s], ys[e] - ys[s]
+        dist = np.abs((xs[m] - xs[s]) * dy - (ys[m] - ys[s]) * dx)
+        inner = (xs[m] - xs[s]) * (xs[e] - xs[m]) + (ys[m] - ys[s]) * (ys[e] - ys[m])
+        drop = (dist * dist <= half_eps[line] * (dx * dx + dy * dy)) & (dx != 0) & (dy != 0) & (inner >= 0)
+
+        removed[m[drop]] = True
+        remaining[line[drop]] -= 1
+        # 지운 경우 다음 점이 새 시작점이 되어 그 다음 점부터, 아니면 가운데 점부터 다시 훑음
+        start[line] = np.where(drop, e, m)
+        middle[line] = np.where(drop, e + 1, e)
+    return removed
+
 
 class LineVectorizationStep(ProcessingStep):
     """엣지 맵을 벡터 라인(Line2D)의 리스트로 변환하는 파이프라인 스텝"""
-    def __init__(self, min_contour_length: int = 10, epsilon_ratio: float = 0.005):
+    consumes = ("edge_map",)
+
+    def __init__(self, min_contour_length: int = 10, epsilon_ratio: float = 0.005,
+                 min_component_area: int | None = None):
         """
         Args:
             min_contour_length: 최소 길이 이하의 컨투어는 노이즈로 간주하고 무시합니다.
             epsilon_ratio: 컨투어 근사화(단순화)에 사용될 epsilon 값의 비율입니다.
+            min_component_area: 컨투어 추적 전에 제거할 연결 요소의 최소 픽셀 수입니다.
+                None이면 min_contour_length를 만족할 수 없는 요소(픽셀 수 * 2 < 최소 길이)만 제거합니다.
         """
         self.min_contour_length = min_contour_length
         self.epsilon_ratio = epsilon_ratio
+        self.min_component_area = min_component_area
+
+    def _prefilter(self, edge_map: np.ndarray) -> np.ndarray:
+        """연결 요소 통계로 너무 작은 요소를 컨투어 추적 전에 제거합니다."""
+        # 1픽셀 두께 곡선의 컨투어는 각 픽셀을 최대 두 번 지나므로, 픽셀 수의 2배보다 길 수 없음
+        min_area = self.min_component_area
+        if min_area is None:
+            min_area = (self.min_contour_length + 1) // 2
+        if min_area <= 1:
+            return edge_map
+
+        # 0이 아닌 모든 픽셀이 전경으로 취급되므로 엣지 맵을 그대로 사용
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(edge_map, connectivity=8)
+        keep_label = stats[:, cv2.CC_STAT_AREA] >= min_area
+        keep_label[0] = False  # 배경
+        if keep_label[1:].all():
+            return edge_map
+        return edge_map * keep_label[labels]
+
+    def _simplify_contours(self, contours) -> LineSet:
+        """컨투어를 근사화하여 하나의 컬럼형 버퍼(LineSet)로 모읍니다."""
+        approximated = []
+        for contour in contours:
+            # 2. 너무 짧은 컨투어는 노이즈로 간주하여 필터링
+            if len(contour) < self.min_contour_length:
+                continue
+            # 3. 외곽선 근사화 (Douglas-Peucker 알고리즘)
+            epsilon = self.epsilon_ratio * cv2.arcLength(contour, True)
+            approximated.append(cv2.approxPolyDP(contour, epsilon, False).reshape(-1, 2))
+        if not approximated:
+            return LineSet.from_lines([])
+
+        offsets = np.concatenate([[0], np.cumsum(list(map(len, approximated)))])
+        return LineSet(points=np.concatenate(approximated), offsets=offsets)
 
     def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
         print("Running LineVectorizationStep...")
@@ -26,25 +164,19 @@ class LineVectorizationStep(ProcessingStep):
             print("Skipping LineVectorizationStep: edge_map is not available.")
             return builder
 
-        # 1. 외곽선 찾기 (Contour Finding)
-        contours, _ = cv2.findContours(edge_map, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+        # 1. 작은 연결 요소를 미리 제거한 뒤 외곽선 찾기 (Contour Finding)
+        contours, _ = cv2.findContours(self._prefilter(edge_map), cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
 
-        vectorized_lines: List[Line2D] = []
-        for contour in contours:
-            # 2. 너무 짧은 컨투어는 노이즈로 간주하여 필터링
-            if len(contour) < self.min_contour_length:
-                continue
+        if not contours:
+            line_set = LineSet.from_lines([])
+        else:
+            line_set = self._simplify_contours(contours)
+
+        vectorized_lines: List[Line2D] = line_set.to_lines()
 
-            # 3. 외곽선 근사화 (Contour Approximation) - Douglas-Peucker 알고리즘
-            epsilon = self.epsilon_ratio * cv2.arcLength(contour, True)
-            simplified_contour = cv2.approxPolyDP(contour, epsilon, False) # False: open contour
-            
-            # OpenCV의 (1, N, 2) 형태를 (N, 2) 형태로 변경
-            points = simplified_contour.squeeze(axis=1)
-            
-            vectorized_lines.append(Line2D(points=points))
-        
         print(f"Vectorized {len(vectorized_lines)} lines.")
+        builder.set("metrics", {**(builder.get("metrics") or {}), "contours": float(len(contours))})
+        builder.set("line_set", line_set)
         builder.set("lines_2d", vectorized_lines)
-        
+
         return builder
@@ -1,15 +1,30 @@
 # src/strategies/base.py
 
 from abc import ABC, abstractmethod
+from typing import List
+
 import numpy as np
 
 class IEdgeDetector(ABC):
-    """엣지 검출 전략에 대한 인터페이스"""
+    """엣지 검출 전략에 대한 인터페이스
+
+    Attributes:
+        input_kind: detect()가 기대하는 입력 형태. "bgr"이면 원본 컬러 프레임을,
+            "gray"이면 공유 전처리 캐시의 그레이스케일 프레임을 전달받습니다.
+        thread_safe: 여러 스레드에서 detect()를 동시에 호출해도 안전한지 여부.
+    """
+    input_kind: str = "bgr"
+    thread_safe: bool = True
+
     @abstractmethod
     def detect(self, frame: np.ndarray) -> np.ndarray:
         """프레임에서 엣지 맵을 반환합니다."""
         pass
 
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """여러 프레임의 엣지 맵을 반환합니다. 배치 추론을 지원하는 전략은 재정의합니다."""
+        return [self.detect(frame) for frame in frames]
+
 class IDepthEstimator(ABC):
     """뎁스 추정 전략에 대한 인터페이스"""
     @abstractmethod
@@ -1,5 +1,9 @@
 # src/strategies/detectors.py
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
 import torch
 import numpy as np
 import cv2
@@ -40,6 +44,8 @@ def pidinet_bsd_val(image, mean, std):
 
 class CannyDetector(IEdgeDetector):
     """OpenCV Canny 엣지 검출기를 사용하는 전략 클래스"""
+    input_kind = "gray"
+
     def __init__(self, threshold1: int = 100, threshold2: int = 200):
         self.threshold1 = threshold1
         self.threshold2 = threshold2
@@ -47,7 +53,174 @@ class CannyDetector(IEdgeDetector):
 
     def detect(self, frame: np.ndarray) -> np.ndarray:
         print("Running CannyDetector...")
-        # Canny는 그레이스케일 이미지를 입력으로 받음
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Canny는 그레이스케일 이미지를 입력으로 받음 (이미 변환된 입력이면 그대로 사용)
+        gray_frame = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         edge_map = cv2.Canny(gray_frame, self.threshold1, self.threshold2)
-        return edge_map
\ No newline at end of file
+        return edge_map
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "models")
+HED_PROTOTXT_PATH = os.path.join(MODELS_DIR, "hed_deploy.prototxt")
+HED_WEIGHTS_PATH = os.path.join(MODELS_DIR, "hed_pretrained_bsds.caffemodel")
+# HED(BSDS) 학습 시 사용된 BGR 평균값
+HED_MEAN_BGR = (104.00698793, 116.66876762, 122.67891434)
+
+
+class _HEDCropLayer:
+    """HED의 Caffe Crop 레이어 구현 (업샘플된 side output을 입력 크기에 맞춰 중앙 크롭)"""
+    def __init__(self, params, blobs):
+        self.ystart = self.xstart = self.yend = self.xend = 0
+
+    def getMemoryShapes(self, inputs):
+        input_shape, target_shape = inputs[0], inputs[1]
+        batch_size, num_channels = input_shape[0], input_shape[1]
+        height, width = target_shape[2], target_shape[3]
+        self.ystart = (input_shape[2] - height) // 2
+        self.xstart = (input_shape[3] - width) // 2
+        self.yend = self.ystart + height
+        self.xend = self.xstart + width
+        return [[batch_size, num_channels, height, width]]
+
+    def forward(self, inputs):
+        return [inputs[0][:, :, self.ystart:self.yend, self.xstart:self.xend]]
+
+
+_hed_crop_layer_registered = False
+
+
+def _register_hed_crop_layer():
+    global _hed_crop_layer_registered
+    if not _hed_crop_layer_registered:
+        cv2.dnn_registerLayer("Crop", _HEDCropLayer)
+        _hed_crop_layer_registered = True
+
+
+class HEDDetector(IEdgeDetector):
+    """
+    OpenCV DNN 모듈로 HED(Holistically-Nested Edge Detection) 모델을 실행하는 전략 클래스.
+
+    torch 없이 CPU에서 학습 기반 엣지를 얻을 수 있습니다. 네트워크는 생성 시 한 번만 로드되며,
+    detect_batch()는 cv2.dnn.blobFromImages로 여러 프레임을 한 번의 forward로 처리합니다.
+    cv2.dnn.Net은 동시 호출에 안전하지 않으므로 thread_safe는 False입니다.
+    """
+    thread_safe = False
+
+    def __init__(self, prototxt_path: str = HED_PROTOTXT_PATH, weights_path: str = HED_WEIGHTS_PATH,
+                 input_size: Tuple[int, int] = (500, 500)):
+        """
+        Args:
+            prototxt_path: HED 네트워크 정의 파일 경로
+            weights_path: HED 사전학습 가중치(.caffemodel) 경로
+            input_size: 네트워크 입력 크기 (width, height). 모든 프레임이 이 크기로 변환됩니다.
+        """
+        for path in (prototxt_path, weights_path):
+            if not os.path.isfile(path) or os.path.getsize(path) == 0:
+                raise FileNotFoundError(f"HED model file is missing or empty: {path}")
+        if input_size[0] <= 0 or input_size[1] <= 0:
+            raise ValueError(f"input_size must be positive, got {input_size}")
+
+        print(f"Loading HED model from {weights_path}...")
+        _register_hed_crop_layer()
+        self.net = cv2.dnn.readNetFromCaffe(prototxt_path, weights_path)
+        self.input_size = tuple(input_size)
+        print(f"HEDDetector initialized with input_size: {self.input_size}")
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        print("Running HEDDetector...")
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        if not frames:
+            return []
+        blob = cv2.dnn.blobFromImages(
+            frames,
+            scalefactor=1.0,
+            size=self.input_size,
+            mean=HED_MEAN_BGR,
+            swapRB=False,
+            crop=False,
+        )
+        self.net.setInput(blob)
+        # 출력은 fuse 레이어의 (N, 1, H, W) 확률 맵
+        outputs = self.net.forward()
+
+        edge_maps = []
+        for frame, prob in zip(frames, outputs):
+            h, w = frame.shape[:2]
+            edge_map = cv2.resize(prob[0], (w, h), interpolation=cv2.INTER_LINEAR)
+            edge_maps.append((edge_map * 255).clip(0, 255).astype(np.uint8))
+        return edge_maps
+
+
+class TiledEdgeDetector(IEdgeDetector):
+    """
+    임의의 IEdgeDetector를 겹치는 타일 단위로 실행하는 래퍼 전략 클래스.
+
+    큰 프레임(4K 영상, 만화 원고 등)을 overlap만큼 겹치는 타일로 나누어 스레드 풀에서
+    병렬로 검출한 뒤, 각 타일의 겹침 영역을 잘라내고 이어 붙여 하나의 엣지 맵을 만듭니다.
+    한 번에 처리되는 입력은 타일 크기로 제한되므로 최대 메모리 사용량이 일정합니다.
+    감싼 검출기가 thread_safe가 아니면(예: HEDDetector) 스레드 대신 batch_size개씩
+    detect_batch()로 묶어 순차 처리합니다.
+    """
+    def __init__(self, detector: IEdgeDetector, tile_size: int = 512, overlap: int = 32,
+                 max_workers: int | None = None, batch_size: int = 4):
+        """
+        Args:
+            detector: 각 타일에 적용할 엣지 검출 전략
+            tile_size: 겹침을 제외한 타일 한 변의 길이 (픽셀)
+            overlap: 타일 경계 양쪽에 추가로 포함할 문맥 영역 (픽셀)
+            max_workers: 스레드 풀 크기 (None이면 ThreadPoolExecutor 기본값)
+            batch_size: thread_safe가 아닌 검출기에서 한 번에 묶어 처리할 타일 수
+        """
+        if tile_size <= 0:
+            raise ValueError(f"tile_size must be positive, got {tile_size}")
+        if overlap < 0:
+            raise ValueError(f"overlap must be >= 0, got {overlap}")
+        self.detector = detector
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.max_workers = max_workers
+        self.batch_size = max(1, batch_size)
+        self.input_kind = detector.input_kind
+        print(f"TiledEdgeDetector initialized with tile_size: {tile_size}, overlap: {overlap}")
+
+    def _tiles(self, h: int, w: int) -> Iterator[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]:
+        """(겹침 포함 입력 영역, 출력 영역) 쌍을 생성합니다. 영역은 (y0, y1, x0, x1) 형식입니다."""
+        for y0 in range(0, h, self.tile_size):
+            for x0 in range(0, w, self.tile_size):
+                y1, x1 = min(y0 + self.tile_size, h), min(x0 + self.tile_size, w)
+                padded = (max(y0 - self.overlap, 0), min(y1 + self.overlap, h),
+                          max(x0 - self.overlap, 0), min(x1 + self.overlap, w))
+                yield padded, (y0, y1, x0, x1)
+
+    def _detect_tile(self, frame: np.ndarray, padded: Tuple[int, int, int, int],
+                     core: Tuple[int, int, int, int]) -> Tuple[Tuple[int, int, int, int], np.ndarray]:
+        py0, py1, px0, px1 = padded
+        y0, y1, x0, x1 = core
+        tile_edges = self.detector.detect(frame[py0:py1, px0:px1])
+        return core, tile_edges[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        if h <= self.tile_size and w <= self.tile_size:
+            return self.detector.detect(frame)
+
+        edge_map = None
+        for (y0, y1, x0, x1), tile in self._detect_tiles(frame, list(self._tiles(h, w))):
+            if edge_map is None:
+                edge_map = np.zeros((h, w) + tile.shape[2:], dtype=tile.dtype)
+            edge_map[y0:y1, x0:x1] = tile
+        return edge_map
+
+    def _detect_tiles(self, frame: np.ndarray, tiles: list) -> Iterator[Tuple[Tuple[int, int, int, int], np.ndarray]]:
+        if not self.detector.thread_safe:
+            for start in range(0, len(tiles), self.batch_size):
+                batch = tiles[start:start + self.batch_size]
+                crops = [frame[py0:py1, px0:px1] for (py0, py1, px0, px1), _ in batch]
+                for ((py0, _, px0, _), (y0, y1, x0, x1)), tile_edges in zip(batch, self.detector.detect_batch(crops)):
+                    yield (y0, y1, x0, x1), tile_edges[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._detect_tile, frame, padded, core) for padded, core in tiles]
+            for future in futures:
+                yield future.result()
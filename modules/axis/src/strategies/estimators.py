@@ -1,5 +1,8 @@
 # src/strategies/estimators.py
 
+from abc import abstractmethod
+from typing import Any
+
 import torch
 import numpy as np
 import cv2
@@ -91,3 +94,103 @@ class RAFTEstimator(IOpticalFlowEstimator):
         # 결과를 numpy 배열로 변환
         flow_map = flow_up[0].permute(1, 2, 0).cpu().numpy()
         return flow_map
+
+
+class _OpenCVFlowEstimator(IOpticalFlowEstimator):
+    """OpenCV 기반 고전 옵티컬 플로우 전략의 공통 추상 베이스 클래스 (하위 클래스가 _compute를 구현)
+
+    RAFTEstimator와 동일하게 (H, W, 2) float32 형태의 픽셀 단위 플로우를 반환합니다.
+    coarse_scale < 1.0 이면 축소된 해상도에서 플로우를 계산한 뒤
+    원본 해상도로 업샘플링하고 벡터 크기를 보정합니다 (coarse-to-fine).
+    """
+    def __init__(self, coarse_scale: float = 1.0):
+        if not 0.0 < coarse_scale <= 1.0:
+            raise ValueError(f"coarse_scale must be in (0, 1], got {coarse_scale}")
+        self.coarse_scale = coarse_scale
+
+    @abstractmethod
+    def _compute(self, gray1: np.ndarray, gray2: np.ndarray) -> np.ndarray:
+        """두 그레이스케일 프레임 간의 (H, W, 2) 픽셀 단위 플로우를 계산합니다."""
+        pass
+
+    @staticmethod
+    def _to_gray(frame: np.ndarray) -> np.ndarray:
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def estimate(self, frame1: np.ndarray, frame2: np.ndarray) -> np.ndarray:
+        print(f"Running {type(self).__name__}...")
+        gray1 = self._to_gray(frame1)
+        gray2 = self._to_gray(frame2)
+        h, w = gray1.shape[:2]
+
+        if self.coarse_scale == 1.0:
+            return self._compute(gray1, gray2).astype(np.float32, copy=False)
+
+        small_size = (max(1, int(round(w * self.coarse_scale))), max(1, int(round(h * self.coarse_scale))))
+        small1 = cv2.resize(gray1, small_size, interpolation=cv2.INTER_AREA)
+        small2 = cv2.resize(gray2, small_size, interpolation=cv2.INTER_AREA)
+        coarse_flow = self._compute(small1, small2)
+
+        # 업샘플링 후 축별 스케일 차이만큼 벡터를 보정
+        flow_map = cv2.resize(coarse_flow, (w, h), interpolation=cv2.INTER_LINEAR)
+        flow_map[..., 0] *= w / small_size[0]
+        flow_map[..., 1] *= h / small_size[1]
+        return flow_map.astype(np.float32, copy=False)
+
+
+DIS_PRESETS = {
+    "ultrafast": cv2.DISOPTICAL_FLOW_PRESET_ULTRAFAST,
+    "fast": cv2.DISOPTICAL_FLOW_PRESET_FAST,
+    "medium": cv2.DISOPTICAL_FLOW_PRESET_MEDIUM,
+}
+
+
+class DISFlowEstimator(_OpenCVFlowEstimator):
+    """OpenCV DIS(Dense Inverse Search) 옵티컬 플로우를 사용하는 CPU 지향 전략 클래스"""
+    def __init__(self, preset: str = "medium", coarse_scale: float = 1.0):
+        """
+        Args:
+            preset: DIS 프리셋 ("ultrafast", "fast", "medium").
+            coarse_scale: 플로우를 계산할 해상도 비율 (1.0 = 원본 해상도).
+        """
+        super().__init__(coarse_scale=coarse_scale)
+        if preset not in DIS_PRESETS:
+            raise ValueError(f"Unknown DIS preset '{preset}'. Choose from {sorted(DIS_PRESETS)}.")
+        self.preset = preset
+        self._dis = cv2.DISOpticalFlow_create(DIS_PRESETS[preset])
+        print(f"DISFlowEstimator initialized with preset: {preset}, coarse_scale: {coarse_scale}")
+
+    def _compute(self, gray1: np.ndarray, gray2: np.ndarray) -> np.ndarray:
+        return self._dis.calc(gray1, gray2, None)
+
+
+FARNEBACK_PRESETS = {
+    "fast": dict(pyr_scale=0.5, levels=3, winsize=11, iterations=2, poly_n=5, poly_sigma=1.1),
+    "medium": dict(pyr_scale=0.5, levels=4, winsize=15, iterations=3, poly_n=5, poly_sigma=1.2),
+    "accurate": dict(pyr_scale=0.5, levels=5, winsize=21, iterations=5, poly_n=7, poly_sigma=1.5),
+}
+
+
+class FarnebackFlowEstimator(_OpenCVFlowEstimator):
+    """OpenCV Farneback 옵티컬 플로우를 사용하는 CPU 지향 전략 클래스"""
+    def __init__(self, preset: str = "medium", coarse_scale: float = 1.0, **overrides: Any):
+        """
+        Args:
+            preset: 파라미터 프리셋 ("fast", "medium", "accurate").
+            coarse_scale: 플로우를 계산할 해상도 비율 (1.0 = 원본 해상도).
+            **overrides: 프리셋 값을 덮어쓸 cv2.calcOpticalFlowFarneback 인자.
+        """
+        super().__init__(coarse_scale=coarse_scale)
+        if preset not in FARNEBACK_PRESETS:
+            raise ValueError(f"Unknown Farneback preset '{preset}'. Choose from {sorted(FARNEBACK_PRESETS)}.")
+        unknown = set(overrides) - set(FARNEBACK_PRESETS[preset])
+        if unknown:
+            raise ValueError(f"Unknown Farneback parameters: {sorted(unknown)}")
+        self.preset = preset
+        self.params = {**FARNEBACK_PRESETS[preset], **overrides}
+        print(f"FarnebackFlowEstimator initialized with preset: {preset}, coarse_scale: {coarse_scale}")
+
+    def _compute(self, gray1: np.ndarray, gray2: np.ndarray) -> np.ndarray:
+        return cv2.calcOpticalFlowFarneback(gray1, gray2, None, flags=0, **self.params)
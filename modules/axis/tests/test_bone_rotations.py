@@ -0,0 +1,73 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from AXIS.scripts.bone_rotations import (AXES, bone_euler_angles, channel_order, matrices_to_euler,
+                                         quaternions_between, rotations_between)
+from AXIS.scripts.parse_bvh import axis_rotations
+
+ORDERS = ["".join(order) for order in itertools.permutations("XYZ")]
+
+
+def _compose(order, angles):
+    """Rotation matrices the way parse_bvh builds them from channels in `order`."""
+    elementary = axis_rotations([AXES[axis] for axis in order], angles)
+    return elementary[:, 0] @ elementary[:, 1] @ elementary[:, 2]
+
+
+def test_rotations_take_rest_vectors_onto_targets():
+    rng = np.random.default_rng(0)
+    rest, target = rng.normal(size=(200, 3)), rng.normal(size=(200, 3))
+    target[0] = -2 * rest[0] # Opposite direction
+
+    rotations = rotations_between(rest, target)
+    unit = lambda v: v / np.linalg.norm(v, axis=-1, keepdims=True)
+    np.testing.assert_allclose(np.einsum('tij,tj->ti', rotations, unit(rest)), unit(target), atol=1e-12)
+    np.testing.assert_allclose(np.linalg.det(rotations), 1.0)
+    np.testing.assert_allclose(rotations @ rotations.transpose(0, 2, 1), np.broadcast_to(np.eye(3), (200, 3, 3)),
+                               atol=1e-12)
+
+
+def test_zero_vectors_give_identity_and_rest_vectors_broadcast():
+    targets = np.array([[0.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 0.0, 0.0]])
+    quaternions = quaternions_between(np.array([0.0, 1.0, 0.0]), targets)
+    np.testing.assert_allclose(quaternions[:2], [[1, 0, 0, 0], [1, 0, 0, 0]])
+    # A quarter turn about -Z takes +Y onto +X
+    np.testing.assert_allclose(quaternions[2], [np.sqrt(0.5), 0, 0, -np.sqrt(0.5)])
+
+    skeleton = quaternions_between(np.eye(3), np.random.default_rng(1).normal(size=(5, 3, 3)))
+    assert skeleton.shape == (5, 3, 4)
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_euler_decomposition_roundtrips_through_bvh_channels(order):
+    rng = np.random.default_rng(2)
+    angles = rng.uniform(-180, 180, size=(300, 3))
+    angles[:, 1] = rng.uniform(-89, 89, size=300) # The middle angle's range
+
+    np.testing.assert_allclose(matrices_to_euler(_compose(order, angles), order), angles, atol=1e-9)
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_euler_decomposition_at_gimbal_lock(order):
+    angles = np.array([[30.0, 90.0, 0.0], [-70.0, -90.0, 0.0], [10.0, 90.0, 25.0]])
+    rotations = _compose(order, angles)
+    decomposed = matrices_to_euler(rotations, order)
+
+    np.testing.assert_allclose(decomposed[:, 2], 0.0)
+    np.testing.assert_allclose(_compose(order, decomposed), rotations, atol=1e-12)
+
+
+def test_bone_euler_angles_uses_channel_order():
+    channels = ["Xposition", "Yposition", "Zposition", "Zrotation", "Xrotation", "Yrotation"]
+    assert channel_order(channels) == "ZXY"
+
+    rest = np.array([1.0, 0.0, 0.0])
+    targets = np.random.default_rng(3).normal(size=(50, 3))
+    angles = bone_euler_angles(rest, targets, channel_order(channels))
+    moved = np.einsum('tij,j->ti', _compose("ZXY", angles), rest)
+    np.testing.assert_allclose(moved, targets / np.linalg.norm(targets, axis=-1, keepdims=True), atol=1e-12)
+
+    with pytest.raises(ValueError):
+        matrices_to_euler(np.eye(3), "ZXZ")
@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pytest
+
+from AXIS.scripts.bvh_io import format_motion, iter_motion_chunks, read_bvh, write_bvh
+from AXIS.scripts.convert_to_bvh import convert_to_bvh
+from AXIS.scripts.parse_bvh import forward_kinematics
+
+
+def _keypoint_json(path, num_frames=40, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = [{"keypoints": [rng.normal(size=(19, 4)).tolist()] if t != 7 else []} for t in range(num_frames)]
+    with open(path, "w") as f:
+        json.dump(frames, f)
+
+
+@pytest.fixture
+def converted_bvh(tmp_path):
+    input_path = tmp_path / "clip_mediapipe_smoothed_3d_keypoints.json"
+    _keypoint_json(input_path)
+    convert_to_bvh(str(input_path), str(tmp_path))
+    return str(tmp_path / "clip_person1.bvh")
+
+
+def test_reads_converter_output(converted_bvh):
+    hierarchy, root, motion, frame_time = read_bvh(converted_bvh)
+    assert root == "Hips"
+    assert len(hierarchy) == 18
+    assert motion.shape == (40, 6 + 17 * 3)
+    assert frame_time == pytest.approx(0.033333)
+    # The frame without a detection is written as the default pose
+    assert not motion[7].any()
+
+    with open(converted_bvh) as f:
+        rows = f.read().splitlines()[-40:]
+    np.testing.assert_array_equal(motion, np.array([row.split() for row in rows], dtype=float))
+
+
+def test_write_read_roundtrip(converted_bvh, tmp_path):
+    hierarchy, root, motion, frame_time = read_bvh(converted_bvh)
+    output = str(tmp_path / "roundtrip.bvh")
+    write_bvh(output, hierarchy, root, motion, frame_time)
+    hierarchy2, root2, motion2, _ = read_bvh(output)
+
+    assert root2 == root and list(hierarchy2) == list(hierarchy)
+    for name, info in hierarchy.items():
+        assert hierarchy2[name]["channels"] == info["channels"]
+        assert hierarchy2[name]["children"] == info["children"]
+        np.testing.assert_allclose(hierarchy2[name]["offset"], info["offset"], atol=1e-6)
+    np.testing.assert_array_equal(motion2, motion)
+    for name, positions in forward_kinematics(hierarchy2, motion2, root2).items():
+        np.testing.assert_allclose(positions, forward_kinematics(hierarchy, motion, root)[name], atol=1e-5)
+
+
+def test_memory_mapped_chunks_match_bulk_read(converted_bvh):
+    _, _, motion, _ = read_bvh(converted_bvh, use_mmap=False)
+    _, _, chunked, _ = read_bvh(converted_bvh, use_mmap=True, chunk_bytes=1000)
+    np.testing.assert_array_equal(chunked, motion)
+
+    chunks = [chunk for _, chunk in iter_motion_chunks(converted_bvh, chunk_bytes=1000)]
+    assert len(chunks) > 1
+    assert sum(len(chunk) for chunk in chunks) == len(motion)
+
+
+def test_format_motion_matches_per_value_formatting():
+    motion = np.random.default_rng(3).uniform(-180, 180, size=(5, 7))
+    motion[0, 0] = -0.0000001
+    expected = "\n".join(" ".join(f"{val:.6f}" for val in row) for row in motion)
+    assert format_motion(motion) == expected
+    assert format_motion(np.zeros((0, 7))) == ""
+
+
+def test_missing_frames_are_reported(converted_bvh, tmp_path):
+    with open(converted_bvh) as f:
+        lines = f.read().splitlines()
+    truncated = tmp_path / "truncated.bvh"
+    truncated.write_text("\n".join(lines[:-5]) + "\n")
+    with pytest.raises(ValueError):
+        read_bvh(str(truncated))
+
+
+def test_reads_bvhio_converter_output(tmp_path):
+    pytest.importorskip("bvhio")
+    pytest.importorskip("glm")
+    from AXIS.scripts.convert_json_to_bvh_bvhio import convert_json_to_bvh_bvhio
+
+    rng = np.random.default_rng(1)
+    input_path = tmp_path / "clip_videopose3d_smoothed_3d_keypoints.json"
+    with open(input_path, "w") as f:
+        json.dump([{"keypoints": [rng.normal(size=(17, 3)).tolist()]} for _ in range(12)], f)
+    convert_json_to_bvh_bvhio(str(input_path), str(tmp_path))
+
+    hierarchy, root, motion, _ = read_bvh(str(tmp_path / "clip_videopose3d.bvh"))
+    assert root == "Hips" and len(hierarchy) == 17
+    assert motion.shape == (12, 6 + 16 * 3)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from AXIS.src.checkpoint import (Checkpoint, collect_step_states, load_checkpoint, restore_step_states,
+                                 save_checkpoint)
+from AXIS.src.data_models import Line3D
+from AXIS.src.pipeline import FrameContextBuilder
+from AXIS.src.steps.tracking import LineTrackingStep
+from AXIS.src.steps.vectorization import LineVectorizationStep
+from AXIS.src.profiling import PipelineProfiler
+
+
+def _lines(shift: float, count: int = 3):
+    lines = []
+    for i in range(count):
+        x = np.linspace(-0.5, 0.5, 5) + 0.3 * i + shift
+        points = np.stack([x, np.full(5, 0.1 * i), np.full(5, 2.0)], axis=1)
+        lines.append(Line3D(-1, "main", points, np.ones(5)))
+    return lines
+
+
+def _track(step, frame_index, lines):
+    builder = FrameContextBuilder(frame_index=frame_index, original_frame=np.zeros((96, 128, 3), np.uint8))
+    builder.set("lines", lines)
+    builder.set("flow_map", np.zeros((96, 128, 2), np.float32))
+    return [line.line_id for line in step.execute(builder).get("lines")]
+
+
+def test_restored_tracker_continues_with_identical_ids(tmp_path):
+    frames = [_lines(0.0), _lines(0.01), _lines(0.02, count=4), _lines(0.4, count=2), _lines(0.41, count=2)]
+
+    reference = LineTrackingStep()
+    expected = [_track(reference, i, lines) for i, lines in enumerate(frames)]
+
+    first = LineTrackingStep()
+    for i, lines in enumerate(frames[:2]):
+        _track(first, i, lines)
+    path = str(tmp_path / "scene.json.ckpt")
+    save_checkpoint(path, Checkpoint(source="clip.mp4", next_frame_index=2, frames_written=2, json_offset=10,
+                                     step_states=collect_step_states([LineVectorizationStep(), first])))
+
+    checkpoint = load_checkpoint(path)
+    resumed = LineTrackingStep()
+    restore_step_states([LineVectorizationStep(), resumed], checkpoint.step_states)
+    assert list(checkpoint.step_states) == [1]
+    assert [_track(resumed, i, lines) for i, lines in enumerate(frames[2:], start=2)] == expected[2:]
+
+
+def test_states_are_found_through_wrapper_steps():
+    tracker = LineTrackingStep()
+    tracker.next_line_id = 7
+    wrapped = PipelineProfiler().wrap([tracker])
+    states = collect_step_states(wrapped)
+    assert states[0]["next_line_id"] == 7
+
+    fresh = LineTrackingStep()
+    restore_step_states(PipelineProfiler().wrap([fresh]), states)
+    assert fresh.next_line_id == 7
+    with pytest.raises(ValueError):
+        restore_step_states([], states)
+
+
+def test_checkpoint_roundtrip_and_missing_file(tmp_path):
+    path = str(tmp_path / "out.json.ckpt")
+    assert load_checkpoint(path) is None
+    prev = np.arange(12, dtype=np.uint8).reshape(2, 2, 3)
+    save_checkpoint(path, Checkpoint(source="a.mp4", next_frame_index=5, frames_written=5,
+                                     json_offset=123, prev_frame=prev))
+    loaded = load_checkpoint(path)
+    assert (loaded.next_frame_index, loaded.frames_written, loaded.json_offset) == (5, 5, 123)
+    np.testing.assert_array_equal(loaded.prev_frame, prev)
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json.ckpt"]
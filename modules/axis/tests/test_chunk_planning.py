@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from AXIS.scripts.chunk_planning import (DEFAULT_CHUNK_RECEPTIVE_FIELDS, chunk_video, context_frames,
+                                         crossfade_weights, plan_chunks)
+from AXIS.scripts.videopose3d_service import temporal_receptive_field
+
+
+def test_receptive_field_of_filter_widths():
+    assert temporal_receptive_field() == 243
+    assert temporal_receptive_field((3, 3, 3)) == 27
+    assert temporal_receptive_field((1,)) == 1
+
+
+def test_plan_chunks_overlaps_by_context_plus_blend():
+    chunk_size, overlap_size = plan_chunks(243, blend_frames=32)
+    assert chunk_size == DEFAULT_CHUNK_RECEPTIVE_FIELDS * 243
+    assert overlap_size == 2 * 121 + 32
+    # Less redundant inference than the former 243-frame chunks with a 121-frame overlap
+    assert overlap_size / chunk_size < 121 / 243
+
+    assert plan_chunks(27, chunk_size=200, blend_frames=8) == (200, 34)
+    with pytest.raises(ValueError):
+        plan_chunks(243, chunk_size=400)
+
+
+def test_chunk_video_covers_video_with_overlap():
+    chunks = chunk_video(1000, 400, 100)
+    assert chunks == [(0, 400), (300, 700), (600, 1000)]
+    assert chunk_video(50, 400, 100) == [(0, 50)]
+
+
+def test_crossfade_weights_sum_to_one_at_seams():
+    receptive_field, video_length = 27, 500
+    chunk_size, overlap_size = plan_chunks(receptive_field, chunk_size=120, blend_frames=8)
+    context = context_frames(receptive_field)
+
+    total = np.zeros(video_length)
+    for start, end in chunk_video(video_length, chunk_size, overlap_size):
+        frames = np.arange(start, end)
+        weights = crossfade_weights(frames, video_length, context, 8)
+        total[frames] += weights
+        # Frames next to an inner edge never contribute
+        if start > 0:
+            np.testing.assert_array_equal(weights[:context], 0.0)
+        if end < video_length:
+            np.testing.assert_array_equal(weights[-context:], 0.0)
+    np.testing.assert_allclose(total, 1.0)
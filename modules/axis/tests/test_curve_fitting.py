@@ -0,0 +1,73 @@
+import numpy as np
+
+from AXIS.src.data_models import Line2D
+from AXIS.src.pipeline import FrameContextBuilder
+from AXIS.src.steps.fitting import CurveFittingStep
+
+
+def _lines(count: int = 10, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(count):
+        t = np.linspace(0, 1, 6 + i)
+        length = 20 + 30 * i
+        points = np.stack([t * length, np.sin(t * 3) * 10], axis=1) + rng.normal(0, 0.5, (len(t), 2))
+        lines.append(Line2D(points=points))
+    return lines
+
+
+def _fit(step, lines):
+    builder = FrameContextBuilder(frame_index=0, original_frame=np.zeros((8, 8, 3), dtype=np.uint8))
+    builder.set("lines_2d", lines)
+    return step.execute(builder).build().curves_2d
+
+
+def test_worker_pool_matches_in_process_fitting():
+    lines = _lines()
+    serial = _fit(CurveFittingStep(max_workers=1), lines)
+    step = CurveFittingStep(max_workers=2, chunk_size=3)
+    try:
+        parallel = _fit(step, lines)
+    finally:
+        step.close()
+
+    assert len(parallel) == len(serial) == len(lines)
+    for a, b in zip(parallel, serial):
+        np.testing.assert_array_equal(a.points, b.points)
+
+
+def test_unchanged_lines_reuse_previous_fit():
+    lines = _lines(4)
+    step = CurveFittingStep(max_workers=1)
+    first = _fit(step, lines)
+    assert (step.cache_hits, step.cache_misses) == (0, 4)
+
+    moved = Line2D(points=lines[2].points + 1.0)
+    second = _fit(step, [lines[0], lines[1], moved, lines[3]])
+    assert (step.cache_hits, step.cache_misses) == (3, 5)
+    assert second[0] is first[0] and second[3] is first[3]
+    assert second[2] is not first[2]
+
+    # Only the latest frame is cached: the original third line was dropped
+    _fit(step, [lines[2]])
+    assert step.cache_misses == 6
+
+
+def test_sample_count_adapts_to_line_length():
+    lines = _lines()
+    curves = _fit(CurveFittingStep(max_workers=1, num_samples=None, sample_spacing=5.0, min_samples=8, max_samples=60), lines)
+    counts = [len(c.points) for c in curves]
+    assert counts == sorted(counts)
+    assert counts[0] == 8 and counts[-1] == 60
+
+    fixed = _fit(CurveFittingStep(), lines)
+    assert all(len(c.points) == 100 for c in fixed)
+
+
+def test_short_lines_are_skipped():
+    lines = [Line2D(points=np.array([[0.0, 0.0], [1.0, 1.0], [2.0, 0.0]]))] + _lines(2)
+    step = CurveFittingStep(max_workers=1)
+    assert len(_fit(step, lines)) == 2
+    # Skipped lines are cached too, so they are not retried
+    _fit(step, lines)
+    assert step.cache_misses == 3
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from AXIS.benchmarks.optical_flow import make_translating_clip, endpoint_error
+from AXIS.src.pipeline import FrameContextBuilder
+from AXIS.src.steps.estimation import FlowEstimationStep
+from AXIS.src.strategies.estimators import DISFlowEstimator, FarnebackFlowEstimator, _OpenCVFlowEstimator
+
+
+@pytest.mark.parametrize("estimator", [
+    DISFlowEstimator(preset="medium"),
+    DISFlowEstimator(preset="fast", coarse_scale=0.5),
+    FarnebackFlowEstimator(preset="fast"),
+    FarnebackFlowEstimator(preset="medium", coarse_scale=0.5),
+])
+def test_classical_flow_recovers_translation(estimator):
+    """Classical strategies should follow the RAFT contract and recover a known translation."""
+    frames, gt_flow = make_translating_clip(num_frames=2, height=96, width=128, velocity=(1.0, -0.5))
+
+    flow = estimator.estimate(frames[0], frames[1])
+
+    assert flow.shape == (96, 128, 2)
+    assert flow.dtype == np.float32
+    assert endpoint_error(flow, gt_flow) < 0.5
+
+
+def test_flow_estimation_step_accepts_classical_strategy():
+    frames, _ = make_translating_clip(num_frames=2, height=64, width=64)
+    step = FlowEstimationStep(strategy=DISFlowEstimator(preset="ultrafast"))
+
+    builder = FrameContextBuilder(frame_index=1, original_frame=frames[1], prev_frame=frames[0])
+    context = step.execute(builder).build()
+
+    assert context.flow_map.shape == (64, 64, 2)
+
+
+def test_invalid_presets_raise():
+    with pytest.raises(ValueError):
+        DISFlowEstimator(preset="slow")
+    with pytest.raises(ValueError):
+        FarnebackFlowEstimator(preset="medium", unknown_param=1)
+    with pytest.raises(ValueError):
+        DISFlowEstimator(coarse_scale=0.0)
+
+
+def test_opencv_base_requires_compute():
+    class NoCompute(_OpenCVFlowEstimator):
+        pass
+
+    with pytest.raises(TypeError):
+        NoCompute()
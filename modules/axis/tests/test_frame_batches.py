@@ -0,0 +1,124 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from AXIS.scripts.chunk_planning import chunk_video
+from AXIS.scripts.frame_batches import FramePrefetcher, collect_chunks
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+    for t in range(23):
+        writer.write(np.full((48, 64, 3), t * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class _FailingCapture:
+    def __init__(self, fail_at):
+        self.fail_at = fail_at
+        self.reads = 0
+
+    def read(self):
+        if self.reads == self.fail_at:
+            raise IOError("decoder failed")
+        self.reads += 1
+        return True, np.zeros((2, 2, 3), dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+class _BlockingCapture:
+    """read() blocks until `unblock` is set; release() during a read is recorded as an error."""
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.reading = False
+        self.released = False
+        self.released_while_reading = False
+
+    def read(self):
+        self.reading = True
+        self.unblock.wait()
+        self.reading = False
+        return False, None
+
+    def release(self):
+        self.released_while_reading |= self.reading
+        self.released = True
+
+
+def test_prefetcher_yields_every_frame_in_batches(video_path):
+    cap = cv2.VideoCapture(video_path)
+    with FramePrefetcher(cap, max_queue=4) as prefetcher:
+        batches = list(prefetcher.batches(5))
+    assert not cap.isOpened()
+
+    assert [len(indices) for indices, _ in batches] == [5, 5, 5, 5, 3]
+    indices = [i for batch_indices, _ in batches for i in batch_indices]
+    assert indices == list(range(23))
+    # Frames arrive in order (the clip brightens by 10 per frame)
+    brightness = [frame.mean() for _, frames in batches for frame in frames]
+    assert np.all(np.diff(brightness) > 0)
+
+
+def test_prefetcher_range_and_early_close(video_path):
+    cap = cv2.VideoCapture(video_path)
+    with FramePrefetcher(cap, start_frame=10, end_frame=15) as prefetcher:
+        assert [index for index, _ in prefetcher] == [10, 11, 12, 13, 14]
+
+    # Closing while the reader is blocked on a full queue returns promptly
+    cap = cv2.VideoCapture(video_path)
+    prefetcher = FramePrefetcher(cap, max_queue=1).start()
+    next(iter(prefetcher))
+    start = time.perf_counter()
+    prefetcher.close()
+    assert time.perf_counter() - start < 1.0
+    assert not prefetcher._thread.is_alive()
+    assert not cap.isOpened()
+
+
+def test_close_never_releases_capture_during_read():
+    capture = _BlockingCapture()
+    prefetcher = FramePrefetcher(capture).start()
+    while not capture.reading:
+        time.sleep(0.01)
+    prefetcher.close() # Gives up waiting after 1 s while read() is still blocked
+    assert not capture.released
+
+    capture.unblock.set()
+    prefetcher._thread.join()
+    assert capture.released and not capture.released_while_reading
+
+
+def test_prefetcher_reraises_decoder_errors():
+    with FramePrefetcher(_FailingCapture(fail_at=3)) as prefetcher:
+        with pytest.raises(IOError):
+            list(prefetcher)
+
+
+def test_collect_chunks_shares_overlapping_frames():
+    chunks = chunk_video(10, 6, 2)
+    assert chunks == [(0, 6), (4, 10)]
+    detections = ((t, np.full((1, 17, 3), t), np.zeros((1, 5))) for t in range(10))
+
+    collected = list(collect_chunks(detections, chunks))
+    assert [chunk_idx for chunk_idx, *_ in collected] == [0, 1]
+    assert collected[0][1] == list(range(6))
+    assert collected[1][1] == list(range(4, 10))
+    assert collected[1][2][0][0, 0, 0] == 4
+
+
+def test_collect_chunks_flushes_chunks_cut_short():
+    # The container claimed 10 frames but only 7 decoded: chunk 1 is partial, chunk 2 never started
+    chunks = [(0, 4), (3, 8), (7, 10)]
+    detections = ((t, np.zeros((0, 17, 3)), np.zeros((0, 5))) for t in range(7))
+
+    collected = list(collect_chunks(detections, chunks))
+    assert [(chunk_idx, frame_indices) for chunk_idx, frame_indices, *_ in collected] == \
+        [(0, [0, 1, 2, 3]), (1, [3, 4, 5, 6])]
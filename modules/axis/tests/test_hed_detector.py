@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from AXIS.src.strategies.detectors import CannyDetector, HEDDetector
+
+
+def test_hed_requires_model_files(tmp_path):
+    empty_weights = tmp_path / "empty.caffemodel"
+    empty_weights.write_bytes(b"")
+
+    with pytest.raises(FileNotFoundError):
+        HEDDetector(weights_path=str(empty_weights))
+
+
+def test_default_detect_batch_matches_detect():
+    frames = [np.random.default_rng(i).integers(0, 255, (48, 64, 3), dtype=np.uint8) for i in range(3)]
+    detector = CannyDetector()
+
+    batched = detector.detect_batch(frames)
+
+    assert len(batched) == 3
+    for frame, edges in zip(frames, batched):
+        np.testing.assert_array_equal(edges, detector.detect(frame))
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from AXIS.scripts.keypoint_tracking import KeypointTracker, box_iou, keypoint_extent, match_boxes
+
+_OFFSETS = np.array([[0, 0], [20, 0], [0, 20], [20, 20], [10, 10], [10, 30], [30, 10]], dtype=np.float64)
+
+
+def _texture(seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((60, 60)) * 255).astype(np.uint8)
+
+
+def _frame(patch, x, y, size=(160, 240)):
+    """Textured patch with its top-left corner at (x, y) on a flat background."""
+    frame = np.full(size, 90, dtype=np.uint8)
+    frame[y:y + patch.shape[0], x:x + patch.shape[1]] = patch
+    return frame
+
+
+class _Detector:
+    """Reports one person whose keypoints sit at fixed offsets inside the patch."""
+
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.position = (0, 0)
+        self.calls = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        x, y = self.position
+        points = _OFFSETS + [x + 15, y + 15]
+        keypoints = np.concatenate([points, np.full((len(points), 1), self.confidence)], axis=1)[None]
+        boxes = np.array([[x, y, x + 60, y + 60, self.confidence]])
+        return keypoints, boxes
+
+
+def test_box_iou_and_matching():
+    boxes_a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]])
+    boxes_b = np.array([[5, 0, 15, 10], [100, 100, 110, 110]])
+    np.testing.assert_allclose(box_iou(boxes_a, boxes_b), [[50 / 150, 0], [0, 0]])
+
+    previous = np.array([[0, 0, 10, 10, 1], [20, 20, 30, 30, 1]])
+    current = np.array([[21, 21, 31, 31, 1], [1, 0, 11, 10, 1], [200, 200, 210, 210, 1]])
+    np.testing.assert_array_equal(match_boxes(previous, current), [1, 0, -1])
+
+
+def test_keypoint_extent_uses_masked_keypoints():
+    positions = np.array([[[0, 0], [10, 5], [100, 100]], [[1, 1], [2, 2], [3, 3]]], dtype=np.float64)
+    mask = np.array([[True, True, False], [False, False, False]])
+    np.testing.assert_array_equal(keypoint_extent(positions, mask), [[0, 0, 10, 5], [0, 0, 0, 0]])
+
+
+def test_lucas_kanade_follows_steady_motion_with_few_detections():
+    patch, detector = _texture(), _Detector()
+    tracker = KeypointTracker("lk", max_track_frames=30)
+
+    for t in range(60):
+        x, y = 20 + 2 * t, 40 + t // 2
+        detector.position = (x, y)
+        keypoints, boxes = tracker.update(_frame(patch, x, y), detector)
+        np.testing.assert_allclose(keypoints[0, :, :2], _OFFSETS + [x + 15, y + 15], atol=0.5)
+        np.testing.assert_allclose(boxes[0, :4], [x, y, x + 60, y + 60], atol=0.5)
+
+    assert tracker.frames == 60
+    assert detector.calls == tracker.detector_calls == 2
+
+
+def test_constant_velocity_extrapolates_between_keyframes():
+    detector = _Detector()
+    tracker = KeypointTracker("constant_velocity", max_track_frames=5)
+    blank = np.zeros((10, 10), dtype=np.uint8)
+
+    for t in range(24):
+        detector.position = (3 * t, 2 * t)
+        keypoints, _ = tracker.update(blank, detector)
+        if t >= 6: # Velocity is known from the second keyframe on
+            np.testing.assert_allclose(keypoints[0, :, :2], _OFFSETS + [3 * t + 15, 2 * t + 15])
+
+    assert detector.calls == 4
+
+
+def test_confidence_decay_triggers_redetection():
+    detector = _Detector(confidence=0.5)
+    tracker = KeypointTracker("constant_velocity", min_confidence=0.4, confidence_decay=0.9, max_track_frames=100)
+    blank = np.zeros((10, 10), dtype=np.uint8)
+
+    for _ in range(9):
+        tracker.update(blank, detector)
+
+    # 0.5 * 0.9 ** 3 < 0.4: keyframes every third frame
+    assert detector.calls == 3
+
+
+def test_scene_cut_triggers_redetection():
+    patch, detector = _texture(), _Detector()
+    tracker = KeypointTracker("lk", max_track_frames=100)
+
+    detector.position = (20, 40)
+    for _ in range(5):
+        tracker.update(_frame(patch, 20, 40), detector)
+    assert detector.calls == 1
+
+    # The person vanishes and another texture appears elsewhere: the keypoints can't be followed
+    detector.position = (150, 90)
+    keypoints, _ = tracker.update(_frame(_texture(seed=1), 150, 90), detector)
+    assert detector.calls == 2
+    np.testing.assert_allclose(keypoints[0, :, :2], _OFFSETS + [165, 105])
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        KeypointTracker("kalman")
+
+
+@pytest.mark.parametrize("method", ["lk", "constant_velocity"])
+def test_frames_without_detections(method):
+    detector = _Detector()
+    empty = lambda frame: (np.zeros((0, 17, 3)), np.zeros((0, 5)))
+    tracker = KeypointTracker(method, max_track_frames=5)
+    blank = np.zeros((10, 10), dtype=np.uint8)
+
+    keypoints, boxes = tracker.update(blank, empty)
+    assert keypoints.shape == (0, 17, 3) and boxes.shape == (0, 5)
+    # Nobody to track: every frame asks the detector again
+    tracker.update(blank, empty)
+    assert tracker.detector_calls == 2
+
+    keypoints, _ = tracker.update(blank, detector)
+    np.testing.assert_allclose(keypoints[0, :, :2], _OFFSETS + 15)
@@ -0,0 +1,142 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from AXIS.scripts.apply_smoothing import smooth_tracks
+from AXIS.scripts.convert_lightweight_to_openpose_json import convert_lightweight_to_openpose_json
+from AXIS.scripts.keypoint_tracks import (COCO_JOINTS, KeypointTracks, load_tracks, save_tracks, tracks_path,
+                                          tracks_to_json)
+from AXIS.scripts.prepare_yolo_for_videopose3d import convert_yolo_to_videopose3d_format
+from AXIS.scripts.smoothing_utils import savgol_filtering
+
+
+def _yolo_frames(num_frames=12, seed=0):
+    """YOLO layout with a varying number of persons per frame (0, 1 or 2)."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for t in range(num_frames):
+        persons = [{"bbox": rng.uniform(0, 100, size=5).round(3).tolist(),
+                    "keypoints": rng.uniform(0, 100, size=(17, 3)).round(3).tolist()}
+                   for _ in range(t % 3)]
+        frames.append({"frame_idx": 100 + t, "persons": persons})
+    return frames
+
+
+def test_yolo_round_trip_keeps_ragged_persons():
+    frames = _yolo_frames()
+    tracks = KeypointTracks.from_yolo_frames(frames)
+
+    assert tracks.positions.shape == (12, 2, 17, 2)
+    assert tracks.layout == "coco" and tracks.joint_names == COCO_JOINTS
+    np.testing.assert_array_equal(tracks.present.sum(axis=1), [t % 3 for t in range(12)])
+    np.testing.assert_array_equal(tracks.frame_indices, np.arange(100, 112))
+    assert tracks.to_yolo_frames(decimals=3) == frames
+
+
+def test_frame_list_round_trip_defaults_confidence():
+    frames = [{"frame_idx": 3, "keypoints": [[[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]]},
+              {"frame_idx": 4, "keypoints": []},
+              {"frame_idx": 5, "keypoints": [[[7.0, 8.0, 9.0], [1.0, 1.0, 1.0]], [[0.5, 0.5, 0.5], [2.0, 2.0, 2.0]]]}]
+    tracks = KeypointTracks.from_frame_list(frames)
+
+    np.testing.assert_array_equal(tracks.confidence[:, 0], [[1.0, 1.0], [0.0, 0.0], [1.0, 1.0]])
+    np.testing.assert_array_equal(tracks.present, [[True, False], [False, False], [True, True]])
+    assert tracks.to_frame_list()[1] == {"frame_idx": 4, "keypoints": []}
+    assert tracks.to_frame_list()[2]["keypoints"][1] == [[0.5, 0.5, 0.5, 1.0], [2.0, 2.0, 2.0, 1.0]]
+
+
+def test_named_round_trip():
+    data = {"fps": 25.0,
+            "frames": [{"frame_index": t,
+                        "keypoints_3d": [{"name": f"kp{k}", "x": t + k, "y": 0.5, "z": -1.0, "visibility": 0.75}
+                                         for k in range(4)] if t != 1 else []}
+                       for t in range(3)]}
+    tracks = KeypointTracks.from_named_frames(data)
+
+    assert tracks.fps == 25.0 and tracks.joint_names == ["kp0", "kp1", "kp2", "kp3"]
+    assert tracks.to_named_frames() == data
+
+
+@pytest.mark.parametrize("name", ["tracks.npz", "tracks_dir"])
+def test_save_load_binary(tmp_path, name):
+    tracks = KeypointTracks.from_yolo_frames(_yolo_frames(), fps=30.0)
+    path = str(tmp_path / name)
+    tracks.save(path)
+
+    loaded = KeypointTracks.load(path, mmap_mode="r")
+    for array in ("positions", "confidence", "present", "frame_indices", "boxes"):
+        np.testing.assert_array_equal(getattr(loaded, array), getattr(tracks, array))
+    assert loaded.header() == tracks.header()
+    if name == "tracks_dir":
+        assert isinstance(loaded.positions, np.memmap)
+
+
+def test_load_tracks_prefers_fresh_npz_sibling(tmp_path):
+    path = str(tmp_path / "clip_chunk0_2d_keypoints.json")
+    tracks = KeypointTracks.from_yolo_frames(_yolo_frames())
+    save_tracks(path, tracks)
+
+    assert os.path.exists(tracks_path(path))
+    with open(path) as f:
+        assert json.load(f) == tracks_to_json(tracks)
+    # The sibling carries exact float32 values and the header, not the rounded JSON
+    np.testing.assert_array_equal(load_tracks(path).positions, tracks.positions)
+    assert load_tracks(path, prefer_npz=False).json_layout == "yolo"
+
+    # A JSON replaced after the sibling was written wins, even with an older timestamp (cp -p, git checkout)
+    with open(path, "w") as f:
+        json.dump(_yolo_frames(seed=1), f)
+    os.utime(path, (0, 0))
+    np.testing.assert_array_equal(load_tracks(path).positions,
+                                  KeypointTracks.from_yolo_frames(_yolo_frames(seed=1)).positions)
+
+
+def test_smooth_tracks_handles_any_joint_count():
+    rng = np.random.default_rng(0)
+    positions = np.cumsum(rng.normal(size=(30, 17, 3)), axis=0)
+    tracks = KeypointTracks.from_sequence(positions)
+
+    smoothed = smooth_tracks(tracks, method="savgol")
+    assert smoothed.positions.shape == (30, 1, 17, 3)
+    np.testing.assert_allclose(smoothed.person(0), savgol_filtering(positions.astype(np.float32)), atol=1e-5)
+    assert smoothed.header() == tracks.header()
+
+
+def test_prepare_yolo_takes_first_person(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    frames = _yolo_frames()
+    with open("yolo.json", "w") as f:
+        json.dump(frames, f)
+
+    convert_yolo_to_videopose3d_format("yolo.json", 640, 480, str(tmp_path))
+    data = np.load("data/data_2d_custom_yolo.npz", allow_pickle=True)
+    keypoints = data["positions_2d"].item()["custom"]["yolo"][0]
+    metadata = data["metadata"].item()
+
+    assert keypoints.shape == (12, 17, 3)
+    assert metadata["frame_indices"] == list(range(100, 112))
+    for t, frame in enumerate(frames):
+        expected = frame["persons"][0]["keypoints"] if frame["persons"] else np.zeros((17, 3))
+        np.testing.assert_allclose(keypoints[t], expected, atol=1e-4)
+
+
+def test_lightweight_to_openpose_mapping(tmp_path):
+    rng = np.random.default_rng(0)
+    keypoints = rng.normal(size=(2, 19, 4))
+    input_path = tmp_path / "clip_lightweight_smoothed_3d_keypoints.json"
+    with open(input_path, "w") as f:
+        json.dump([{"frame_idx": t, "keypoints": [keypoints[t].tolist()]} for t in range(2)], f)
+
+    convert_lightweight_to_openpose_json(str(input_path), str(tmp_path))
+    with open(tmp_path / "clip_openpose_3d_keypoints.json") as f:
+        people = json.load(f)["people"]
+
+    pose = np.array(people[1]["pose_keypoints_3d"]).reshape(25, 4)
+    np.testing.assert_allclose(pose[0], keypoints[1, 0], atol=1e-6)
+    np.testing.assert_allclose(pose[9], keypoints[1, 8], atol=1e-6)
+    np.testing.assert_allclose(pose[18], keypoints[1, 17], atol=1e-6)
+    np.testing.assert_allclose(pose[8, :3], (keypoints[1, 8, :3] + keypoints[1, 11, :3]) / 2, atol=1e-6)
+    assert pose[8, 3] == pytest.approx(min(keypoints[1, 8, 3], keypoints[1, 11, 3]), abs=1e-6)
+    np.testing.assert_array_equal(pose[19:], 0.0)
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from AXIS.src.live import FrameGrabber, LatencyReport, LiveRunner, SyntheticFrameSource
+from AXIS.src.pipeline import Pipeline, FrameContextBuilder, ProcessingStep
+
+
+class SleepStep(ProcessingStep):
+    """Stand-in step with a fixed cost that counts executions."""
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.calls = 0
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        self.calls += 1
+        time.sleep(self.seconds)
+        return builder
+
+
+def test_synthetic_source_is_deterministic_and_finite():
+    a = SyntheticFrameSource(width=64, height=48, num_frames=3, realtime=False, seed=1)
+    b = SyntheticFrameSource(width=64, height=48, num_frames=3, realtime=False, seed=1)
+    frames = [a.read()[1] for _ in range(3)]
+    assert frames[0].shape == (48, 64, 3) and frames[0].dtype == np.uint8
+    np.testing.assert_array_equal(frames[2], b.frame_at(2))
+    assert not np.array_equal(frames[0], frames[2])
+    assert a.read() == (False, None)
+
+
+def test_pipeline_run_skips_requested_steps():
+    required, optional = SleepStep(0), SleepStep(0)
+    pipeline = Pipeline(steps=[required, optional])
+    pipeline.run(FrameContextBuilder(0, np.zeros((4, 4, 3), np.uint8)), skip=[optional])
+    assert (required.calls, optional.calls) == (1, 0)
+
+
+def test_runner_degrades_optional_steps_when_over_budget():
+    required, slow = SleepStep(0), SleepStep(0.03)
+    runner = LiveRunner(Pipeline(steps=[required, slow]), latency_budget_ms=10,
+                        optional_steps=[slow], drop_policy="none")
+    source = SyntheticFrameSource(width=32, height=24, num_frames=6, realtime=False)
+    contexts = []
+    report = runner.run(source, on_frame=contexts.append)
+
+    assert report.processed == len(contexts) == 6
+    assert required.calls == 6
+    # The first frame goes over budget, after which the slow step is skipped
+    assert slow.calls == 1
+    assert report.degraded == 5
+    assert [c.frame_index for c in contexts] == list(range(6))
+
+
+def test_latest_policy_drops_frames_when_behind():
+    step = SleepStep(0.05)
+    runner = LiveRunner(Pipeline(steps=[step]), latency_budget_ms=1000, drop_policy="latest")
+    source = SyntheticFrameSource(width=32, height=24, fps=200, num_frames=40)
+    report = runner.run(source)
+
+    assert report.dropped > 0
+    assert report.processed + report.dropped == 40
+    percentiles = report.percentiles()
+    assert percentiles["p50"] <= percentiles["p95"] <= percentiles["p99"]
+
+
+def test_latency_report_percentiles():
+    report = LatencyReport(latencies_ms=list(map(float, range(1, 101))))
+    assert report.percentiles() == pytest.approx({"p50": 50.5, "p95": 95.05, "p99": 99.01})
+    assert LatencyReport().percentiles() == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+
+class _BlockingCapture:
+    """read() blocks until `unblock` is set; release() during a read is recorded as an error."""
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.reading = False
+        self.released = False
+        self.released_while_reading = False
+
+    def isOpened(self):
+        return not self.released
+
+    def read(self):
+        self.reading = True
+        self.unblock.wait()
+        self.reading = False
+        return False, None
+
+    def release(self):
+        self.released_while_reading |= self.reading
+        self.released = True
+
+
+def test_grabber_stop_never_releases_capture_during_read():
+    capture = _BlockingCapture()
+    grabber = FrameGrabber(capture).start()
+    while not capture.reading:
+        time.sleep(0.01)
+    grabber.stop() # Gives up waiting after 1 s while read() is still blocked
+    assert not capture.released
+
+    capture.unblock.set()
+    grabber._thread.join()
+    assert capture.released and not capture.released_while_reading
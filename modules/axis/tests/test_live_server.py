@@ -0,0 +1,134 @@
+import asyncio
+import json
+import socket
+import struct
+
+from AXIS.src.live_server import ClientChannel, LiveResultsServer, encode_frame, websocket_accept_key
+
+
+def _connect(port: int) -> socket.socket:
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    sock.sendall(
+        b"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    )
+    response = b""
+    while not response.endswith(b"\r\n\r\n"):
+        response += sock.recv(1)
+    assert response.startswith(b"HTTP/1.1 101")
+    assert b"s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in response
+    return sock
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        assert chunk, "connection closed"
+        data += chunk
+    return data
+
+
+def _recv_frame(sock: socket.socket):
+    first, second = _recv_exact(sock, 2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", _recv_exact(sock, 2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", _recv_exact(sock, 8))
+    return first & 0x0F, _recv_exact(sock, length)
+
+
+def _recv_message(sock: socket.socket):
+    opcode, payload = _recv_frame(sock)
+    if opcode == 0x8:
+        return None
+    return json.loads(payload)
+
+
+def _send_masked(sock: socket.socket, opcode: int, payload: bytes):
+    mask = b"\x01\x02\x03\x04"
+    sock.sendall(bytes([0x80 | opcode, 0x80 | len(payload)]) + mask
+                 + bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+
+
+def test_accept_key_and_frame_encoding():
+    # RFC 6455 section 1.3 example
+    assert websocket_accept_key("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+    assert encode_frame(b"hi") == b"\x81\x02hi"
+    assert encode_frame(b"x" * 300)[:4] == b"\x81\x7e\x01\x2c"
+    assert encode_frame(b"x" * 70000)[:2] == b"\x81\x7f"
+
+
+def test_clients_receive_frames_as_they_are_published():
+    server = LiveResultsServer(host="127.0.0.1", port=0).start_in_thread()
+    try:
+        server.publish({"frame_index": 0, "lines": []})
+        client = _connect(server.port)
+        hello = _recv_message(client)
+        assert hello == {"type": "hello", "frames_published": 1, "done": False}
+        # A late joiner first gets the most recent frame
+        assert _recv_message(client)["frame_index"] == 0
+
+        lines = [{"id": 0, "points": [[0, 0], [1, 1]]}]
+        server.publish({"frame_index": 1, "lines": lines})
+        message = _recv_message(client)
+        assert message == {"type": "frame", "frame_index": 1, "lines": lines}
+
+        server.finish(frames=2)
+        assert _recv_message(client) == {"type": "done", "frames": 2}
+    finally:
+        server.close()
+    assert _recv_message(client) is None
+    client.close()
+
+
+def test_slow_client_queue_keeps_newest_frames():
+    async def scenario():
+        channel = ClientChannel(max_pending=3)
+        for i in range(5):
+            channel.offer(str(i).encode())
+        return channel.dropped, [channel.queue.get_nowait() for _ in range(channel.queue.qsize())]
+
+    dropped, pending = asyncio.run(scenario())
+    assert dropped == 2
+    assert pending == [b"2", b"3", b"4"]
+
+
+def test_client_close_is_echoed():
+    server = LiveResultsServer(port=0).start_in_thread()
+    try:
+        assert server.host == "127.0.0.1"
+        client = _connect(server.port)
+        _recv_message(client) # hello
+        _send_masked(client, 0x8, struct.pack("!H", 1001) + b"bye")
+        assert _recv_frame(client) == (0x8, struct.pack("!H", 1001))
+        assert client.recv(1) == b""
+        client.close()
+    finally:
+        server.close()
+
+
+def test_oversized_client_frames_are_refused():
+    server = LiveResultsServer(port=0).start_in_thread()
+    try:
+        client = _connect(server.port)
+        _recv_message(client) # hello
+        # A header announcing a 1 TiB payload: rejected before anything is allocated
+        client.sendall(bytes([0x81, 0x80 | 127]) + struct.pack("!Q", 1 << 40) + b"\x00" * 4)
+        assert _recv_frame(client) == (0x8, struct.pack("!H", 1009))
+        assert client.recv(1) == b""
+        client.close()
+    finally:
+        server.close()
+
+
+def test_non_websocket_requests_are_rejected():
+    server = LiveResultsServer(host="127.0.0.1", port=0).start_in_thread()
+    try:
+        sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+        sock.sendall(b"GET /other HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        assert sock.recv(64).startswith(b"HTTP/1.1 404")
+        sock.close()
+    finally:
+        server.close()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from AXIS.src.lod import build_line_pyramid
+from AXIS.src.steps.vectorization import simplify_polylines
+
+
+def _curves():
+    t = np.linspace(0, 2 * np.pi, 100)
+    return [
+        np.stack([t * 40, np.sin(t) * 50], axis=1),
+        np.stack([np.cos(t) * 80 + 100, np.sin(t) * 30], axis=1),
+        np.array([[5.0, 5.0]]),
+        np.empty((0, 2)),
+    ]
+
+
+def test_levels_match_independent_simplification():
+    curves = _curves()
+    tolerances = (8.0, 2.0, 0.5)
+    pyramid = build_line_pyramid(curves, tolerances)
+
+    assert len(pyramid) == len(curves)
+    for i, curve in enumerate(curves):
+        for level, tolerance in enumerate(tolerances):
+            keep = simplify_polylines(curve, np.array([0, len(curve)]), np.array([tolerance]))
+            np.testing.assert_array_equal(pyramid.level_points(i, level), curve[keep])
+
+
+def test_levels_are_nested_and_coarse_levels_are_smaller():
+    pyramid = build_line_pyramid(_curves()[:2])
+    for i in range(2):
+        counts = [len(pyramid.level_points(i, level)) for level in range(3)]
+        assert counts == sorted(counts) and counts[0] < counts[-1] < 100
+        # Endpoints are present at every level
+        coarse = pyramid.level_points(i, 0)
+        np.testing.assert_array_equal(coarse[[0, -1]], pyramid.level_points(i, 2)[[0, -1]])
+
+
+def test_json_items_round_points():
+    items = build_line_pyramid(_curves()[:1], (4.0, 1.0)).to_json_items(decimals=1)
+    assert items[0]["id"] == 0
+    assert len(items[0]["points"]) == len(items[0]["lod"])
+    assert all(round(x, 1) == x for point in items[0]["points"] for x in point)
+
+
+def test_tolerances_must_descend():
+    with pytest.raises(ValueError):
+        build_line_pyramid(_curves(), (0.5, 2.0))
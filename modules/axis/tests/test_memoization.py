@@ -0,0 +1,93 @@
+import numpy as np
+
+from AXIS.src.pipeline import Pipeline, FrameContextBuilder, ProcessingStep
+from AXIS.src.steps.detection import EdgeDetectionStep
+from AXIS.src.steps.memoization import MemoizedStep
+from AXIS.src.steps.vectorization import LineVectorizationStep
+from AXIS.src.steps.fitting import CurveFittingStep
+from AXIS.src.strategies.detectors import CannyDetector, TiledEdgeDetector
+
+
+class CountingEdgeStep(ProcessingStep):
+    """Deterministic stand-in for EdgeDetectionStep that counts executions."""
+    def __init__(self, size: int = 20):
+        self.size = size
+        self.calls = 0
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        self.calls += 1
+        edge_map = np.zeros(builder.get("original_frame").shape[:2], dtype=np.uint8)
+        edge_map[10:10 + self.size, 10:10 + self.size] = 255
+        return builder.set("edge_map", edge_map)
+
+
+def _frame(value: int = 0) -> np.ndarray:
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    frame[0, 0] = value
+    return frame
+
+
+def test_memoized_step_reloads_outputs(tmp_path):
+    edge = CountingEdgeStep()
+    steps = [MemoizedStep(edge, str(tmp_path)), MemoizedStep(LineVectorizationStep(), str(tmp_path))]
+
+    first = Pipeline(steps).run(FrameContextBuilder(0, _frame()))
+    second = Pipeline(steps).run(FrameContextBuilder(0, _frame()))
+
+    assert edge.calls == 1
+    assert steps[0].hits == 1 and steps[1].hits == 1
+    np.testing.assert_array_equal(first.edge_map, second.edge_map)
+    assert len(first.lines_2d) == len(second.lines_2d)
+    for a, b in zip(first.lines_2d, second.lines_2d):
+        np.testing.assert_array_equal(a.points, b.points)
+
+
+def test_downstream_config_change_reuses_upstream(tmp_path):
+    edge = CountingEdgeStep()
+    upstream = [MemoizedStep(edge, str(tmp_path)), MemoizedStep(LineVectorizationStep(), str(tmp_path))]
+
+    Pipeline(upstream + [MemoizedStep(CurveFittingStep(num_samples=50), str(tmp_path))]).run(FrameContextBuilder(0, _frame()))
+    fitting = MemoizedStep(CurveFittingStep(num_samples=20), str(tmp_path))
+    context = Pipeline(upstream + [fitting]).run(FrameContextBuilder(0, _frame()))
+
+    assert edge.calls == 1
+    assert fitting.misses == 1
+    assert all(len(c.points) == 20 for c in context.curves_2d)
+
+
+def test_cache_key_tracks_frame_and_upstream_config(tmp_path):
+    edge_a, edge_b = CountingEdgeStep(size=20), CountingEdgeStep(size=30)
+    vec_a = MemoizedStep(LineVectorizationStep(), str(tmp_path))
+    vec_b = MemoizedStep(LineVectorizationStep(), str(tmp_path))
+
+    Pipeline([MemoizedStep(edge_a, str(tmp_path)), vec_a]).run(FrameContextBuilder(0, _frame()))
+    Pipeline([MemoizedStep(edge_a, str(tmp_path)), vec_a]).run(FrameContextBuilder(1, _frame(value=1)))
+    Pipeline([MemoizedStep(edge_b, str(tmp_path)), vec_b]).run(FrameContextBuilder(0, _frame()))
+
+    assert edge_a.calls == 2
+    assert vec_a.misses == 2
+    assert vec_b.misses == 1
+
+
+def test_runtime_settings_do_not_change_cache_key(tmp_path):
+    edge = CountingEdgeStep()
+    upstream = [MemoizedStep(edge, str(tmp_path)), MemoizedStep(LineVectorizationStep(), str(tmp_path))]
+    serial = MemoizedStep(CurveFittingStep(num_samples=30, max_workers=1), str(tmp_path))
+    Pipeline(upstream + [serial]).run(FrameContextBuilder(0, _frame()))
+
+    step = CurveFittingStep(num_samples=30, max_workers=4, chunk_size=8)
+    step._fit_cache["stale"] = None
+    parallel = MemoizedStep(step, str(tmp_path))
+    Pipeline(upstream + [parallel]).run(FrameContextBuilder(0, _frame()))
+
+    assert serial.misses == 1
+    assert parallel.hits == 1 and parallel.misses == 0
+
+
+def test_strategy_config_changes_cache_key(tmp_path):
+    signature = lambda step: MemoizedStep(step, str(tmp_path))._step_signature
+    assert signature(EdgeDetectionStep(CannyDetector(100, 200))) == signature(EdgeDetectionStep(CannyDetector(100, 200)))
+    assert signature(EdgeDetectionStep(CannyDetector(100, 200))) != signature(EdgeDetectionStep(CannyDetector(10, 50)))
+    # The detector wrapped by a tiled detector is described too
+    tiled = lambda low: EdgeDetectionStep(TiledEdgeDetector(CannyDetector(low, 200)))
+    assert signature(tiled(100)) != signature(tiled(10))
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+
+from AXIS.src.pipeline import FrameContextBuilder, ProcessingStep
+from AXIS.src.data_models import Circle, Point2D, Line2D
+from AXIS.src.steps.multiresolution import PyramidLevelStep
+from AXIS.src.steps.detection import EdgeDetectionStep
+from AXIS.src.steps.vectorization import LineVectorizationStep
+from AXIS.src.strategies.detectors import CannyDetector
+
+
+def _frame() -> np.ndarray:
+    frame = np.zeros((128, 192, 3), dtype=np.uint8)
+    cv2.circle(frame, (96, 64), 40, (255, 255, 255), -1)
+    return frame
+
+
+def test_pyramid_is_computed_once_per_frame():
+    builder = FrameContextBuilder(0, _frame())
+
+    level2 = builder.get_pyramid_level(2)
+
+    assert level2.shape == (32, 48, 3)
+    assert builder.get_pyramid_level(2) is level2
+    assert builder.get_pyramid_level(0) is builder.get("original_frame")
+
+
+def test_outputs_rescaled_to_full_resolution():
+    class FakeCircleStep(ProcessingStep):
+        consumes = ("original_frame",)
+
+        def execute(self, builder):
+            h, w = builder.get("original_frame").shape[:2]
+            self.seen_shape = (h, w)
+            return builder.set_circles([Circle(center=Point2D(x=w // 2, y=h // 2), radius=10)])
+
+    inner = FakeCircleStep()
+    builder = PyramidLevelStep(inner, level=2).execute(FrameContextBuilder(0, _frame()))
+
+    assert inner.seen_shape == (32, 48)
+    circle = builder.get("circles")[0]
+    assert (circle.center.x, circle.center.y, circle.radius) == (96, 64, 40)
+    assert builder.get("original_frame").shape == (128, 192, 3)
+
+
+def test_coarse_edges_and_full_resolution_vectorization():
+    builder = FrameContextBuilder(0, _frame())
+    builder = PyramidLevelStep(EdgeDetectionStep(strategy=CannyDetector()), level=1).execute(builder)
+
+    assert builder.get("edge_map").shape == (128, 192)
+
+    builder = PyramidLevelStep(LineVectorizationStep(), level=1).execute(builder)
+    lines = builder.get("lines_2d")
+
+    assert lines and all(isinstance(line, Line2D) for line in lines)
+    points = np.concatenate([line.points for line in lines])
+    assert points.dtype.kind == "i"
+    radii = np.linalg.norm(points - np.array([96, 64]), axis=1)
+    assert np.all(np.abs(radii - 40) < 4)
+    assert builder.get("edge_map").shape == (128, 192)
@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from AXIS.scripts.parse_bvh import axis_rotations, forward_kinematics, parse_bvh, read_bvh
+
+BVH = """HIERARCHY
+ROOT pelvis
+{
+	OFFSET 0.0 0.0 0.0
+	CHANNELS 6 Xposition Yposition Zposition Zrotation Xrotation Yrotation
+	JOINT spine
+	{
+		OFFSET 0.0 10.0 0.0
+		CHANNELS 3 Zrotation Yrotation Xrotation
+		JOINT head
+		{
+			OFFSET 0.0 8.0 1.0
+			CHANNELS 3 Xrotation Yrotation Zrotation
+			End Site
+			{
+				OFFSET 0.0 3.0 0.0
+			}
+		}
+	}
+	JOINT leg
+	{
+		OFFSET 4.0 -2.0 0.0
+		CHANNELS 3 Zrotation Xrotation Yrotation
+		End Site
+		{
+			OFFSET 0.0 -12.0 0.0
+		}
+	}
+}
+MOTION
+Frames: 3
+Frame Time: 0.033333
+1.0 90.0 -2.0 10.0 20.0 30.0 0.0 45.0 -15.0 5.0 -60.0 12.0 33.0 -8.0 70.0
+0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0
+-3.5 88.0 4.0 -170.0 80.0 5.0 90.0 -90.0 45.0 1.0 2.0 3.0 -45.0 15.0 -120.0
+"""
+
+
+def _reference_positions(hierarchy, frame, root):
+    """Per-frame recursive FK, one joint at a time."""
+    positions, column = {}, {}
+    index = 0
+    for name, info in hierarchy.items():
+        column[name] = index
+        index += len(info["channels"])
+
+    def visit(name, parent_pos, parent_rot):
+        info = hierarchy[name]
+        offset = info["offset"].copy()
+        axes, angles = "", []
+        for i, channel in enumerate(info["channels"]):
+            value = frame[column[name] + i]
+            if channel.endswith("position"):
+                offset["XYZ".index(channel[0])] = value
+            else:
+                axes += channel[0]
+                angles.append(value)
+        local = Rotation.from_euler(axes, angles, degrees=True).as_matrix() if axes else np.eye(3)
+        position = parent_pos + parent_rot @ offset
+        rotation = parent_rot @ local
+        positions[name] = position
+        for child in info["children"]:
+            visit(child, position, rotation)
+        if info["end_site"] is not None:
+            positions[f"{name}_EndSite"] = position + rotation @ info["end_site"]
+
+    visit(root, np.zeros(3), np.eye(3))
+    return positions
+
+
+@pytest.fixture
+def bvh_path(tmp_path):
+    path = tmp_path / "clip_person0.bvh"
+    path.write_text(BVH)
+    return str(path)
+
+
+def test_read_bvh_detects_root_and_motion_shape(bvh_path):
+    hierarchy, root, motion, frame_time = read_bvh(bvh_path)
+    assert root == "pelvis"
+    assert list(hierarchy) == ["pelvis", "spine", "head", "leg"]
+    assert motion.shape == (3, 15)
+    assert frame_time == pytest.approx(0.033333)
+
+
+def test_axis_rotations_match_elementary_rotations():
+    angles = np.array([[30.0, -45.0, 120.0]])
+    matrices = axis_rotations([0, 1, 2], angles)
+    for k, axis in enumerate("xyz"):
+        expected = Rotation.from_euler(axis, angles[0, k], degrees=True).as_matrix()
+        np.testing.assert_allclose(matrices[0, k], expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("root", ["pelvis", "spine"])
+def test_batched_fk_matches_per_frame_reference(bvh_path, root):
+    hierarchy, _, motion, _ = read_bvh(bvh_path)
+    positions = forward_kinematics(hierarchy, motion, root)
+    for t, frame in enumerate(motion):
+        expected = _reference_positions(hierarchy, frame, root)
+        assert list(positions) == list(expected)
+        for name, value in expected.items():
+            np.testing.assert_allclose(positions[name][t], value, atol=1e-9)
+
+
+def test_unknown_root_is_rejected(bvh_path):
+    hierarchy, _, motion, _ = read_bvh(bvh_path)
+    with pytest.raises(ValueError):
+        forward_kinematics(hierarchy, motion, "Hips")
+
+
+def test_parse_bvh_writes_per_frame_positions(bvh_path, tmp_path):
+    parse_bvh(bvh_path, str(tmp_path))
+    with open(tmp_path / "clip_person0_parsed_positions.json") as f:
+        data = json.load(f)
+    assert len(data["frames"]) == 3
+    assert list(data["frames"][1]) == ["pelvis", "spine", "head", "head_EndSite", "leg", "leg_EndSite"]
+    # Rest pose: the head end site is the sum of the offsets on its chain
+    np.testing.assert_allclose(data["frames"][1]["head_EndSite"], [0.0, 21.0, 1.0])
+    assert data["hierarchy"]["leg"]["parent"] == "pelvis"
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+from AXIS.src.pipeline import Pipeline, FrameContextBuilder
+from AXIS.src.steps.detection import EdgeDetectionStep
+from AXIS.src.steps.shape_detection import CircleDetectionStep, TriangleDetectionStep
+from AXIS.src.strategies.detectors import CannyDetector
+
+
+def _frame() -> np.ndarray:
+    frame = np.zeros((160, 160, 3), dtype=np.uint8)
+    cv2.circle(frame, (50, 50), 25, (255, 255, 255), 2)
+    cv2.fillPoly(frame, [np.array([[100, 140], [150, 140], [125, 95]])], (255, 255, 255))
+    return frame
+
+
+def test_operations_are_memoized_per_frame():
+    builder = FrameContextBuilder(0, _frame())
+    pre = builder.preprocessor
+
+    gray = pre.grayscale()
+    blurred = pre.gaussian_blur(1.5)
+
+    assert pre.grayscale() is gray
+    assert pre.gaussian_blur(1.5) is blurred
+    assert pre.gaussian_blur(2.0) is not blurred
+    np.testing.assert_array_equal(gray, cv2.cvtColor(_frame(), cv2.COLOR_BGR2GRAY))
+    assert pre.pyramid_level(2).shape == (40, 40, 3)
+    assert pre.pyramid_level(1) is pre.pyramid_level(1)
+
+
+def test_cache_invalidated_when_source_replaced():
+    builder = FrameContextBuilder(0, _frame())
+    first = builder.preprocessor.grayscale()
+
+    builder.set("original_frame", np.zeros((32, 32, 3), dtype=np.uint8))
+
+    assert builder.preprocessor.grayscale().shape == (32, 32)
+    assert builder.preprocessor.grayscale() is not first
+
+
+def test_steps_share_grayscale_and_report_hits():
+    pipeline = Pipeline([
+        EdgeDetectionStep(strategy=CannyDetector()),
+        CircleDetectionStep(),
+        TriangleDetectionStep(),
+    ])
+
+    context = pipeline.run(FrameContextBuilder(0, _frame()))
+
+    # grayscale 1회 계산 후 median_blur와 adaptive_threshold가 재사용
+    assert context.metrics["preprocess_cache_misses"] == 3
+    assert context.metrics["preprocess_cache_hits"] == 2
+    assert context.edge_map.shape == (160, 160)
+    assert len(context.triangles) >= 1
@@ -0,0 +1,95 @@
+import csv
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from AXIS.src.data_models import Line2D
+from AXIS.src.pipeline import Pipeline, FrameContextBuilder, ProcessingStep
+from AXIS.src.profiling import PipelineProfiler, ProfiledStep
+from AXIS.src.steps.memoization import MemoizedStep
+
+
+class LinesStep(ProcessingStep):
+    """Emits `frame_index + 1` lines and allocates a scratch buffer."""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        time.sleep(self.delay)
+        scratch = np.ones(1 << 20, dtype=np.uint8)
+        count = builder.get("frame_index") + 1
+        builder.set("lines_2d", [Line2D(points=np.zeros((2, 2)) + scratch[:1]) for _ in range(count)])
+        return builder
+
+
+def _run(profiler, steps, frames=3):
+    pipeline = Pipeline(steps=profiler.wrap(steps))
+    pipeline.add_observer(profiler)
+    for i in range(frames):
+        pipeline.run(FrameContextBuilder(frame_index=i, original_frame=np.zeros((4, 4, 3), np.uint8)))
+
+
+def test_rows_record_step_times_and_counts():
+    profiler = PipelineProfiler()
+    _run(profiler, [LinesStep(delay=0.01), LinesStep()])
+
+    assert profiler.step_names == ["LinesStep", "LinesStep#1"]
+    assert [row["frame_index"] for row in profiler.rows] == [0, 1, 2]
+    assert [row["lines_2d"] for row in profiler.rows] == [1, 2, 3]
+    for row in profiler.rows:
+        assert row["LinesStep_ms"] >= 10
+        assert row["total_ms"] >= row["LinesStep_ms"] + row["LinesStep#1_ms"]
+
+    stats = profiler.histograms()
+    assert stats["LinesStep"]["frames"] == 3
+    assert sum(stats["LinesStep"]["counts"]) == 3
+    report = profiler.report()
+    # The slow step is listed first
+    assert report.index("LinesStep:") < report.index("LinesStep#1:")
+    assert "lines_2d: mean 2.0, max 3 (frame 2)" in report
+
+
+class PyramidStep(ProcessingStep):
+    """Reads the same pyramid level twice: one preprocessing cache miss, then one hit."""
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        builder.get_pyramid_level(1)
+        builder.get_pyramid_level(1)
+        return builder
+
+
+def test_rows_record_preprocessing_cache_counts():
+    profiler = PipelineProfiler()
+    _run(profiler, [PyramidStep(), LinesStep()], frames=2)
+
+    for row in profiler.rows:
+        assert row["preprocess_cache_hits"] == 1
+        assert row["preprocess_cache_misses"] == 1
+    assert "preprocess_cache_hits: mean 1.0" in profiler.report()
+
+
+def test_allocation_tracking():
+    profiler = PipelineProfiler(track_allocations=True)
+    try:
+        _run(profiler, [LinesStep()], frames=1)
+    finally:
+        tracemalloc.stop()
+    assert profiler.rows[0]["LinesStep_alloc_bytes"] >= 1 << 20
+
+
+def test_save_writes_csv_and_histograms(tmp_path):
+    profiler = PipelineProfiler()
+    _run(profiler, [LinesStep()])
+    paths = profiler.save(str(tmp_path))
+
+    with open(paths["csv"]) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 3 and "LinesStep_ms" in rows[0]
+    with open(paths["histograms"]) as f:
+        assert set(json.load(f)) == {"LinesStep", "total"}
+
+
+def test_wrapped_steps_are_named_after_the_inner_step(tmp_path):
+    step = ProfiledStep(MemoizedStep(LinesStep(), str(tmp_path)), PipelineProfiler())
+    assert step.name == "LinesStep"
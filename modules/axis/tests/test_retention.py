@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from AXIS.src.pipeline import Pipeline, FrameContextBuilder, ProcessingStep, RetentionPolicy, compact_map
+
+
+class ProduceMapsStep(ProcessingStep):
+    consumes = ("original_frame",)
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        h, w = builder.get("original_frame").shape[:2]
+        builder.set("edge_map", np.ones((h, w), dtype=np.uint8))
+        builder.set("depth_map", np.linspace(0.0, 10.0, h * w, dtype=np.float32).reshape(h, w))
+        builder.set("flow_map", np.full((h, w, 2), 1.5, dtype=np.float32))
+        return builder
+
+
+class ReadStep(ProcessingStep):
+    def __init__(self, key: str):
+        self.consumes = (key,)
+        self.seen = None
+
+    def execute(self, builder: FrameContextBuilder) -> FrameContextBuilder:
+        self.seen = builder.get(self.consumes[0])
+        return builder
+
+
+def _builder(idx: int = 0) -> FrameContextBuilder:
+    return FrameContextBuilder(idx, np.zeros((16, 16, 3), dtype=np.uint8), prev_frame=np.zeros((16, 16, 3), dtype=np.uint8))
+
+
+def test_maps_released_after_last_consumer():
+    read_edges, read_depth = ReadStep("edge_map"), ReadStep("depth_map")
+    pipeline = Pipeline([ProduceMapsStep(), read_edges, read_depth], retention=RetentionPolicy(keep_maps=("flow_map",)))
+
+    context = pipeline.run(_builder())
+
+    assert read_edges.seen is not None and read_depth.seen is not None
+    assert context.edge_map is None
+    assert context.depth_map is None
+    assert context.flow_map is not None
+    assert context.original_frame is not None
+
+
+def test_undeclared_step_keeps_maps_alive():
+    class LegacyStep(ProcessingStep):
+        def execute(self, builder):
+            return builder
+
+    context = Pipeline([ProduceMapsStep(), ReadStep("edge_map"), LegacyStep()],
+                       retention=RetentionPolicy()).run(_builder())
+
+    # LegacyStep이 무엇을 읽는지 모르므로 그 스텝이 끝날 때까지 유지되었다가 해제됨
+    assert context.edge_map is None
+    assert context.depth_map is None
+
+
+def test_reduced_precision_and_ring_buffer():
+    read_flow = ReadStep("flow_map")
+    policy = RetentionPolicy(max_contexts=2, map_dtypes={"depth_map": np.uint8, "flow_map": np.float16}, keep_maps=("depth_map",))
+    pipeline = Pipeline([ProduceMapsStep(), read_flow], retention=policy)
+
+    contexts = [pipeline.run(_builder(i)) for i in range(5)]
+
+    assert read_flow.seen.dtype == np.float16
+    assert contexts[-1].depth_map.dtype == np.uint8
+    assert contexts[-1].depth_map.max() == 255
+    assert [c.frame_index for c in pipeline.recent_contexts] == [3, 4]
+
+
+def test_flow_map_cannot_be_uint8():
+    with pytest.raises(ValueError):
+        RetentionPolicy(map_dtypes={"flow_map": np.uint8})
+    assert compact_map(np.zeros(3, dtype=np.float32), np.float16).dtype == np.float16
+
+
+def test_compact_map_never_widens():
+    depth = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    assert compact_map(depth, np.float32) is depth
+    assert compact_map(depth, np.float16) is depth
+    assert compact_map(np.zeros(3, dtype=np.float16), np.float32).dtype == np.float16
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from scipy.signal import savgol_filter
+
+from AXIS.scripts.apply_smoothing import apply_filter_to_frames
+from AXIS.scripts.smoothing_utils import (MovingAverageStream, OneEuroFilter, SavgolStream, make_stream_filter,
+                                          moving_average_filter, one_euro_filter, savgol_filtering)
+
+
+def _clip(num_frames=120, joints=5, coords=3, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=(num_frames, joints, coords)), axis=0)
+
+
+@pytest.mark.parametrize("window_size", [4, 5])
+def test_moving_average_matches_per_channel_convolution(window_size):
+    data = _clip()
+    expected = np.zeros_like(data)
+    for i in range(data.shape[1]):
+        for j in range(data.shape[2]):
+            expected[:, i, j] = np.convolve(data[:, i, j], np.ones(window_size) / window_size, mode="same")
+    np.testing.assert_allclose(moving_average_filter(data, window_size), expected, atol=1e-12)
+
+
+def test_savgol_matches_per_channel_filter():
+    data = _clip()
+    expected = np.stack([savgol_filter(data[:, i, j], 11, 2) for i in range(5) for j in range(3)], axis=1)
+    np.testing.assert_allclose(savgol_filtering(data).reshape(len(data), -1), expected, atol=1e-12)
+
+
+def test_one_euro_matches_independent_scalar_filters():
+    data = _clip(num_frames=60)
+    flat = data.reshape(len(data), -1)
+    filters = [OneEuroFilter(freq=30, min_cutoff=1.0, beta=0.01) for _ in range(flat.shape[1])]
+    expected = np.array([[filters[j](flat[i, j]) for j in range(flat.shape[1])] for i in range(len(flat))])
+
+    smoothed = one_euro_filter(data, freq=30, min_cutoff=1.0, beta=0.01)
+    assert smoothed.shape == data.shape
+    np.testing.assert_allclose(smoothed.reshape(len(data), -1), expected, atol=1e-12)
+
+
+def test_streaming_filters_agree_with_offline_counterparts():
+    data = _clip(num_frames=40)
+
+    euro = make_stream_filter("one_euro", beta=0.01)
+    streamed = np.array([euro(frame) for frame in data])
+    np.testing.assert_allclose(streamed, one_euro_filter(data, beta=0.01), atol=1e-12)
+
+    average = MovingAverageStream(window_size=4)
+    streamed = np.array([average(frame) for frame in data])
+    np.testing.assert_allclose(streamed[0], data[0])
+    np.testing.assert_allclose(streamed[20], data[17:21].mean(axis=0), atol=1e-12)
+
+    savgol = SavgolStream(window_length=7, polyorder=2)
+    streamed = np.array([savgol(frame) for frame in data])
+    np.testing.assert_array_equal(streamed[:6], data[:6])
+    for t in (6, 25, 39):
+        np.testing.assert_allclose(streamed[t], savgol_filter(data[t - 6:t + 1], 7, 2, axis=0)[-1], atol=1e-9)
+
+    # reset() starts a new sequence
+    euro.reset()
+    np.testing.assert_array_equal(euro(data[5]), data[5])
+    assert make_stream_filter("none") is None
+    with pytest.raises(ValueError):
+        make_stream_filter("kalman")
+
+
+def test_apply_filter_to_frames_one_euro():
+    data = _clip(num_frames=10, joints=33)
+    frames = [{"frame_index": t,
+               "keypoints_3d": [{"name": f"kp{k}", "x": x, "y": y, "z": z, "visibility": 0.9}
+                                for k, (x, y, z) in enumerate(data[t])]}
+              for t in range(len(data))]
+    frames[4]["keypoints_3d"] = []
+
+    smoothed = apply_filter_to_frames(frames, method="one_euro")
+    filled = data.copy()
+    filled[4] = 0.0
+    expected = one_euro_filter(filled, beta=0.01)
+    assert smoothed[4]["keypoints_3d"] == []
+    assert smoothed[7]["keypoints_3d"][3]["x"] == pytest.approx(expected[7, 3, 0])
+    assert smoothed[7]["keypoints_3d"][3]["name"] == "kp3"
@@ -0,0 +1,98 @@
+import functools
+import gzip
+import http.client
+import http.server
+import os
+import socket
+import threading
+
+import pytest
+
+from AXIS.server import Handler
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "scene_data.json").write_bytes(b'[{"frame_index": 0}]' * 100)
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(tmp_path)))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield tmp_path, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(port, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_revalidation_returns_not_modified(server):
+    root, port = server
+    response, body = _get(port, "/scene_data.json")
+    assert response.status == 200
+    assert body == (root / "scene_data.json").read_bytes()
+    etag, last_modified = response.getheader("ETag"), response.getheader("Last-Modified")
+
+    response, body = _get(port, "/scene_data.json", {"If-None-Match": etag})
+    assert response.status == 304 and body == b""
+    response, _ = _get(port, "/scene_data.json", {"If-Modified-Since": last_modified})
+    assert response.status == 304
+    response, _ = _get(port, "/scene_data.json", {"If-None-Match": '"stale"'})
+    assert response.status == 200
+
+
+def test_range_requests(server):
+    root, port = server
+    data = (root / "scene_data.json").read_bytes()
+
+    response, body = _get(port, "/scene_data.json", {"Range": "bytes=10-19"})
+    assert response.status == 206
+    assert body == data[10:20]
+    assert response.getheader("Content-Range") == f"bytes 10-19/{len(data)}"
+
+    response, body = _get(port, "/scene_data.json", {"Range": "bytes=-5"})
+    assert response.status == 206 and body == data[-5:]
+
+    response, _ = _get(port, "/scene_data.json", {"Range": f"bytes={len(data)}-"})
+    assert response.status == 416
+
+    # Multi-range requests are not supported and fall back to the full body
+    response, body = _get(port, "/scene_data.json", {"Range": "bytes=0-1,5-6"})
+    assert response.status == 200 and body == data
+
+
+def test_precompressed_sibling_is_served(server):
+    root, port = server
+    data = (root / "scene_data.json").read_bytes()
+    with gzip.open(root / "scene_data.json.gz", "wb") as f:
+        f.write(data)
+
+    response, body = _get(port, "/scene_data.json", {"Accept-Encoding": "gzip, deflate"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Content-Type") == "application/json"
+    assert gzip.decompress(body) == data and len(body) < len(data)
+
+    response, body = _get(port, "/scene_data.json")
+    assert response.getheader("Content-Encoding") is None and body == data
+
+    # A stale .gz (older than the source) is ignored
+    stat = os.stat(root / "scene_data.json")
+    os.utime(root / "scene_data.json.gz", ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    response, body = _get(port, "/scene_data.json", {"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") is None and body == data
+
+
+def test_stalled_client_does_not_block_others(server):
+    _, port = server
+    stalled = socket.create_connection(("127.0.0.1", port), timeout=5)
+    stalled.sendall(b"GET /scene_data.json HTTP/1.1\r\n")  # never finishes its headers
+    try:
+        response, _ = _get(port, "/scene_data.json")
+        assert response.status == 200
+    finally:
+        stalled.close()
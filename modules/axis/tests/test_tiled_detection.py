@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+
+from AXIS.src.strategies.base import IEdgeDetector
+from AXIS.src.strategies.detectors import CannyDetector, TiledEdgeDetector
+
+
+class GradientDetector(IEdgeDetector):
+    """Purely local detector, so tiling must reproduce the full-frame result exactly."""
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+
+
+def _frame(h: int = 300, w: int = 420) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    for _ in range(30):
+        center = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        cv2.circle(frame, center, int(rng.integers(5, 60)), (255, 255, 255), 2)
+    return frame
+
+
+def test_tiled_output_matches_full_frame_for_local_detector():
+    frame = _frame()
+    full = GradientDetector().detect(frame)
+
+    tiled = TiledEdgeDetector(GradientDetector(), tile_size=64, overlap=4, max_workers=4).detect(frame)
+
+    assert tiled.shape == full.shape
+    np.testing.assert_array_equal(tiled, full)
+
+
+def test_tiled_canny_is_seamless():
+    frame = _frame()
+    full = CannyDetector().detect(frame)
+
+    tiled = TiledEdgeDetector(CannyDetector(), tile_size=100, overlap=16).detect(frame)
+
+    assert tiled.dtype == np.uint8
+    assert np.mean(tiled == full) > 0.999
+
+
+def test_small_frames_skip_tiling_and_inherit_input_kind():
+    detector = TiledEdgeDetector(CannyDetector(), tile_size=512)
+    assert detector.input_kind == "gray"
+    assert detector.detect(_frame(64, 64)).shape == (64, 64)
+
+
+def test_non_thread_safe_detector_is_tiled_in_batches():
+    class BatchedGradientDetector(GradientDetector):
+        thread_safe = False
+
+        def __init__(self):
+            self.batch_sizes = []
+
+        def detect_batch(self, frames):
+            self.batch_sizes.append(len(frames))
+            return [self.detect(f) for f in frames]
+
+    frame = _frame()
+    inner = BatchedGradientDetector()
+
+    tiled = TiledEdgeDetector(inner, tile_size=128, overlap=4, batch_size=5).detect(frame)
+
+    np.testing.assert_array_equal(tiled, GradientDetector().detect(frame))
+    assert inner.batch_sizes == [5, 5, 2]
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+
+from AXIS.src.data_models import LineSet
+from AXIS.src.pipeline import FrameContextBuilder
+from AXIS.src.steps.vectorization import LineVectorizationStep, simplify_polylines
+
+
+def _edge_map(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur((rng.random((240, 320)) * 255).astype(np.uint8), (0, 0), 3)
+    return cv2.Canny(image, 10, 30)
+
+
+def _reference_lines(edge_map, min_contour_length=10, epsilon_ratio=0.005):
+    """The original per-contour implementation."""
+    contours, _ = cv2.findContours(edge_map, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+    lines = []
+    for contour in contours:
+        if len(contour) < min_contour_length:
+            continue
+        epsilon = epsilon_ratio * cv2.arcLength(contour, True)
+        lines.append(cv2.approxPolyDP(contour, epsilon, False).squeeze(axis=1))
+    return lines
+
+
+def _point_line_distance(p, a, b):
+    ab, ap = b - a, p - a
+    return abs(ab[0] * ap[1] - ab[1] * ap[0]) / np.linalg.norm(ab)
+
+
+def test_simplify_polylines_respects_tolerance():
+    rng = np.random.default_rng(3)
+    polylines = [np.cumsum(rng.normal(size=(n, 2)), axis=0) for n in (2, 5, 40, 200)]
+    offsets = np.concatenate([[0], np.cumsum([len(p) for p in polylines])])
+    epsilons = np.array([0.5, 1.0, 1.5, 2.0])
+
+    keep = simplify_polylines(np.concatenate(polylines), offsets, epsilons)
+
+    for poly, eps, mask in zip(polylines, epsilons, np.split(keep, offsets[1:-1])):
+        assert mask[0] and mask[-1]
+        kept = np.flatnonzero(mask)
+        for start, end in zip(kept[:-1], kept[1:]):
+            for j in range(start + 1, end):
+                assert _point_line_distance(poly[j], poly[start], poly[end]) <= eps + 1e-9
+
+
+def test_vectorization_matches_reference_implementation():
+    edge_map = _edge_map()
+    reference = _reference_lines(edge_map)
+
+    builder = LineVectorizationStep().execute(FrameContextBuilder(0, np.zeros((240, 320, 3), np.uint8)).set("edge_map", edge_map))
+    lines = builder.get("lines_2d")
+
+    assert len(lines) == len(reference)
+    for line, ref in zip(lines, reference):
+        np.testing.assert_array_equal(line.points, ref)
+
+
+def test_simplify_polylines_matches_approx_poly_dp():
+    rng = np.random.default_rng(4)
+    polylines, epsilons = [], []
+    while len(polylines) < 500:
+        n = int(rng.integers(2, 60))
+        if len(polylines) % 2:
+            poly = np.cumsum(rng.integers(-1, 2, size=(n, 2)), axis=0) + 100 # Pixel-chain-like
+        else:
+            poly = rng.integers(0, 40, size=(n, 2))
+        if (poly[0] != poly[-1]).any(): # Equal endpoints are treated as closed by OpenCV
+            polylines.append(poly.astype(np.int32))
+            epsilons.append(rng.uniform(0, 3))
+    offsets = np.concatenate([[0], np.cumsum([len(p) for p in polylines])])
+
+    keep = simplify_polylines(np.concatenate(polylines), offsets, np.array(epsilons))
+
+    for poly, eps, mask in zip(polylines, epsilons, np.split(keep, offsets[1:-1])):
+        np.testing.assert_array_equal(poly[mask], cv2.approxPolyDP(poly.reshape(-1, 1, 2), eps, False).reshape(-1, 2))
+
+
+def test_output_is_columnar_and_shared_with_lines_2d():
+    builder = LineVectorizationStep().execute(FrameContextBuilder(0, np.zeros((240, 320, 3), np.uint8)).set("edge_map", _edge_map(1)))
+    line_set, lines = builder.get("line_set"), builder.get("lines_2d")
+
+    assert isinstance(line_set, LineSet)
+    assert len(line_set) == len(lines)
+    assert all(np.shares_memory(line.points, line_set.points) for line in lines[:5])
+    assert line_set.points.dtype == np.int32
+
+
+def test_prefilter_removes_small_components():
+    edge_map = np.zeros((100, 100), np.uint8)
+    edge_map[10, 10:12] = 255      # 2-pixel speck
+    edge_map[50, 10:90] = 255      # long line
+
+    step = LineVectorizationStep(min_contour_length=10)
+    filtered = step._prefilter(edge_map)
+
+    assert filtered[10, 10] == 0
+    assert np.array_equal(filtered[50], edge_map[50])
+    lines = step.execute(FrameContextBuilder(0, np.zeros((100, 100, 3), np.uint8)).set("edge_map", edge_map)).get("lines_2d")
+    assert len(lines) == 1
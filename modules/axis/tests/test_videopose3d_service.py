@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from AXIS.scripts.videopose3d_service import (COCO_LEFT, COCO_RIGHT, H36M_LEFT, H36M_RIGHT, VideoPose3DUplifter,
+                                              normalize_screen_coordinates, pad_sequences, plan_batches)
+
+
+class _WindowModel:
+    receptive = 27
+
+    def receptive_field(self):
+        return self.receptive
+
+
+class _WindowUplifter(VideoPose3DUplifter):
+    """Replaces the network with a valid temporal window mean, which has the same padding contract."""
+
+    def __init__(self, **kwargs):
+        super().__init__(_WindowModel(), **kwargs)
+        self.batch_shapes = []
+
+    def _forward(self, inputs_2d):
+        self.batch_shapes.append(inputs_2d.shape)
+        window = self.receptive_field
+        cumulative = np.cumsum(np.pad(inputs_2d, ((0, 0), (1, 0), (0, 0), (0, 0))), axis=1)
+        mean = (cumulative[:, window:] - cumulative[:, :-window]) / window
+        return np.concatenate([mean, mean.sum(axis=-1, keepdims=True)], axis=-1)
+
+
+def _sequences(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(0, 640, size=(length, 17, 2)) for length in lengths]
+
+
+def test_normalize_screen_coordinates():
+    keypoints = np.array([[0.0, 0.0], [640.0, 480.0], [320.0, 240.0]])
+    np.testing.assert_allclose(normalize_screen_coordinates(keypoints, 640, 480),
+                               [[-1.0, -0.75], [1.0, 0.75], [0.0, 0.0]])
+
+
+def test_plan_batches_covers_every_sequence_within_limit():
+    lengths = [243, 10, 500, 243, 37, 3000]
+    batches = plan_batches(lengths, pad=121, max_batch_frames=2048)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        padded = max(lengths[i] for i in batch) + 242
+        assert len(batch) == 1 or len(batch) * padded <= 2048
+
+
+def test_pad_sequences_edge_pads_to_common_length():
+    short, long = np.arange(3.0).reshape(3, 1, 1), np.arange(5.0).reshape(5, 1, 1)
+    batch = pad_sequences([short, long], pad=2)
+
+    assert batch.shape == (2, 9, 1, 1)
+    np.testing.assert_array_equal(batch[0, :, 0, 0], [0, 0, 0, 1, 2, 2, 2, 2, 2])
+    np.testing.assert_array_equal(batch[1, :, 0, 0], [0, 0, 0, 1, 2, 3, 4, 4, 4])
+
+
+@pytest.mark.parametrize("max_batch_frames", [64, 100000])
+def test_batched_uplift_matches_one_sequence_at_a_time(max_batch_frames):
+    sequences = _sequences([50, 7, 120, 33])
+    sizes = [(640, 480), (640, 480), (1280, 720), (640, 360)]
+
+    uplifter = _WindowUplifter(test_time_augmentation=False, max_batch_frames=max_batch_frames)
+    batched = uplifter.uplift_batch(sequences, sizes)
+    single = [_WindowUplifter(test_time_augmentation=False).uplift(sequence, *size)
+              for sequence, size in zip(sequences, sizes)]
+
+    if max_batch_frames > 1000:
+        assert len(uplifter.batch_shapes) == 1
+    for lifted, expected, sequence in zip(batched, single, sequences):
+        assert lifted.shape == (len(sequence), 17, 3)
+        np.testing.assert_allclose(lifted, expected, atol=1e-5)
+
+
+def test_flip_augmentation_averages_unflipped_prediction():
+    # The window mean maps input joint j to output joint j, so the un-flipped prediction is the plain
+    # one with the COCO and then the H36M left/right swaps applied (and x negated twice)
+    sequence = _sequences([40])[0]
+    plain = _WindowUplifter(test_time_augmentation=False).uplift(sequence, 640, 480)
+    augmented = _WindowUplifter(test_time_augmentation=True).uplift(sequence, 640, 480)
+
+    coco, h36m = np.arange(17), np.arange(17)
+    coco[COCO_LEFT + COCO_RIGHT] = coco[COCO_RIGHT + COCO_LEFT]
+    h36m[H36M_LEFT + H36M_RIGHT] = h36m[H36M_RIGHT + H36M_LEFT]
+    swapped = plain[:, coco[h36m]]
+    np.testing.assert_allclose(augmented[..., :2], (plain[..., :2] + swapped[..., :2]) / 2, atol=1e-5)
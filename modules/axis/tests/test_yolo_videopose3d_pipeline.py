@@ -0,0 +1,105 @@
+import json
+import os
+
+import numpy as np
+
+from AXIS import run_yolo_videopose3d_pipeline as pipeline
+from AXIS.scripts.chunk_planning import chunk_video, context_frames, plan_chunks
+from AXIS.scripts.keypoint_tracks import KeypointTracks, load_tracks, save_tracks
+
+
+class _FlatUplifter:
+    """Stands in for the loaded VideoPose3D model: lifts x, y to (x, y, 0)."""
+    batches = []
+
+    def uplift_batch(self, sequences, sizes):
+        self.batches.append(sizes)
+        return [np.concatenate([sequence, np.zeros_like(sequence[..., :1])], axis=-1) for sequence in sequences]
+
+
+def _write_chunk(path, start, num_frames, value):
+    keypoints = np.full((num_frames, 1, 17, 3), value, dtype=np.float64)
+    tracks = KeypointTracks.from_ragged(list(keypoints), 2, frame_indices=np.arange(start, start + num_frames),
+                                        json_layout="yolo", boxes=list(np.zeros((num_frames, 1, 5))))
+    save_tracks(str(path), tracks)
+
+
+def _window_mean(sequence, context):
+    """Valid temporal window mean over an edge-padded sequence: a stand-in with VideoPose3D's padding contract."""
+    padded = np.pad(sequence, ((context, context), (0, 0), (0, 0)), mode="edge")
+    cumulative = np.cumsum(np.pad(padded, ((1, 0), (0, 0), (0, 0))), axis=0)
+    return (cumulative[2 * context + 1:] - cumulative[:-2 * context - 1]) / (2 * context + 1)
+
+
+def test_stitch_poses_cross_fades_overlaps():
+    first = KeypointTracks.from_sequence(np.ones((6, 17, 3)), frame_indices=np.arange(6))
+    second = KeypointTracks.from_sequence(np.full((6, 17, 3), 2.0), frame_indices=np.arange(4, 10))
+
+    stitched = pipeline.stitch_poses([first, second], 10, context_frames=0, blend_frames=2)
+    np.testing.assert_array_equal(stitched.frame_indices, np.arange(10))
+    np.testing.assert_allclose(stitched.positions[:, 0, 0, 0], [1, 1, 1, 1, 4 / 3, 5 / 3, 2, 2, 2, 2])
+    assert stitched.present.all()
+
+    # Overlaps smaller than the context fall back to the plain mean
+    stitched = pipeline.stitch_poses([first, second], 10, context_frames=3, blend_frames=2)
+    np.testing.assert_allclose(stitched.positions[4:6, 0, 0, 0], 1.5)
+
+    gap = pipeline.stitch_poses([first], 8)
+    assert gap.to_frame_list()[7] == {"frame_idx": 7, "keypoints": []}
+
+
+def test_receptive_field_chunks_stitch_to_whole_video_prediction():
+    receptive_field, video_length, blend = 27, 700, 8
+    context = context_frames(receptive_field)
+    chunk_size, overlap_size = plan_chunks(receptive_field, chunk_size=150, blend_frames=blend)
+    video = np.cumsum(np.random.default_rng(0).normal(size=(video_length, 17, 3)), axis=0)
+
+    chunk_tracks = [KeypointTracks.from_sequence(_window_mean(video[start:end], context),
+                                                 frame_indices=np.arange(start, end))
+                    for start, end in chunk_video(video_length, chunk_size, overlap_size)]
+    stitched = pipeline.stitch_poses(chunk_tracks, video_length, context, blend)
+    np.testing.assert_allclose(stitched.person(0), _window_mean(video, context), atol=1e-3)
+
+
+def test_chunk_index_orders_numerically():
+    paths = [f"/out/clip_mp4_chunk{i}_2d_keypoints.json" for i in (10, 2, 0)]
+    assert [pipeline.chunk_index(path) for path in sorted(paths, key=pipeline.chunk_index)] == [0, 2, 10]
+
+
+def test_chunks_of_a_video_are_lifted_in_one_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "get_uplifter", _FlatUplifter)
+    monkeypatch.setattr(_FlatUplifter, "batches", [])
+    monkeypatch.chdir(tmp_path)
+    chunks = [(0, 0, 6, 1.0), (1, 4, 6, 2.0)]
+    for chunk_idx, start, num_frames, value in chunks:
+        _write_chunk(tmp_path / f"clip_mp4_chunk{chunk_idx}_2d_keypoints.json", start, num_frames, value)
+
+    executor = pipeline.make_chunk_executor(1)
+    try:
+        paths = [str(tmp_path / f"clip_mp4_chunk{chunk_idx}_2d_keypoints.json") for chunk_idx, *_ in chunks]
+        results = executor.submit(pipeline.process_video_chunks, paths, str(tmp_path), "clip",
+                                  640, 480, "none").result()
+    finally:
+        executor.shutdown()
+
+    assert _FlatUplifter.batches == [[(640, 480), (640, 480)]]
+    # Nothing is written to the shared VideoPose3D input path
+    assert not os.path.exists("data")
+    for chunk_idx, start, num_frames, value in chunks:
+        lifted = load_tracks(str(tmp_path / f"clip_chunk{chunk_idx}_videopose3d_3d_keypoints.json"))
+        np.testing.assert_array_equal(lifted.frame_indices, np.arange(start, start + num_frames))
+        smoothed_path = str(tmp_path / f"clip_chunk{chunk_idx}_videopose3d_smoothed_3d_keypoints.json")
+        np.testing.assert_array_equal(load_tracks(smoothed_path).positions, results[chunk_idx].positions)
+        with open(smoothed_path) as f:
+            assert json.load(f)[0]["frame_idx"] == start
+
+    stitched = pipeline.stitch_poses(results, 10, context_frames=0, blend_frames=2)
+    np.testing.assert_allclose(stitched.positions[:, 0, 0, 0], [1] * 4 + [4 / 3, 5 / 3] + [2] * 4)
+
+
+def test_default_executor_keeps_the_uplifter_in_this_process():
+    executor = pipeline.make_chunk_executor(1)
+    try:
+        assert executor.submit(os.getpid).result() == os.getpid()
+    finally:
+        executor.shutdown()
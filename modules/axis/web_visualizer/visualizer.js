@@ -1 +1,188 @@
-// Logic to be implemented in Step 4
\ No newline at end of file
+// AXIS 2D visualizer
+//
+// Loads scene_data.json (written by src/main.py) and draws each frame's lines and curves.
+// With ?ws=ws://host:8765/ws (or ?ws=1 for the default port on this host), frames are
+// received live from LiveResultsServer while the video is still being processed.
+//
+// Frames exported with a level-of-detail pyramid carry "lod_tolerances" and a per-point
+// "lod" level. Each frame is drawn at the coarsest level whose tolerance stays below a
+// screen-space error budget, which is looser during playback and scales with zoom.
+
+const canvas = document.getElementById('tracking-canvas');
+const ctx = canvas.getContext('2d');
+const video = document.getElementById('source-video');
+const playPauseBtn = document.getElementById('play-pause-btn');
+const scrubBar = document.getElementById('scrub-bar');
+const frameCounter = document.getElementById('frame-counter');
+
+const params = new URLSearchParams(window.location.search);
+const FPS = Number(params.get('fps') || 30);
+const SPEED = Number(params.get('speed') || 1);
+// Allowed on-screen simplification error in CSS pixels while paused / playing
+const PAUSED_ERROR_PX = 0.5;
+const PLAYING_ERROR_PX = 2.0;
+
+// frame_index -> frame data ({lines, curves})
+const frames = new Map();
+let maxFrameIndex = -1;
+let currentFrame = 0;
+let playing = false;
+let followLive = true;
+let lastTick = 0;
+let liveSocket = null;
+let zoom = 1;
+let panX = 0, panY = 0;
+
+function frameBounds(frame) {
+    let width = 0, height = 0;
+    for (const item of [...(frame.lines || []), ...(frame.curves || [])]) {
+        for (const [x, y] of item.points) {
+            if (x > width) width = x;
+            if (y > height) height = y;
+        }
+    }
+    return [Math.ceil(width) + 1, Math.ceil(height) + 1];
+}
+
+function selectLevel(tolerances) {
+    if (!tolerances || !tolerances.length) return Infinity;
+    // Canvas pixels per CSS pixel, times zoom: how large one data pixel appears on screen
+    const screenScale = zoom * (canvas.clientWidth || canvas.width) / canvas.width;
+    const budget = (playing ? PLAYING_ERROR_PX * SPEED : PAUSED_ERROR_PX) / screenScale;
+    // Tolerances go from coarse to fine; take the first (coarsest) that fits the budget
+    for (let level = 0; level < tolerances.length; level++) {
+        if (tolerances[level] <= budget) return level;
+    }
+    return tolerances.length - 1;
+}
+
+function drawPolylines(items, color, lineWidth, level) {
+    ctx.strokeStyle = color;
+    ctx.lineWidth = lineWidth / zoom;
+    ctx.beginPath();
+    for (const item of items || []) {
+        const points = item.points;
+        const lod = item.lod;
+        let started = false;
+        for (let i = 0; i < points.length; i++) {
+            if (lod && lod[i] > level) continue;
+            if (started) {
+                ctx.lineTo(points[i][0], points[i][1]);
+            } else {
+                ctx.moveTo(points[i][0], points[i][1]);
+                started = true;
+            }
+        }
+    }
+    ctx.stroke();
+}
+
+function render() {
+    const frame = frames.get(currentFrame);
+    frameCounter.textContent = `Frame: ${currentFrame}` + (frame ? '' : ' (pending)');
+    scrubBar.value = currentFrame;
+    if (!frame) return;
+
+    // Size the canvas to the video if it is loaded, otherwise to the data extent
+    const [dataWidth, dataHeight] = frameBounds(frame);
+    const width = video.videoWidth || dataWidth;
+    const height = video.videoHeight || dataHeight;
+    if (canvas.width !== width || canvas.height !== height) {
+        canvas.width = width;
+        canvas.height = height;
+    }
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.fillStyle = '#000';
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+    ctx.setTransform(zoom, 0, 0, zoom, panX, panY);
+    const level = selectLevel(frame.lod_tolerances);
+    drawPolylines(frame.lines, '#00ff00', 1, level);
+    drawPolylines(frame.curves, '#3399ff', 2, level);
+}
+
+function addFrame(frame) {
+    frames.set(frame.frame_index, frame);
+    if (frame.frame_index > maxFrameIndex) {
+        maxFrameIndex = frame.frame_index;
+        scrubBar.max = maxFrameIndex;
+    }
+}
+
+function showFrame(index) {
+    currentFrame = Math.max(0, Math.min(index, Math.max(maxFrameIndex, 0)));
+    if (video.readyState > 0 && !playing) video.currentTime = currentFrame / FPS;
+    render();
+}
+
+function tick(timestamp) {
+    if (playing && timestamp - lastTick >= 1000 / (FPS * SPEED)) {
+        lastTick = timestamp;
+        if (currentFrame < maxFrameIndex) {
+            showFrame(currentFrame + 1);
+        } else if (!liveSocket) {
+            setPlaying(false);
+        }
+    }
+    requestAnimationFrame(tick);
+}
+
+function setPlaying(value) {
+    playing = value;
+    playPauseBtn.textContent = playing ? 'Pause' : 'Play';
+    video.playbackRate = SPEED;
+    if (playing) video.play().catch(() => {}); else video.pause();
+    // Pausing switches back to the finer level of detail
+    render();
+}
+
+playPauseBtn.addEventListener('click', () => setPlaying(!playing));
+canvas.addEventListener('wheel', (event) => {
+    event.preventDefault();
+    // Zoom about the cursor position (in canvas pixels)
+    const rect = canvas.getBoundingClientRect();
+    const x = (event.clientX - rect.left) * canvas.width / rect.width;
+    const y = (event.clientY - rect.top) * canvas.height / rect.height;
+    const factor = event.deltaY < 0 ? 1.25 : 0.8;
+    const newZoom = Math.min(Math.max(zoom * factor, 1), 32);
+    panX = x - (x - panX) * newZoom / zoom;
+    panY = y - (y - panY) * newZoom / zoom;
+    if (newZoom === 1) panX = panY = 0;
+    zoom = newZoom;
+    render();
+}, { passive: false });
+scrubBar.addEventListener('input', () => {
+    // Scrubbing away from the newest frame stops following live results
+    followLive = Number(scrubBar.value) === maxFrameIndex;
+    showFrame(Number(scrubBar.value));
+});
+
+function connectLive(url) {
+    liveSocket = new WebSocket(url);
+    liveSocket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'frame') {
+            addFrame(message);
+            if (followLive) showFrame(maxFrameIndex);
+        } else if (message.type === 'done') {
+            frameCounter.title = `Processing finished (${message.frames} frames)`;
+        }
+    };
+    liveSocket.onclose = () => { liveSocket = null; };
+}
+
+async function loadScene(url) {
+    const response = await fetch(url);
+    const scene = await response.json();
+    scene.forEach(addFrame);
+    showFrame(0);
+}
+
+const wsParam = params.get('ws');
+if (wsParam) {
+    connectLive(wsParam === '1' ? `ws://${window.location.hostname}:8765/ws` : wsParam);
+} else {
+    loadScene(params.get('data') || 'scene_data.json').catch((err) => {
+        frameCounter.textContent = `Failed to load scene data: ${err}`;
+    });
+}
+requestAnimationFrame(tick);